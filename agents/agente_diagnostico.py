@@ -12,8 +12,9 @@ if __name__ == "__main__":
         print("⚠️ Não foi possível carregar .env:", e)
 
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 
+from agents.conexoes_http import criar_modelo
+from agents.pool_agentes import ConsultasAgente, registrar_pool
 from tools.tools_pesquisa import sintese_estrategica
 from tools.tools_planejamento_vida import registrar_aprendizado
 
@@ -21,7 +22,7 @@ from tools.tools_planejamento_vida import registrar_aprendizado
 def build_agent(debug: bool = False) -> Agent:
     return Agent(
         name="Agente de Diagnóstico",
-        model=OpenAIChat(id="gpt-4.1-mini"),
+        model=criar_modelo("gpt-4.1-mini"),
         tools=[sintese_estrategica, registrar_aprendizado],
         instructions="""
         Você atua como agente de diagnóstico.
@@ -32,11 +33,13 @@ def build_agent(debug: bool = False) -> Agent:
     )
 
 
-def run_query(pergunta: str, debug: bool = False) -> str:
-    agent = build_agent(debug=debug)
-    out = agent.run(pergunta)
-    content = getattr(out, "content", None)
-    return content.strip() if content else ""
+_pool = registrar_pool("diagnostico", build_agent)
+
+
+_consultas = ConsultasAgente(_pool, build_agent)
+run_query = _consultas.run_query
+arun_query = _consultas.arun_query
+astream_query = _consultas.astream_query
 
 
 def main():
@@ -12,8 +12,9 @@ if __name__ == "__main__":
         print("⚠️ Não foi possível carregar .env:", e)
 
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 
+from agents.conexoes_http import criar_modelo
+from agents.pool_agentes import ConsultasAgente, registrar_pool
 from tools.tools_educacionais import (
     gerar_questao_multipla_escolha,
     corrigir_simulado,
@@ -25,7 +26,7 @@ from tools.tools_educacionais import (
 def build_agent(debug: bool = False) -> Agent:
     return Agent(
         name="Agente Educador",
-        model=OpenAIChat(id="gpt-4.1-mini"),
+        model=criar_modelo("gpt-4.1-mini"),
         tools=[
             gerar_questao_multipla_escolha,
             corrigir_simulado,
@@ -41,11 +42,13 @@ def build_agent(debug: bool = False) -> Agent:
     )
 
 
-def run_query(pergunta: str, debug: bool = False) -> str:
-    agent = build_agent(debug=debug)
-    out = agent.run(pergunta)
-    content = getattr(out, "content", None)
-    return content.strip() if content else ""
+_pool = registrar_pool("educador", build_agent)
+
+
+_consultas = ConsultasAgente(_pool, build_agent)
+run_query = _consultas.run_query
+arun_query = _consultas.arun_query
+astream_query = _consultas.astream_query
 
 
 def main():
@@ -1,6 +1,11 @@
 # agents/agente_orquestrador.py
+import asyncio
+import importlib
 import sys
+import threading
 from pathlib import Path
+from types import ModuleType
+from typing import AsyncIterator, Dict, List, Optional
 
 from tools.tools_logs_cognitivos import CognitiveLogger
 
@@ -19,79 +24,196 @@ if __name__ == "__main__":
         print("⚠️ Não foi possível carregar .env:", e)
 # ======================================================
 
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
+from agents.conexoes_http import criar_modelo
+from agents.pool_agentes import registrar_pool
+from agents.registro_agentes import (
+    AGENTE_PADRAO,
+    agente_valido,
+    nomes_agentes,
+    obter_agente,
+    palpite_por_palavras_chave,
+)
 
-from agents.agente_pesquisador import run_query as pesquisador_run
-from agents.agente_educador import run_query as educador_run
-from agents.agente_planejador import run_query as planejador_run
-from agents.agente_conteudo import run_query as conteudo_run
-from agents.agente_diagnostico import run_query as diagnostico_run
 
+# ======================================================
+# CARGA SOB DEMANDA DOS AGENTES
+# ======================================================
+# Cada módulo de agente importa o agno (agent, models, tools): importá-los no
+# topo custava ~1s no cold start da API. O despacho vai pelo registro
+# (nome -> AgentSpec -> módulo) e o módulo só é importado na primeira execução
+# do agente (ou pelo aquecimento em segundo plano).
+_carregados: Dict[str, ModuleType] = {}
+_CARGA_LOCK = threading.Lock()
+
+
+def carregar_agente(nome: str) -> ModuleType:
+    """
+    Módulo do agente `nome` (importado na primeira chamada; registra o pool dele).
+    Nome desconhecido cai no agente padrão.
+    """
+    spec = obter_agente(nome)
+    modulo = _carregados.get(spec.nome)
+    if modulo is None:
+        with _CARGA_LOCK:
+            modulo = _carregados.get(spec.nome)
+            if modulo is None:
+                modulo = importlib.import_module(spec.modulo)
+                _carregados[spec.nome] = modulo
+    return modulo
+
+
+async def carregar_agente_async(nome: str) -> ModuleType:
+    """Igual a `carregar_agente`, mas o primeiro import roda fora do event loop."""
+    # nome do registro (aliases e nomes desconhecidos resolvem para o agente certo)
+    modulo = _carregados.get(obter_agente(nome).nome)
+    if modulo is None:
+        modulo = await asyncio.to_thread(carregar_agente, nome)
+    return modulo
 
-AGENTES_VALIDOS = ["pesquisador", "educador", "planejador", "conteudo", "diagnostico"]
+
+def agentes_carregados() -> List[str]:
+    return [nome for nome in nomes_agentes() if nome in _carregados]
+
+
+def carregar_agentes() -> None:
+    """Importa todos os agentes (e o agno) de uma vez: usado pelo aquecimento."""
+    for nome in nomes_agentes():
+        carregar_agente(nome)
 
 
 def executar_agente_query(nome: str, pergunta: str) -> str:
     """
     Executa o agente escolhido e retorna a resposta em texto.
     """
-    if nome == "pesquisador":
-        return pesquisador_run(pergunta)
-    if nome == "educador":
-        return educador_run(pergunta)
-    if nome == "planejador":
-        return planejador_run(pergunta)
-    if nome == "conteudo":
-        return conteudo_run(pergunta)
-    return diagnostico_run(pergunta)
+    return carregar_agente(nome).run_query(pergunta)
 
 
-def decidir_agente_por_resposta(resposta: str) -> str:
-    r = (resposta or "").strip().lower()
-    return r if r in AGENTES_VALIDOS else "diagnostico"
+async def executar_agente_query_async(nome: str, pergunta: str) -> str:
+    """
+    Versão async de `executar_agente_query` (usa `Agent.arun`).
+    """
+    modulo = await carregar_agente_async(nome)
+    return await modulo.arun_query(pergunta)
 
 
-def decidir_agente_llm(pergunta: str) -> str:
+async def executar_agente_stream(nome: str, pergunta: str) -> AsyncIterator[str]:
     """
-    Usa LLM para decidir qual agente deve atuar.
-    Se falhar, cai em heurística simples.
+    Executa o agente escolhido em modo streaming (tokens conforme chegam).
     """
-    router = Agent(
+    modulo = await carregar_agente_async(nome)
+    async for parte in modulo.astream_query(pergunta):
+        yield parte
+
+
+def decidir_agente_por_resposta(resposta: str) -> str:
+    r = (resposta or "").strip().lower()
+    return r if agente_valido(r) else AGENTE_PADRAO
+
+
+def build_router():
+    from agno.agent import Agent
+
+    return Agent(
         name="Router Cognitivo",
-        model=OpenAIChat(id="gpt-4.1-mini"),
+        model=criar_modelo("gpt-4.1-mini"),
         instructions=f"""
 Você é um roteador de intenção.
 Analise a pergunta do usuário e escolha QUAL agente especializado deve atuar.
 
 Responda APENAS com UMA palavra, exatamente uma destas:
-{", ".join(AGENTES_VALIDOS)}
+{", ".join(nomes_agentes())}
 
 Não explique. Não justifique. Não escreva mais nada.
 """,
         debug_mode=False,
     )
 
+
+# router de longa duração: instâncias reaproveitadas entre chamadas
+# (o pool só constrói o Agent, e importa o agno, no primeiro uso)
+# toda pergunta não cacheada passa pelo router: pool maior que o dos agentes (ROUTER_POOL_SIZE na API)
+TAMANHO_POOL_ROUTER = 16
+_router_pool = registrar_pool("router", build_router, size=TAMANHO_POOL_ROUTER)
+
+
+def palpite_heuristico(pergunta: str) -> Optional[str]:
+    """
+    Agente sugerido por palavras-chave (declaradas no registro), ou None se nenhuma bateu.
+    """
+    return palpite_por_palavras_chave(pergunta)
+
+
+def decidir_agente_heuristica(pergunta: str) -> str:
+    """
+    Roteamento por palavras-chave (sem LLM).
+    """
+    return palpite_heuristico(pergunta) or AGENTE_PADRAO
+
+
+def decidir_agente_llm_com_origem(pergunta: str) -> tuple[str, str]:
+    """
+    Igual a `decidir_agente_llm`, mas informa a origem da decisão:
+    - "llm": o router respondeu um agente especializado
+    - "heuristica": o router respondeu, mas sem agente especializado
+    - "fallback": a chamada ao router falhou
+    """
+    from agno.run.base import RunStatus
+
+    origem = "fallback"
     try:
-        out = router.run(pergunta)
+        with _router_pool.checkout() as router:
+            out = router.run(pergunta)
+        # o agno não propaga a exceção do provedor: devolve status=error
+        if getattr(out, "status", None) == RunStatus.error:
+            raise RuntimeError(out.content)
         resposta = out.content if out and getattr(out, "content", None) else ""
         agente = decidir_agente_por_resposta(resposta)
-        if agente != "diagnostico":
-            return agente
+        if agente != AGENTE_PADRAO:
+            return agente, "llm"
+        origem = "heuristica"
     except Exception:
         pass
 
     # fallback heurístico (quando API falha ou resposta estranha)
-    p = pergunta.lower()
-    if any(k in p for k in ["pesquise", "pesquisar", "tendência", "fontes", "notícia", "artigo"]):
-        return "pesquisador"
-    if any(k in p for k in ["questão", "questoes", "prova", "simulado", "estudar", "aprender"]):
-        return "educador"
-    if any(k in p for k in ["planejar", "rotina", "semana", "12 semanas", "objetivo", "prioridade"]):
-        return "planejador"
-    if any(k in p for k in ["roteiro", "conteúdo", "instagram", "tiktok", "narrativa", "calendário"]):
-        return "conteudo"
-    return "diagnostico"
+    return decidir_agente_heuristica(pergunta), origem
+
+
+def decidir_agente_llm(pergunta: str) -> str:
+    """
+    Usa LLM para decidir qual agente deve atuar.
+    Se falhar, cai em heurística simples.
+    """
+    return decidir_agente_llm_com_origem(pergunta)[0]
+
+
+async def decidir_agente_llm_com_origem_async(pergunta: str) -> tuple[str, str]:
+    """
+    Versão async de `decidir_agente_llm_com_origem` (usa `Agent.arun`).
+    """
+    if "agno.agent" not in sys.modules:
+        # primeiro uso sem aquecimento: o import do agno não bloqueia o event loop
+        await asyncio.to_thread(importlib.import_module, "agno.agent")
+    from agno.run.base import RunStatus
+
+    origem = "fallback"
+    try:
+        async with _router_pool.acheckout() as router:
+            out = await router.arun(pergunta)
+        if getattr(out, "status", None) == RunStatus.error:
+            raise RuntimeError(out.content)
+        resposta = out.content if out and getattr(out, "content", None) else ""
+        agente = decidir_agente_por_resposta(resposta)
+        if agente != AGENTE_PADRAO:
+            return agente, "llm"
+        origem = "heuristica"
+    except Exception:
+        pass
+
+    return decidir_agente_heuristica(pergunta), origem
+
+
+async def decidir_agente_llm_async(pergunta: str) -> str:
+    return (await decidir_agente_llm_com_origem_async(pergunta))[0]
 
 
 def main():
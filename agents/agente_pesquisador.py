@@ -17,9 +17,10 @@ if __name__ == "__main__":
 # ======================================================
 
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.tools.tavily import TavilyTools
 
+from agents.conexoes_http import criar_modelo
+from agents.pool_agentes import ConsultasAgente, registrar_pool
+from tools.tools_busca_web import criar_ferramenta_busca
 from tools.tools_pesquisa import (
     organizar_pesquisa,
     resumo_executivo,
@@ -30,9 +31,9 @@ from tools.tools_pesquisa import (
 def build_agent(debug: bool = False) -> Agent:
     return Agent(
         name="Agente Pesquisador",
-        model=OpenAIChat(id="gpt-4.1-mini"),
+        model=criar_modelo("gpt-4.1-mini"),
         tools=[
-            TavilyTools(),
+            criar_ferramenta_busca(),  # TavilyTools com cache persistente de resultados
             organizar_pesquisa,
             resumo_executivo,
             sintese_estrategica,
@@ -46,11 +47,13 @@ def build_agent(debug: bool = False) -> Agent:
     )
 
 
-def run_query(pergunta: str, debug: bool = False) -> str:
-    agent = build_agent(debug=debug)
-    out = agent.run(pergunta)
-    content = getattr(out, "content", None)
-    return content.strip() if content else ""
+_pool = registrar_pool("pesquisador", build_agent)
+
+
+_consultas = ConsultasAgente(_pool, build_agent)
+run_query = _consultas.run_query
+arun_query = _consultas.arun_query
+astream_query = _consultas.astream_query
 
 
 def main():
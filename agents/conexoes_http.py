@@ -0,0 +1,204 @@
+# agents/conexoes_http.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+import httpx
+
+if TYPE_CHECKING:
+    from agno.models.openai import OpenAIChat
+
+# ======================================================
+# POOL HTTP COMPARTILHADO (keep-alive) PARA TODOS OS MODELOS
+# ======================================================
+# O agno usa um httpx.Client/AsyncClient global sempre que o OpenAIChat
+# não recebe `http_client`. Instalamos aqui clientes próprios, com limites
+# configuráveis e hooks de métrica, para que router e agentes especialistas
+# reaproveitem as mesmas conexões TLS.
+# O agno só é importado quando o pool é instalado (primeiro modelo criado ou
+# aquecimento): o startup da API apenas registra os limites.
+
+_LOCK = threading.Lock()
+_INSTALAR_LOCK = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_config: Dict[str, Any] = {}
+_limites_pendentes: Dict[str, Any] = {}
+# fechamentos assíncronos em andamento (referência forte até a task terminar)
+_fechamentos: Set["asyncio.Task[None]"] = set()
+
+
+class _MetricasConexao:
+    """
+    Conta requests e detecta reuso de conexão pelo `network_stream`
+    que o httpcore expõe nas extensions da resposta.
+    """
+
+    def __init__(self, max_rastreadas: int = 4096):
+        self._lock = threading.Lock()
+        self._streams: Dict[int, None] = {}
+        self._max_rastreadas = max_rastreadas
+        self.requests = 0
+        self.respostas = 0
+        self.conexoes_novas = 0
+        self.conexoes_reusadas = 0
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def on_response(self, response: httpx.Response) -> None:
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.respostas += 1
+            if stream is None:
+                return
+            sid = id(stream)
+            if sid in self._streams:
+                self.conexoes_reusadas += 1
+                return
+            self.conexoes_novas += 1
+            if len(self._streams) >= self._max_rastreadas:
+                self._streams.clear()
+            self._streams[sid] = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.conexoes_novas + self.conexoes_reusadas
+            return {
+                "requests": self.requests,
+                "responses": self.respostas,
+                "new_connections": self.conexoes_novas,
+                "reused_connections": self.conexoes_reusadas,
+                "reuse_ratio": round(self.conexoes_reusadas / total, 4) if total else 0.0,
+            }
+
+
+_metricas = _MetricasConexao()
+
+
+async def _on_request_async(request: httpx.Request) -> None:
+    _metricas.on_request(request)
+
+
+async def _on_response_async(response: httpx.Response) -> None:
+    _metricas.on_response(response)
+
+
+def _fechar_async_client(client: httpx.AsyncClient) -> None:
+    """
+    Fecha um AsyncClient substituído a partir de código síncrono: com loop
+    rodando nesta thread, agenda o `aclose`; sem loop, roda-o num loop próprio.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        task = loop.create_task(client.aclose())
+        _fechamentos.add(task)
+        task.add_done_callback(_fechamentos.discard)
+        return
+    try:
+        asyncio.run(client.aclose())
+    except Exception:
+        # conexões presas a um loop que já terminou não fecham de forma limpa;
+        # o cliente fica marcado como fechado e os sockets vão com o GC
+        pass
+
+
+def configurar_pool_http(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    timeout: float = 120.0,
+) -> None:
+    """
+    (Re)cria os clientes HTTP compartilhados e os instala como padrão do agno.
+    Modelos criados antes continuam válidos: o agno resolve o cliente global
+    na primeira chamada de cada modelo.
+    Os clientes substituídos são fechados (o assíncrono via `aclose`).
+    """
+    from agno.utils.http import set_default_async_client, set_default_sync_client
+
+    global _sync_client, _async_client, _config
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    with _LOCK:
+        antigo, antigo_async = _sync_client, _async_client
+        _sync_client = httpx.Client(
+            limits=limits,
+            timeout=timeout,
+            follow_redirects=True,
+            event_hooks={"request": [_metricas.on_request], "response": [_metricas.on_response]},
+        )
+        _async_client = httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            follow_redirects=True,
+            event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+        )
+        _config = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "timeout": timeout,
+        }
+        set_default_sync_client(_sync_client)
+        set_default_async_client(_async_client)
+
+    if antigo is not None:
+        antigo.close()
+    if antigo_async is not None:
+        _fechar_async_client(antigo_async)
+
+
+def definir_limites_http(**limites: Any) -> None:
+    """
+    Limites usados quando o pool for instalado (`garantir_pool_http`), sem importar o agno.
+    Se o pool já estiver instalado, ele é recriado com os novos limites.
+    """
+    global _limites_pendentes
+    _limites_pendentes = dict(limites)
+    if _sync_client is not None:
+        configurar_pool_http(**_limites_pendentes)
+
+
+def garantir_pool_http() -> None:
+    """Instala o pool (limites de `definir_limites_http` ou os padrão), se ainda não houver um."""
+    if _sync_client is not None:
+        return
+    with _INSTALAR_LOCK:
+        if _sync_client is None:
+            configurar_pool_http(**_limites_pendentes)
+
+
+def criar_modelo(model_id: str = "gpt-4.1-mini") -> "OpenAIChat":
+    """
+    Ponto único de criação de OpenAIChat do projeto (usa o pool compartilhado).
+    """
+    from agno.models.openai import OpenAIChat
+
+    garantir_pool_http()
+    return OpenAIChat(id=model_id)
+
+
+def estatisticas_http() -> Dict[str, Any]:
+    return {"config": dict(_config or _limites_pendentes), "installed": _sync_client is not None, **_metricas.stats()}
+
+
+async def fechar_pool_http() -> None:
+    global _sync_client, _async_client
+    with _LOCK:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client, _async_client = None, None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
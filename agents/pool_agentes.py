@@ -0,0 +1,379 @@
+# agents/pool_agentes.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+_CONSTRUIR = object()
+_SEM_VAGA = object()
+
+# instâncias por agente quando nada é configurado: acima do limite por agente do
+# /run/batch (BATCH_AGENT_CONCURRENCY=4), para as vagas do lote nunca esperarem o pool.
+# As instâncias são criadas sob demanda; o tamanho é só o teto.
+TAMANHO_POOL_PADRAO = 8
+
+
+class AgentPoolTimeout(TimeoutError):
+    """Nenhuma instância do agente ficou livre dentro do tempo de espera."""
+
+
+def _acordar(fut: "asyncio.Future[None]") -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class AgentPool:
+    """
+    Pool de instâncias pré-construídas de um agente (modelo checkout/checkin).
+    - Cada instância atende um único request por vez (Agent não é compartilhado entre threads)
+    - Cria instâncias sob demanda até `size`; acima disso, o request espera uma devolução
+    - Métricas: hit (instância ociosa), miss (precisou construir), wait (precisou esperar)
+    - Espera síncrona (`acquire`) bloqueia a thread; a assíncrona (`aacquire`) espera um
+      future no event loop, sem ocupar thread do executor
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        factory: Callable[[], Any],
+        size: int = TAMANHO_POOL_PADRAO,
+        acquire_timeout: Optional[float] = 60.0,
+    ):
+        self.nome = nome
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        # corrotinas esperando vaga (a devolução pode vir de outra thread: call_soon_threadsafe)
+        self._esperas_async: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = deque()
+        self._idle: List[Any] = []
+        self._created = 0
+        self._in_use = 0
+
+        # métricas
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    def _notificar(self, todos: bool = False) -> None:
+        """Acorda quem espera vaga (chamar com o lock): uma thread e uma corrotina, ou todas."""
+        if todos:
+            self._cond.notify_all()
+        else:
+            self._cond.notify()
+        while self._esperas_async:
+            loop, fut = self._esperas_async.popleft()
+            if fut.done():
+                continue
+            try:
+                loop.call_soon_threadsafe(_acordar, fut)
+            except RuntimeError:
+                continue  # loop já encerrado
+            if not todos:
+                break
+
+    def resize(self, size: int) -> None:
+        with self._cond:
+            self.size = max(1, int(size))
+            # descarta ociosas excedentes; as em uso são descartadas na devolução
+            while self._idle and self._created > self.size:
+                self._idle.pop()
+                self._created -= 1
+            self._notificar(todos=True)
+
+    def warmup(self, n: Optional[int] = None) -> int:
+        """
+        Constrói instâncias antecipadamente (até `n` ou até o tamanho do pool).
+        Retorna quantas instâncias novas foram criadas.
+        """
+        alvo = self.size if n is None else min(self.size, max(0, int(n)))
+        criadas = 0
+        while True:
+            with self._cond:
+                if self._created >= alvo:
+                    return criadas
+                self._created += 1
+            try:
+                agent = self.factory()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._notificar(todos=True)
+                raise
+            with self._cond:
+                self._idle.append(agent)
+                self._notificar()
+            criadas += 1
+
+    def _reservar(self) -> Any:
+        """
+        Tenta obter uma instância sem esperar (chamar com o lock adquirido).
+        Retorna a instância ociosa, `_CONSTRUIR` (vaga reservada) ou `_SEM_VAGA`.
+        """
+        if self._idle:
+            self._in_use += 1
+            return self._idle.pop()
+        if self._created < self.size:
+            self._created += 1
+            self._in_use += 1
+            return _CONSTRUIR
+        return _SEM_VAGA
+
+    def _construir(self) -> Any:
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._notificar()
+            raise
+
+    def _registrar_espera(self, t0: float) -> None:
+        wait_ms = (time.perf_counter() - t0) * 1000
+        self._wait_ms_total += wait_ms
+        self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+
+    def _erro_timeout(self, timeout: Optional[float]) -> AgentPoolTimeout:
+        self._timeouts += 1
+        return AgentPoolTimeout(f"Pool '{self.nome}' sem instâncias livres após {timeout}s (size={self.size}).")
+
+    def _contabilizar(self, reserva: Any) -> None:
+        if reserva is _CONSTRUIR:
+            self._misses += 1
+        else:
+            self._hits += 1
+
+    def try_acquire(self) -> Any:
+        """
+        Versão não bloqueante de `acquire`: retorna None se o pool estiver esgotado.
+        """
+        with self._cond:
+            reserva = self._reservar()
+            if reserva is _SEM_VAGA:
+                return None
+            self._contabilizar(reserva)
+        return self._construir() if reserva is _CONSTRUIR else reserva
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        timeout = self.acquire_timeout if timeout is None else timeout
+
+        with self._cond:
+            reserva = self._reservar()
+            if reserva is _SEM_VAGA:
+                self._waits += 1
+                t0 = time.perf_counter()
+                ok = self._cond.wait_for(lambda: self._idle or self._created < self.size, timeout)
+                self._registrar_espera(t0)
+                if not ok:
+                    raise self._erro_timeout(timeout)
+                reserva = self._reservar()
+            self._contabilizar(reserva)
+
+        # construção fora do lock
+        return self._construir() if reserva is _CONSTRUIR else reserva
+
+    def release(self, agent: Any) -> None:
+        with self._cond:
+            self._in_use -= 1
+            if self._created > self.size:
+                # pool foi reduzido enquanto a instância estava em uso
+                self._created -= 1
+            else:
+                self._idle.append(agent)
+            self._notificar()
+
+    async def aacquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        `acquire` para o caminho async: espera a devolução no próprio event loop
+        (nenhuma thread fica presa por request em espera).
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        limite = None if timeout is None else loop.time() + timeout
+        t0: Optional[float] = None
+        while True:
+            with self._cond:
+                reserva = self._reservar()
+                if reserva is not _SEM_VAGA:
+                    if t0 is not None:
+                        self._registrar_espera(t0)
+                    self._contabilizar(reserva)
+                    break
+                if t0 is None:
+                    self._waits += 1
+                    t0 = time.perf_counter()
+                fut: "asyncio.Future[None]" = loop.create_future()
+                self._esperas_async.append((loop, fut))
+            try:
+                restante = None if limite is None else max(0.0, limite - loop.time())
+                await asyncio.wait_for(fut, restante)
+            except BaseException as e:
+                with self._cond:
+                    try:
+                        self._esperas_async.remove((loop, fut))
+                    except ValueError:
+                        self._notificar()  # já tinha sido acordada: repassa a vaga
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._registrar_espera(t0)
+                        raise self._erro_timeout(timeout) from None
+                raise
+
+        # construção fora do lock
+        return self._construir() if reserva is _CONSTRUIR else reserva
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        agent = self.acquire(timeout=timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    @asynccontextmanager
+    async def acheckout(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Checkout para o caminho async (espera sem ocupar thread)."""
+        agent = await self.aacquire(timeout=timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_ms_total, 3),
+                "wait_ms_max": round(self._wait_ms_max, 3),
+            }
+
+
+# ======================================================
+# REGISTRO DE POOLS (um por agente)
+# ======================================================
+_POOLS: Dict[str, AgentPool] = {}
+_POOLS_LOCK = threading.Lock()
+# última configuração de `configurar_pools`: vale também para agentes carregados depois
+_CONFIG: Dict[str, Any] = {}
+
+
+def registrar_pool(nome: str, factory: Callable[[], Any], size: int = TAMANHO_POOL_PADRAO) -> AgentPool:
+    """
+    Registra (ou retorna, se já existir) o pool do agente `nome`.
+    """
+    with _POOLS_LOCK:
+        pool = _POOLS.get(nome)
+        if pool is None:
+            if _CONFIG:
+                size = _CONFIG["overrides"].get(nome, _CONFIG["size"])
+            pool = AgentPool(nome, factory, size=size)
+            if _CONFIG.get("acquire_timeout") is not None:
+                pool.acquire_timeout = _CONFIG["acquire_timeout"]
+            _POOLS[nome] = pool
+        return pool
+
+
+def obter_pool(nome: str) -> Optional[AgentPool]:
+    return _POOLS.get(nome)
+
+
+def configurar_pools(
+    size: int,
+    overrides: Optional[Dict[str, int]] = None,
+    acquire_timeout: Optional[float] = None,
+) -> None:
+    """
+    Ajusta os pools registrados e guarda a configuração para os que forem
+    registrados depois (agentes importados sob demanda).
+    """
+    overrides = overrides or {}
+    with _POOLS_LOCK:
+        _CONFIG.update(size=size, overrides=dict(overrides), acquire_timeout=acquire_timeout)
+    for nome, pool in list(_POOLS.items()):
+        pool.resize(overrides.get(nome, size))
+        if acquire_timeout is not None:
+            pool.acquire_timeout = acquire_timeout
+
+
+def aquecer_pools(n: Optional[int] = None) -> Dict[str, int]:
+    """
+    Pré-constrói instâncias de todos os pools registrados.
+    Falha em um agente não impede o aquecimento dos demais.
+    """
+    out: Dict[str, int] = {}
+    for nome, pool in list(_POOLS.items()):
+        try:
+            out[nome] = pool.warmup(n)
+        except Exception:
+            out[nome] = 0
+    return out
+
+
+def estatisticas_pools() -> Dict[str, Dict[str, Any]]:
+    return {nome: pool.stats() for nome, pool in list(_POOLS.items())}
+
+
+# ======================================================
+# CONSULTAS DOS AGENTES SOBRE O POOL
+# ======================================================
+class ConsultasAgente:
+    """
+    `run_query` / `arun_query` / `astream_query` de um agente, executados em
+    instâncias do pool dele. Cada módulo de agente expõe os métodos ligados:
+
+        _consultas = ConsultasAgente(_pool, build_agent)
+        run_query = _consultas.run_query
+    """
+
+    def __init__(self, pool: AgentPool, build_agent: Callable[..., Any]):
+        self.pool = pool
+        self.build_agent = build_agent
+
+    def run_query(self, pergunta: str, debug: bool = False) -> str:
+        if debug:
+            # debug_mode é definido na construção: usa instância dedicada
+            out = self.build_agent(debug=True).run(pergunta)
+        else:
+            with self.pool.checkout() as agent:
+                out = agent.run(pergunta)
+        return _conteudo(out)
+
+    async def arun_query(self, pergunta: str) -> str:
+        async with self.pool.acheckout() as agent:
+            out = await agent.arun(pergunta)
+        return _conteudo(out)
+
+    async def astream_query(self, pergunta: str) -> AsyncIterator[str]:
+        from agno.run.agent import RunContentEvent, RunErrorEvent
+
+        async with self.pool.acheckout() as agent:
+            async for ev in agent.arun(pergunta, stream=True):
+                if isinstance(ev, RunErrorEvent):
+                    raise RuntimeError(ev.content or "Erro na execução do agente")
+                if isinstance(ev, RunContentEvent) and ev.content:
+                    yield str(ev.content)
+
+
+def _conteudo(out: Any) -> str:
+    """Texto da resposta; o agno devolve falhas do provedor como RunOutput com status de erro."""
+    from agno.run.base import RunStatus
+
+    if getattr(out, "status", None) == RunStatus.error:
+        raise RuntimeError(getattr(out, "content", None) or "Erro na execução do agente")
+    content = getattr(out, "content", None)
+    return content.strip() if content else ""
@@ -0,0 +1,122 @@
+# agents/registro_agentes.py
+"""
+REGISTRO DECLARATIVO DOS AGENTES
+
+Cada agente é declarado uma única vez (`AgentSpec`): nome, módulo, palavras-chave
+do roteamento heurístico, provedores externos e os ajustes de desempenho padrão
+(TTL do cache de respostas, instâncias simultâneas, timeout de execução).
+
+- o orquestrador despacha por dicionário (nome -> spec -> módulo importado sob demanda)
+- a lista de agentes válidos do router e a heurística saem daqui
+- os ajustes por variável de ambiente (AGENT_POOL_SIZES, RESPONSE_CACHE_TTLS,
+  AGENT_TIMEOUTS) sobrepõem os valores declarados
+
+Para adicionar um agente: crie `agents/agente_<nome>.py` com `run_query`,
+`arun_query` e `astream_query` e declare-o com `registrar_agente`.
+Este módulo não importa o agno.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# agente usado quando o router não decide (ou responde um nome desconhecido)
+AGENTE_PADRAO = "diagnostico"
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    nome: str
+    modulo: str
+    palavras_chave: Tuple[str, ...] = ()  # roteamento heurístico (ordem do registro = prioridade)
+    provedores: Tuple[str, ...] = ("openai",)  # limites de concorrência por provedor
+    cache_ttl_s: Optional[float] = None  # cache de respostas (None = TTL padrão; 0 = nunca)
+    max_concorrencia: Optional[int] = None  # instâncias no pool (None = AGENT_POOL_SIZE)
+    timeout_s: Optional[float] = None  # tempo máximo de execução (None = AGENT_TIMEOUT_S)
+
+
+_AGENTES: Dict[str, AgentSpec] = {}
+
+
+def registrar_agente(spec: AgentSpec) -> AgentSpec:
+    """Declara (ou substitui) um agente. A ordem de registro é a prioridade da heurística."""
+    _AGENTES[spec.nome] = spec
+    return spec
+
+
+def obter_agente(nome: str) -> AgentSpec:
+    """Spec do agente `nome`; nome desconhecido cai no agente padrão."""
+    return _AGENTES.get(nome) or _AGENTES[AGENTE_PADRAO]
+
+
+def nomes_agentes() -> List[str]:
+    return list(_AGENTES)
+
+
+def agente_valido(nome: str) -> bool:
+    return nome in _AGENTES
+
+
+def provedores_do_agente(nome: str) -> Tuple[str, ...]:
+    spec = _AGENTES.get(nome)
+    return spec.provedores if spec is not None else ("openai",)
+
+
+def palpite_por_palavras_chave(pergunta: str) -> Optional[str]:
+    """Primeiro agente (na ordem do registro) com alguma palavra-chave na pergunta."""
+    p = pergunta.lower()
+    for spec in _AGENTES.values():
+        if any(k in p for k in spec.palavras_chave):
+            return spec.nome
+    return None
+
+
+def config_por_agente(campo: str) -> Dict[str, Any]:
+    """Valores declarados de `campo` (ex: "timeout_s"), só dos agentes que o definem."""
+    return {nome: getattr(spec, campo) for nome, spec in _AGENTES.items() if getattr(spec, campo) is not None}
+
+
+def descrever_agentes() -> Dict[str, Dict[str, Any]]:
+    return {nome: asdict(spec) for nome, spec in _AGENTES.items()}
+
+
+# ======================================================
+# AGENTES DO PROJETO
+# ======================================================
+registrar_agente(
+    AgentSpec(
+        nome="pesquisador",
+        modulo="agents.agente_pesquisador",
+        palavras_chave=("pesquise", "pesquisar", "tendência", "fontes", "notícia", "artigo"),
+        provedores=("openai", "tavily"),
+        cache_ttl_s=0,  # busca na web: resposta depende do momento
+    )
+)
+registrar_agente(
+    AgentSpec(
+        nome="educador",
+        modulo="agents.agente_educador",
+        palavras_chave=("questão", "questoes", "prova", "simulado", "estudar", "aprender"),
+    )
+)
+registrar_agente(
+    AgentSpec(
+        nome="planejador",
+        modulo="agents.agente_planejador",
+        palavras_chave=("planejar", "rotina", "semana", "12 semanas", "objetivo", "prioridade"),
+    )
+)
+registrar_agente(
+    AgentSpec(
+        nome="conteudo",
+        modulo="agents.agente_conteudo",
+        palavras_chave=("roteiro", "conteúdo", "instagram", "tiktok", "narrativa", "calendário"),
+    )
+)
+registrar_agente(
+    AgentSpec(
+        nome="diagnostico",
+        modulo="agents.agente_diagnostico",
+    )
+)
@@ -1,5 +1,7 @@
 # api/bootstrap_runtime.py
 from pathlib import Path
+from typing import Any, Optional
+import multiprocessing
 import os
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -20,7 +22,7 @@ def validate_keys():
         missing.append("OPENAI_API_KEY")
 
     enable_pesquisador = os.getenv("ENABLE_PESQUISADOR", "1").strip().lower() in ("1", "true", "yes", "y")
-    if enable_pesquisador and not os.getenv("TAVILY_API_KEY"):
+    if enable_pesquisador and get_search_backend() == "tavily" and not os.getenv("TAVILY_API_KEY"):
         missing.append("TAVILY_API_KEY")
 
     # API_KEY é recomendado, mas pode ser opcional em dev
@@ -49,3 +51,246 @@ def get_max_input_chars() -> int:
         return max(200, n)  # mínimo razoável
     except Exception:
         return 3000
+
+
+def _get_int_env(name: str, default: int, minimum: int = 0) -> int:
+    raw = (os.getenv(name) or str(default)).strip()
+    try:
+        return max(minimum, int(raw))
+    except Exception:
+        return default
+
+
+def _get_bool_env(name: str, default: bool) -> bool:
+    raw = (os.getenv(name) or "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "y")
+
+
+def _get_float_env(name: str, default: float, minimum: float = 0.0, maximum: Optional[float] = None) -> float:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        valor = max(minimum, float(raw)) if raw else default
+    except Exception:
+        return default
+    return min(maximum, valor) if maximum is not None else valor
+
+
+def get_agent_pool_size() -> int:
+    # padrão: nunca abaixo do limite por agente do lote (senão as vagas do batch esperam o pool)
+    return _get_int_env("AGENT_POOL_SIZE", max(8, get_batch_agent_concurrency()[0]), minimum=1)
+
+
+def _get_limits_env(name: str, minimum: int = 1) -> dict[str, int]:
+    # formato: nome:valor,nome:valor (ex: pesquisador:4,educador:2)
+    raw = (os.getenv(name) or "").strip()
+    out: dict[str, int] = {}
+    for item in raw.split(","):
+        nome, _, valor = item.partition(":")
+        try:
+            out[nome.strip()] = max(minimum, int(valor))
+        except Exception:
+            continue
+    return out
+
+
+def get_router_pool_size() -> int:
+    """Instâncias do router = chamadas de roteamento LLM simultâneas por worker."""
+    # padrão: nunca abaixo do limite do router no lote (BATCH_AGENT_LIMITS=router:N)
+    padrao, limites = get_batch_agent_concurrency()
+    return _get_int_env("ROUTER_POOL_SIZE", max(16, limites.get("router", padrao)), minimum=1)
+
+
+def get_agent_pool_overrides() -> dict[str, int]:
+    return _get_limits_env("AGENT_POOL_SIZES")
+
+
+def get_agent_pool_timeout() -> float:
+    return float(_get_int_env("AGENT_POOL_TIMEOUT_S", 60, minimum=1))
+
+
+def get_agent_timeout() -> Optional[float]:
+    """Tempo máximo de execução de um agente (AGENT_TIMEOUT_S; 0 = sem limite)."""
+    return float(_get_int_env("AGENT_TIMEOUT_S", 0, minimum=0)) or None
+
+
+def get_agent_timeouts() -> dict[str, int]:
+    """Timeout por agente (AGENT_TIMEOUTS=pesquisador:90,educador:30); sobrepõe o do registro."""
+    return _get_limits_env("AGENT_TIMEOUTS")
+
+
+def get_agent_pool_warmup() -> bool:
+    return _get_bool_env("AGENT_POOL_WARMUP", True)
+
+
+def get_http_pool_limits() -> dict[str, float]:
+    return {
+        "max_connections": _get_int_env("HTTP_MAX_CONNECTIONS", 100, minimum=1),
+        "max_keepalive_connections": _get_int_env("HTTP_MAX_KEEPALIVE", 20, minimum=0),
+        "keepalive_expiry": float(_get_int_env("HTTP_KEEPALIVE_EXPIRY_S", 30, minimum=1)),
+        "timeout": float(_get_int_env("HTTP_TIMEOUT_S", 120, minimum=1)),
+    }
+
+
+def get_routing_cache_size() -> int:
+    return _get_int_env("ROUTING_CACHE_SIZE", 4096, minimum=0)
+
+
+def get_routing_cache_ttl() -> float:
+    return float(_get_int_env("ROUTING_CACHE_TTL_S", 3600, minimum=1))
+
+
+def get_single_flight() -> bool:
+    """Perguntas idênticas simultâneas compartilham o mesmo roteamento e a mesma execução."""
+    return _get_bool_env("SINGLE_FLIGHT", True)
+
+
+def get_speculative_execution() -> bool:
+    """Executa o agente sugerido pela heurística em paralelo ao router LLM (desligado por padrão)."""
+    return _get_bool_env("SPECULATIVE_EXECUTION", False)
+
+
+def get_batch_max_items() -> int:
+    return _get_int_env("BATCH_MAX_ITEMS", 1000, minimum=1)
+
+
+def get_batch_agent_concurrency() -> tuple[int, dict[str, int]]:
+    return _get_int_env("BATCH_AGENT_CONCURRENCY", 4, minimum=1), _get_limits_env("BATCH_AGENT_LIMITS")
+
+
+def get_batch_provider_concurrency() -> tuple[int, dict[str, int]]:
+    return _get_int_env("BATCH_PROVIDER_CONCURRENCY", 16, minimum=1), _get_limits_env("BATCH_PROVIDER_LIMITS")
+
+
+def get_log_writer_config() -> dict[str, Any]:
+    overflow = (os.getenv("LOG_OVERFLOW") or "block").strip().lower()
+    return {
+        "async_mode": _get_bool_env("LOG_ASYNC", True),
+        "queue_size": _get_int_env("LOG_QUEUE_SIZE", 10000, minimum=1),
+        "flush_batch": _get_int_env("LOG_FLUSH_BATCH", 256, minimum=1),
+        "flush_interval_s": _get_int_env("LOG_FLUSH_INTERVAL_MS", 500, minimum=1) / 1000,
+        "overflow": overflow if overflow in ("block", "drop") else "block",
+        # Markdown fora do caminho quente: gerado sob demanda por scripts/gerar_markdown.py
+        "write_markdown": _get_bool_env("LOG_MARKDOWN", False),
+    }
+
+
+def get_log_segment_config() -> Optional[dict[str, Any]]:
+    """
+    Configuração dos segmentos rotativos do log JSONL (None = arquivo único legado).
+    """
+    if not _get_bool_env("LOG_SEGMENTS", True):
+        return None
+    rotacao = (os.getenv("LOG_SEGMENT_ROTATION") or "hour").strip().lower()
+    retencao = _get_int_env("LOG_RETENTION_DAYS", 30, minimum=0)
+    compactar = _get_int_env("LOG_COMPRESS_AFTER_H", 24, minimum=0)
+    return {
+        "rotacao": rotacao if rotacao in ("hour", "day") else "hour",
+        "max_bytes": _get_int_env("LOG_SEGMENT_MAX_MB", 64, minimum=1) * 1024 * 1024,
+        "retencao_dias": retencao or None,
+        "compactar_apos_h": compactar or None,
+    }
+
+
+def get_log_session_index() -> bool:
+    return _get_bool_env("LOG_SESSION_INDEX", True)
+
+
+def get_log_worker_id() -> Optional[str]:
+    """
+    Identificador do worker para os arquivos de log por processo (None = processo único).
+    LOG_PER_WORKER: "auto" (padrão: liga quando o processo foi criado pelo supervisor
+    do uvicorn, ex: --workers N), "1" ou "0". Sob o gunicorn (fork), use "1".
+    """
+    modo = (os.getenv("LOG_PER_WORKER") or "auto").strip().lower()
+    if modo == "auto":
+        ativo = multiprocessing.parent_process() is not None
+    else:
+        ativo = modo in ("1", "true", "yes", "y")
+    return str(os.getpid()) if ativo else None
+
+
+def get_log_backend() -> str:
+    """Backend dos logs cognitivos: "jsonl" (padrão) ou "sqlite"."""
+    backend = (os.getenv("LOG_BACKEND") or "jsonl").strip().lower()
+    return backend if backend in ("jsonl", "sqlite") else "jsonl"
+
+
+def get_log_sqlite_path() -> Optional[str]:
+    return (os.getenv("LOG_SQLITE_PATH") or "").strip() or None
+
+
+def get_search_backend() -> str:
+    """Backend da busca web do pesquisador: "tavily" (padrão) ou "local" (offline, determinístico)."""
+    backend = (os.getenv("SEARCH_BACKEND") or "tavily").strip().lower()
+    return backend if backend in ("tavily", "local") else "tavily"
+
+
+def get_search_config() -> dict[str, Any]:
+    """
+    Backend e cache persistente (SQLite) da busca web; SEARCH_CACHE_TTL_S=0 desativa o cache.
+    TAVILY_BASE_URL aponta o cliente Tavily para outro servidor (ex: stub de carga).
+    """
+    ttl_s = _get_int_env("SEARCH_CACHE_TTL_S", 21600, minimum=0)
+    if not _get_bool_env("SEARCH_CACHE", True):
+        ttl_s = 0
+    return {
+        "backend": get_search_backend(),
+        "cache_path": (os.getenv("SEARCH_CACHE_PATH") or "").strip() or None,
+        "ttl_s": float(ttl_s),
+        "tavily_base_url": (os.getenv("TAVILY_BASE_URL") or "").strip() or None,
+    }
+
+
+def get_response_cache_config() -> dict[str, Any]:
+    """
+    Cache de respostas dos agentes (desligado por padrão).
+    TTL por agente em RESPONSE_CACHE_TTLS (ex: educador:86400,pesquisador:0); 0 desativa o agente.
+    Sobrepõe o `cache_ttl_s` declarado no registro de agentes.
+    """
+    ttl_por_agente = _get_limits_env("RESPONSE_CACHE_TTLS", minimum=0)
+    ativo = _get_bool_env("RESPONSE_CACHE", False)
+    return {
+        "max_bytes": _get_int_env("RESPONSE_CACHE_MAX_MB", 64, minimum=0) * 1024 * 1024 if ativo else 0,
+        "ttl_padrao_s": float(_get_int_env("RESPONSE_CACHE_TTL_S", 3600, minimum=0)),
+        "ttl_por_agente": ttl_por_agente,
+    }
+
+
+def get_session_memory_config() -> dict[str, Any]:
+    """
+    Memória de sessão do /run (header X-Session-Id): turnos recentes + resumo rolante,
+    dentro de SESSION_MEMORY_TOKENS. SESSION_MEMORY=0 volta a executar cada turno do zero.
+    """
+    ativo = _get_bool_env("SESSION_MEMORY", True)
+    return {
+        "orcamento_tokens": _get_int_env("SESSION_MEMORY_TOKENS", 2000, minimum=0),
+        "max_turnos": _get_int_env("SESSION_MEMORY_TURNS", 6, minimum=1),
+        "max_sessoes": _get_int_env("SESSION_MEMORY_MAX_SESSIONS", 10000, minimum=0) if ativo else 0,
+        "max_bytes": _get_int_env("SESSION_MEMORY_MAX_MB", 64, minimum=1) * 1024 * 1024,
+        "ttl_s": float(_get_int_env("SESSION_MEMORY_TTL_S", 3600, minimum=1)),
+    }
+
+
+def _get_semantic_cache_config(prefixo: str, ativo_padrao: bool, limiar_padrao: float) -> dict[str, Any]:
+    ativo = _get_bool_env(f"SEMANTIC_{prefixo}_CACHE", ativo_padrao)
+    return {
+        "capacidade": _get_int_env("SEMANTIC_CACHE_SIZE", 10000, minimum=0) if ativo else 0,
+        "dim": _get_int_env("SEMANTIC_CACHE_DIM", 128, minimum=16),
+        "limiar": _get_float_env(f"SEMANTIC_{prefixo}_THRESHOLD", limiar_padrao, minimum=0.0, maximum=1.0),
+    }
+
+
+def get_semantic_routing_cache_config() -> dict[str, Any]:
+    """
+    Cache semântico na frente do router (desligado por padrão). O vetor de n-gramas é dominado
+    pelas palavras do tema: pedidos do mesmo assunto com intenções diferentes ("pesquise as
+    tendências de X" / "crie um roteiro sobre as tendências de X") chegam a ~0.68.
+    """
+    return {**_get_semantic_cache_config("ROUTING", False, 0.9), "ttl_s": get_routing_cache_ttl()}
+
+
+def get_semantic_answer_cache_config() -> dict[str, Any]:
+    """Cache semântico de respostas (desligado por padrão; TTL por agente vem do cache de respostas)."""
+    return _get_semantic_cache_config("ANSWER", False, 0.9)
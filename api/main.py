@@ -1,24 +1,139 @@
 # api/main.py
-from fastapi import FastAPI, HTTPException, Header, Depends, Query
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, Any
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import nullcontext
+from typing import Optional, Any, AsyncIterator
 import os
+import asyncio
 import json
-from pathlib import Path
+import threading
+import time
+import uuid
+
+from api.bootstrap_runtime import (
+    load_env,
+    validate_keys,
+    get_cors_origins,
+    get_max_input_chars,
+    get_agent_pool_size,
+    get_agent_pool_overrides,
+    get_router_pool_size,
+    get_agent_pool_timeout,
+    get_agent_pool_warmup,
+    get_agent_timeout,
+    get_agent_timeouts,
+    get_http_pool_limits,
+    get_routing_cache_size,
+    get_routing_cache_ttl,
+    get_single_flight,
+    get_speculative_execution,
+    get_batch_max_items,
+    get_batch_agent_concurrency,
+    get_batch_provider_concurrency,
+    get_log_writer_config,
+    get_log_segment_config,
+    get_log_session_index,
+    get_log_worker_id,
+    get_log_backend,
+    get_log_sqlite_path,
+    get_response_cache_config,
+    get_semantic_routing_cache_config,
+    get_semantic_answer_cache_config,
+    get_search_config,
+    get_session_memory_config,
+)
+from api.schemas import RouteRequest, RouteResponse, BatchRequest, BatchResponse, BatchItemResult
+from tools.tools_logs_cognitivos import CognitiveLogger, ensure_logs_dir
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import SegmentStore
+from tools.tools_logs_sqlite import SQLiteEventStore
+from tools.tools_cache import CacheRespostas, LRUCacheTTL, normalizar_chave
+from tools.tools_cache_semantico import CacheSemantico
+from tools.tools_busca_web import configurar_busca, estatisticas_busca, frescor_atual, frescor_busca
+from tools.tools_concorrencia import LimitadorConcorrencia, SingleFlight, slots
+from tools.tools_memoria_sessao import MemoriaSessoes, com_contexto, estimar_tokens
+from tools.tools_metricas import REGISTRO, LATENCIA_ESTAGIO, Cronometro, MiddlewareMetricasHTTP
+
+from agents.agente_orquestrador import (
+    agentes_carregados,
+    carregar_agentes,
+    decidir_agente_llm_com_origem_async,
+    executar_agente_query_async,
+    executar_agente_stream,
+    palpite_heuristico,
+)
+from agents.registro_agentes import config_por_agente, descrever_agentes, provedores_do_agente
+from agents.conexoes_http import definir_limites_http, estatisticas_http, fechar_pool_http, garantir_pool_http
+from agents.pool_agentes import configurar_pools, aquecer_pools, estatisticas_pools
 
-from api.bootstrap_runtime import load_env, validate_keys, get_cors_origins, get_max_input_chars
-from api.schemas import RouteRequest, RouteResponse
-from tools.tools_logs_cognitivos import CognitiveLogger
+app = FastAPI(title="Sistema Multiagente (Agno)", version="0.2.0")
+app.add_middleware(MiddlewareMetricasHTTP)
 
-from agents.agente_orquestrador import decidir_agente_llm, executar_agente_query
 
-app = FastAPI(title="Sistema Multiagente (Agno)", version="0.2.0")
-logger = CognitiveLogger()
+def _criar_logger() -> CognitiveLogger:
+    logs_dir = ensure_logs_dir()
+    # vários workers: segmentos, manifesto e Markdown (LOG_MARKDOWN=1) por processo (sem disputa entre eles)
+    worker = get_log_worker_id()
+    md_path = logs_dir / f"cognitive_log-w{worker}.md" if worker else None
+    if get_log_backend() == "sqlite":
+        # o SQLite (WAL) já coordena vários processos no mesmo banco
+        db = SQLiteEventStore(get_log_sqlite_path() or logs_dir / "cognitive_log.db")
+        return CognitiveLogger(**get_log_writer_config(), md_path=md_path, store=db)
+
+    seg_cfg = get_log_segment_config()
+    store = SegmentStore(logs_dir / "segments", worker=worker, **seg_cfg) if seg_cfg is not None else None
+    index = SessionIndex(logs_dir, logs_dir / "segments" / "index") if store and get_log_session_index() else None
+    return CognitiveLogger(**get_log_writer_config(), md_path=md_path, segment_store=store, session_index=index)
+
+
+logger = _criar_logger()
 
 # Configs
 MAX_INPUT_CHARS = get_max_input_chars()
 CORS_ORIGINS = get_cors_origins()
 
+# Cache de roteamento: pergunta normalizada -> agente
+routing_cache = LRUCacheTTL(maxsize=get_routing_cache_size(), ttl_s=get_routing_cache_ttl())
+
+# Cache de respostas: (agente, pergunta normalizada) -> saída (opcional, limitado por bytes)
+# TTL por agente: o declarado no registro, sobreposto por RESPONSE_CACHE_TTLS
+_response_cache_cfg = get_response_cache_config()
+response_cache = CacheRespostas(
+    **{**_response_cache_cfg, "ttl_por_agente": {**config_por_agente("cache_ttl_s"), **_response_cache_cfg["ttl_por_agente"]}}
+)
+
+# Caches semânticos (paráfrases): atrás dos caches exatos, antes do LLM
+semantic_routing_cache = CacheSemantico(**get_semantic_routing_cache_config())
+semantic_answer_cache = CacheSemantico(**get_semantic_answer_cache_config())
+
+# Memória de sessão do /run (X-Session-Id): histórico compacto dentro de um orçamento de tokens
+memoria_sessoes = MemoriaSessoes(**get_session_memory_config())
+
+# Perguntas idênticas em andamento compartilham uma única chamada (roteamento e execução)
+voos_roteamento = SingleFlight(ativo=get_single_flight())
+voos_execucao = SingleFlight(ativo=voos_roteamento.ativo)
+
+# Timeout de execução por agente (registro, sobreposto por AGENT_TIMEOUTS; padrão AGENT_TIMEOUT_S)
+AGENT_TIMEOUT_S = get_agent_timeout()
+TIMEOUTS_AGENTE = {**config_por_agente("timeout_s"), **get_agent_timeouts()}
+
+# Execução especulativa no /run: agente da heurística roda junto com o router LLM
+SPECULATIVE_EXECUTION = get_speculative_execution()
+
+# Limites de concorrência do /run/batch (por agente e por provedor)
+BATCH_MAX_ITEMS = get_batch_max_items()
+batch_limites_agentes = LimitadorConcorrencia(*get_batch_agent_concurrency())
+batch_limites_provedores = LimitadorConcorrencia(*get_batch_provider_concurrency())
+
+# Métricas por agente (as de estágio e HTTP ficam em tools_metricas)
+LATENCIA_AGENTE = REGISTRO.histograma("agnos_agent_duration_seconds", "Duração da execução por agente", ["agent"])
+EXECUCOES_AGENTE = REGISTRO.contador("agnos_agent_runs_total", "Execuções de agente por resultado", ["agent", "outcome"])
+COALESCIDAS = REGISTRO.contador("agnos_coalesced_calls_total", "Chamadas que aproveitaram uma execução idêntica em andamento", ["op"])
+ESPECULACOES = REGISTRO.contador("agnos_speculation_total", "Execuções especulativas por resultado (hit = router concordou)", ["outcome"])
+ESPECULACAO_ECONOMIA = REGISTRO.contador("agnos_speculation_saved_seconds_total", "Latência economizada por especulações confirmadas")
+ESPECULACAO_DESPERDICIO = REGISTRO.contador("agnos_speculation_wasted_seconds_total", "Tempo de agente descartado em especulações canceladas")
+
 
 def require_api_key(x_api_key: Optional[str] = Header(default=None)) -> None:
     """
@@ -43,6 +158,260 @@ def enforce_input_limits(pergunta: str) -> None:
         )
 
 
+async def buscar_semantico(cache: CacheSemantico, pergunta: str, escopo: str = "") -> Optional[Any]:
+    """Busca no cache semântico fora do event loop (vetorização + produto escalar levam ms com muitas entradas)."""
+    if not len(cache):
+        return None
+    return await asyncio.to_thread(cache.get, pergunta, escopo)
+
+
+async def rotear_do_cache(pergunta: str) -> Optional[tuple[str, str]]:
+    """Roteamento só pelos caches (exato, depois semântico): (agente, "hit"|"semantic") ou None."""
+    chave = normalizar_chave(pergunta)
+    agente = routing_cache.get(chave)
+    if agente is not None:
+        return agente, "hit"
+
+    agente = await buscar_semantico(semantic_routing_cache, pergunta)
+    if agente is not None:
+        routing_cache.set(chave, agente)
+        return agente, "semantic"
+    return None
+
+
+async def rotear_com_llm(pergunta: str) -> tuple[str, str]:
+    """Chama o router LLM e alimenta os caches. Decisões de fallback (router indisponível) não são cacheadas."""
+    chave = normalizar_chave(pergunta)
+    with Cronometro(LATENCIA_ESTAGIO, stage="routing_llm"):
+        (agente, origem), compartilhado = await voos_roteamento.executar(
+            chave, lambda: decidir_agente_llm_com_origem_async(pergunta)
+        )
+    if compartilhado:
+        COALESCIDAS.inc(op="routing")
+    if origem != "fallback":
+        routing_cache.set(chave, agente)
+        semantic_routing_cache.set(pergunta, agente)
+    return agente, "miss"
+
+
+async def decidir_agente(pergunta: str) -> tuple[str, str]:
+    """
+    Roteamento com caches na frente do LLM.
+    Retorna (agente, routing_cache): "hit", "semantic" ou "miss".
+    """
+    return await rotear_do_cache(pergunta) or await rotear_com_llm(pergunta)
+
+
+def _registrar_execucao(agente: str, t0: float, resultado: str) -> float:
+    """Observa a execução do agente (estágio + por agente) e retorna a duração em ms."""
+    segundos = time.perf_counter() - t0
+    LATENCIA_ESTAGIO.observar(segundos, stage="agent")
+    LATENCIA_AGENTE.observar(segundos, agent=agente)
+    EXECUCOES_AGENTE.inc(agent=agente, outcome=resultado)
+    return segundos * 1000
+
+
+async def _executar_e_registrar(agente: str, pergunta: str) -> str:
+    t0 = time.perf_counter()
+    timeout_s = TIMEOUTS_AGENTE.get(agente, AGENT_TIMEOUT_S)
+    try:
+        saida = await asyncio.wait_for(executar_agente_query_async(agente, pergunta), timeout_s)
+    except asyncio.TimeoutError:
+        _registrar_execucao(agente, t0, "timeout")
+        raise TimeoutError(f"Agente '{agente}' excedeu o tempo limite de {timeout_s:g}s.") from None
+    except Exception:
+        _registrar_execucao(agente, t0, "error")
+        raise
+    _registrar_execucao(agente, t0, "ok")
+    return saida
+
+
+async def _stream_com_timeout(agente: str, pergunta: str) -> AsyncIterator[str]:
+    """
+    executar_agente_stream com o timeout do agente valendo para o stream inteiro
+    (prazo único, aplicado a cada trecho com wait_for). Sem timeout, sem prazo.
+    """
+    timeout_s = TIMEOUTS_AGENTE.get(agente, AGENT_TIMEOUT_S)
+    loop = asyncio.get_running_loop()
+    prazo = loop.time() + timeout_s if timeout_s else None
+    trechos = executar_agente_stream(agente, pergunta).__aiter__()
+    try:
+        while True:
+            restante = None if prazo is None else max(0.0, prazo - loop.time())
+            try:
+                delta = await asyncio.wait_for(trechos.__anext__(), restante)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Agente '{agente}' excedeu o tempo limite de {timeout_s:g}s.") from None
+            yield delta
+    finally:
+        aclose = getattr(trechos, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def executar_agente_medido(agente: str, pergunta: str) -> tuple[str, float]:
+    """
+    executar_agente_query_async com tempo monotônico; retorna (saida, duration_ms).
+    Chamadas simultâneas com o mesmo agente + pergunta normalizada compartilham a execução
+    (as métricas do agente contam uma vez; duration_ms é a espera de cada chamador).
+    """
+    t0 = time.perf_counter()
+    saida, compartilhado = await voos_execucao.executar(
+        (agente, normalizar_chave(pergunta), frescor_atual()), lambda: _executar_e_registrar(agente, pergunta)
+    )
+    if compartilhado:
+        COALESCIDAS.inc(op="agent")
+    return saida, (time.perf_counter() - t0) * 1000
+
+
+async def buscar_resposta_em_cache(agente: str, pergunta: str) -> tuple[Optional[str], str]:
+    """Cache de respostas exato e, se ligado, semântico (mesmo agente). Retorna (saida, "hit"|"semantic"|...)."""
+    if not response_cache.ativo(agente):
+        return None, "off"
+    if frescor_atual() is not None and "tavily" in provedores_do_agente(agente):
+        return None, "miss"  # frescor da busca pedido: a resposta em cache pode ser mais velha
+    saida = response_cache.get(agente, pergunta)
+    if saida is not None:
+        return saida, "hit"
+    saida = await buscar_semantico(semantic_answer_cache, pergunta, escopo=agente)
+    if saida is not None:
+        return saida, "semantic"
+    return None, "miss"
+
+
+def guardar_resposta(agente: str, pergunta: str, saida: str) -> str:
+    """
+    Guarda a resposta de uma execução bem-sucedida do agente nos caches de respostas.
+    Resposta vazia não é guardada (seria servida a toda pergunta igual até o TTL).
+    """
+    if not response_cache.ativo(agente):
+        return "off"
+    if not saida or not saida.strip():
+        return "miss"
+    response_cache.set(agente, pergunta, saida)
+    semantic_answer_cache.set(pergunta, saida, escopo=agente, ttl_s=response_cache.ttl(agente))
+    return "miss"
+
+
+async def responder(
+    session_id: str,
+    agente: str,
+    pergunta: str,
+    metadata: Optional[dict[str, Any]] = None,
+    limites: Any = None,
+    contexto: str = "",
+    em_cache: Optional[tuple[Optional[str], str]] = None,
+) -> tuple[str, str]:
+    """
+    Executa o agente (ou responde do cache de respostas), registrando os eventos.
+    - `limites`: contexto async adquirido só quando o agente de fato executa (ex: slots do batch)
+    - `contexto`: histórico da sessão enviado ao agente junto com a pergunta (a resposta
+      depende dele, então o cache de respostas fica de fora)
+    - `em_cache`: resultado de `buscar_resposta_em_cache` já feito pelo chamador (não repete a busca)
+    Retorna (saida, cache): "hit", "semantic", "miss" ou "off" (cache desativado para o agente).
+    """
+    if em_cache is None:
+        em_cache = await buscar_resposta_em_cache(agente, pergunta) if not contexto else (None, "off")
+    saida, cache = em_cache
+    if saida is not None:
+        EXECUCOES_AGENTE.inc(agent=agente, outcome="cache_hit")
+        await logger.alog(session_id=session_id, event_type="response_cache_hit", agent=agente, action="respond", input_text=pergunta, output_text=saida, metadata={**(metadata or {}), "cache": cache})
+        return saida, cache
+
+    async with limites or nullcontext():
+        await logger.alog(session_id=session_id, event_type="agent_start", agent=agente, action="execute", input_text=pergunta, metadata=metadata)
+        saida, agente_ms = await executar_agente_medido(agente, com_contexto(pergunta, contexto))
+    await logger.alog(session_id=session_id, event_type="agent_end", agent=agente, action="respond", input_text=pergunta, output_text=saida, metadata=metadata, duration_ms=agente_ms)
+
+    return saida, guardar_resposta(agente, pergunta, saida) if not contexto else "off"
+
+
+def _descartar_resultado(tarefa: "asyncio.Task[Any]") -> None:
+    # consome a exceção de uma tarefa cancelada/descartada (evita "exception was never retrieved")
+    if not tarefa.cancelled():
+        tarefa.exception()
+
+
+async def rotear_e_responder(session_id: str, pergunta: str, contexto: str = "") -> tuple[str, str, str, str, Optional[str]]:
+    """
+    Roteamento + execução do /run. Com SPECULATIVE_EXECUTION, se o roteamento precisar do LLM
+    e a heurística tiver um palpite, o agente do palpite começa junto com o router:
+    - router concorda: o resultado especulativo é usado (economiza ~min(routing, agente))
+    - router discorda: a especulação é cancelada e o agente certo executa
+    O roteamento usa só a pergunta atual; `contexto` (memória da sessão) vai para o agente.
+    Retorna (agente, routing_cache, saida, cache, especulacao): especulacao = "hit", "miss" ou None.
+    """
+    roteado = await rotear_do_cache(pergunta)
+    palpite = None
+    # buscas no cache de respostas já feitas (agente -> resultado), repassadas a `responder`
+    em_cache: dict[str, tuple[Optional[str], str]] = {}
+    if roteado is None and SPECULATIVE_EXECUTION:
+        palpite = palpite_heuristico(pergunta)
+        if palpite and not contexto:
+            em_cache[palpite] = await buscar_resposta_em_cache(palpite, pergunta)
+            if em_cache[palpite][0] is not None:
+                palpite = None  # resposta já em cache: especular não economiza nada
+
+    if palpite is None:
+        with Cronometro(LATENCIA_ESTAGIO, stage="routing") as t_rota:
+            agente, routing_cache_status = roteado or await rotear_com_llm(pergunta)
+        await logger.alog(session_id=session_id, event_type="routing_decision", agent="router-cognitivo", action="route", input_text=pergunta, output_text=agente, metadata={"routing_cache": routing_cache_status}, duration_ms=t_rota.ms)
+        saida, cache = await responder(session_id, agente, pergunta, contexto=contexto, em_cache=em_cache.get(agente))
+        return agente, routing_cache_status, saida, cache, None
+
+    # agent_start sai antes do roteamento: é quando o agente do palpite começa de fato
+    await logger.alog(session_id=session_id, event_type="agent_start", agent=palpite, action="execute", input_text=pergunta, metadata={"speculative": True})
+    t0 = time.perf_counter()
+    tarefa = asyncio.create_task(executar_agente_medido(palpite, com_contexto(pergunta, contexto)))
+    tarefa.add_done_callback(_descartar_resultado)
+    try:
+        with Cronometro(LATENCIA_ESTAGIO, stage="routing") as t_rota:
+            agente, routing_cache_status = await rotear_com_llm(pergunta)
+    except BaseException:
+        tarefa.cancel()
+        raise
+    await logger.alog(session_id=session_id, event_type="routing_decision", agent="router-cognitivo", action="route", input_text=pergunta, output_text=agente, metadata={"routing_cache": routing_cache_status, "speculative_guess": palpite}, duration_ms=t_rota.ms)
+
+    if agente != palpite:
+        tarefa.cancel()
+        desperdicio_s = time.perf_counter() - t0
+        ESPECULACOES.inc(outcome="miss")
+        ESPECULACAO_DESPERDICIO.inc(desperdicio_s)
+        await logger.alog(session_id=session_id, event_type="speculation_cancelled", agent=palpite, action="execute", input_text=pergunta, metadata={"speculative": True, "routed_to": agente}, duration_ms=desperdicio_s * 1000)
+        saida, cache = await responder(session_id, agente, pergunta, contexto=contexto)
+        return agente, routing_cache_status, saida, cache, "miss"
+
+    saida, agente_ms = await tarefa
+    # sequencial levaria routing + agente; especulando, levou o tempo decorrido desde o início
+    economia_s = max(0.0, (t_rota.ms + agente_ms) / 1000 - (time.perf_counter() - t0))
+    ESPECULACOES.inc(outcome="hit")
+    ESPECULACAO_ECONOMIA.inc(economia_s)
+    await logger.alog(session_id=session_id, event_type="agent_end", agent=agente, action="respond", input_text=pergunta, output_text=saida, metadata={"speculative": True, "saved_ms": round(economia_s * 1000, 1)}, duration_ms=agente_ms)
+    cache = guardar_resposta(agente, pergunta, saida) if not contexto else "off"
+    return agente, routing_cache_status, saida, cache, "hit"
+
+
+# Aquecimento em segundo plano (agno + agentes + pools): a porta abre antes dele terminar
+aquecimento: dict[str, Any] = {"state": "disabled", "duration_ms": None, "error": None}
+
+
+def aquecer_em_segundo_plano() -> None:
+    aquecimento["state"] = "running"
+    t0 = time.perf_counter()
+    try:
+        garantir_pool_http()
+        carregar_agentes()
+        # poucas instâncias por pool (construir um Agent custa ~90ms); as demais sob demanda
+        aquecer_pools(2)
+        aquecimento["state"] = "done"
+    except Exception as e:
+        # os agentes continuam carregando sob demanda no primeiro uso
+        aquecimento.update(state="failed", error=f"{type(e).__name__}: {e}")
+    aquecimento["duration_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+
 @app.on_event("startup")
 def startup():
     load_env()
@@ -58,10 +427,89 @@ def startup():
             allow_headers=["*"],
         )
 
+    # Pool HTTP keep-alive compartilhado por todos os OpenAIChat (instalado no primeiro uso)
+    definir_limites_http(**get_http_pool_limits())
+
+    # Busca web do pesquisador (backend + cache persistente de resultados)
+    busca_cfg = get_search_config()
+    configurar_busca(
+        busca_cfg["backend"],
+        cache_path=busca_cfg["cache_path"] or ensure_logs_dir() / "search_cache.db",
+        ttl_s=busca_cfg["ttl_s"],
+        tavily_base_url=busca_cfg["tavily_base_url"],
+    )
+
+    # Pools de agentes: instâncias reaproveitadas entre requests
+    # (os módulos dos agentes são importados sob demanda; a config vale para eles)
+    # tamanho por agente: `max_concorrencia` do registro, sobreposto por AGENT_POOL_SIZES;
+    # o router (fora do registro) tem o próprio ROUTER_POOL_SIZE
+    configurar_pools(
+        get_agent_pool_size(),
+        overrides={**config_por_agente("max_concorrencia"), **get_agent_pool_overrides(), "router": get_router_pool_size()},
+        acquire_timeout=get_agent_pool_timeout(),
+    )
+    if get_agent_pool_warmup():
+        aquecimento["state"] = "pending"
+        threading.Thread(target=aquecer_em_segundo_plano, name="aquecimento-agentes", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await fechar_pool_http()
+    # garante que os eventos ainda na fila do logger cheguem ao disco
+    await asyncio.to_thread(logger.close)
+
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "max_input_chars": MAX_INPUT_CHARS, "cors_origins": CORS_ORIGINS}
+    return {"status": "ok", "warmup": aquecimento["state"], "max_input_chars": MAX_INPUT_CHARS, "cors_origins": CORS_ORIGINS}
+
+
+def _estatisticas_especulacao() -> dict[str, Any]:
+    hits, misses = ESPECULACOES.valor(outcome="hit"), ESPECULACOES.valor(outcome="miss")
+    return {
+        "enabled": SPECULATIVE_EXECUTION,
+        "hits": int(hits),
+        "misses": int(misses),
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "saved_ms_total": round(ESPECULACAO_ECONOMIA.valor() * 1000, 1),
+        "wasted_ms_total": round(ESPECULACAO_DESPERDICIO.valor() * 1000, 1),
+    }
+
+
+@app.get("/stats", dependencies=[Depends(require_api_key)])
+def stats():
+    return {
+        "agent_pools": estatisticas_pools(),
+        "agents": {
+            "registry": descrever_agentes(),
+            "loaded": agentes_carregados(),
+            "timeouts_s": {**{n: AGENT_TIMEOUT_S for n in descrever_agentes()}, **TIMEOUTS_AGENTE},
+        },
+        "warmup": dict(aquecimento),
+        "http": estatisticas_http(),
+        "routing_cache": routing_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "session_memory": memoria_sessoes.stats(),
+        "speculation": _estatisticas_especulacao(),
+        "search": estatisticas_busca(),
+        "single_flight": {"routing": voos_roteamento.stats(), "agents": voos_execucao.stats()},
+        "semantic_cache": {
+            "routing": semantic_routing_cache.stats(),
+            "answers": semantic_answer_cache.stats(),
+        },
+        "logger": logger.stats(),
+        "batch": {
+            "agents": batch_limites_agentes.stats(),
+            "providers": batch_limites_provedores.stats(),
+        },
+    }
+
+
+@app.get("/metrics", dependencies=[Depends(require_api_key)])
+def metrics():
+    """Métricas em formato de texto do Prometheus (taxa, erros, em andamento, latências)."""
+    return PlainTextResponse(REGISTRO.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/")
@@ -70,12 +518,12 @@ def root():
 
 
 @app.post("/route", response_model=RouteResponse, dependencies=[Depends(require_api_key)])
-def route(req: RouteRequest, x_session_id: Optional[str] = Header(default=None)):
+async def route(req: RouteRequest, x_session_id: Optional[str] = Header(default=None)):
     session_id = x_session_id or logger.new_session_id()
     enforce_input_limits(req.pergunta)
 
     try:
-        logger.log(
+        await logger.alog(
             session_id=session_id,
             event_type="routing_start",
             agent="api",
@@ -84,77 +532,241 @@ def route(req: RouteRequest, x_session_id: Optional[str] = Header(default=None))
             metadata={"endpoint": "/route"},
         )
 
-        agente = decidir_agente_llm(req.pergunta)
+        with Cronometro(LATENCIA_ESTAGIO, stage="routing") as t_rota:
+            agente, routing_cache_status = await decidir_agente(req.pergunta)
 
-        logger.log(
+        await logger.alog(
             session_id=session_id,
             event_type="routing_decision",
             agent="router-cognitivo",
             action="route",
             input_text=req.pergunta,
             output_text=agente,
-            metadata={"endpoint": "/route"},
+            metadata={"endpoint": "/route", "routing_cache": routing_cache_status},
+            duration_ms=t_rota.ms,
         )
 
-        return RouteResponse(agente=agente, meta={"modo": "llm-routing", "session_id": session_id})
+        return RouteResponse(
+            agente=agente,
+            meta={"modo": "llm-routing", "session_id": session_id, "routing_cache": routing_cache_status},
+        )
 
     except Exception as e:
-        logger.log(session_id=session_id, event_type="error", agent="api", action="route", input_text=req.pergunta, output_text=str(e))
+        await logger.alog(session_id=session_id, event_type="error", agent="api", action="route", input_text=req.pergunta, output_text=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/run", response_model=RouteResponse, dependencies=[Depends(require_api_key)])
-def run(req: RouteRequest, x_session_id: Optional[str] = Header(default=None)):
+async def run(
+    req: RouteRequest,
+    response: Response,
+    x_session_id: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+):
+    if accept and "text/event-stream" in accept:
+        return await run_stream(req, x_session_id=x_session_id)
+
     session_id = x_session_id or logger.new_session_id()
     enforce_input_limits(req.pergunta)
+    # só sessões indicadas pelo cliente têm memória (um id novo nunca seria reutilizado)
+    contexto = memoria_sessoes.contexto(session_id) if x_session_id else ""
 
     try:
-        logger.log(session_id=session_id, event_type="request_received", agent="api", action="run", input_text=req.pergunta)
+        await logger.alog(session_id=session_id, event_type="request_received", agent="api", action="run", input_text=req.pergunta)
+
+        with frescor_busca(req.frescor_busca_s):
+            agente, routing_cache_status, saida, cache, especulacao = await rotear_e_responder(session_id, req.pergunta, contexto)
+        response.headers["X-Cache"] = cache.upper()
+        if x_session_id:
+            memoria_sessoes.registrar_turno(session_id, req.pergunta, saida, agente)
 
-        agente = decidir_agente_llm(req.pergunta)
+        meta = {"execucao": "ok", "session_id": session_id, "routing_cache": routing_cache_status, "cache": cache}
+        if especulacao is not None:
+            meta["speculation"] = especulacao
+        if x_session_id and memoria_sessoes.ativa:
+            meta["session_memory_tokens"] = estimar_tokens(contexto)
+        return RouteResponse(agente=agente, saida=saida, meta=meta)
+
+    except Exception as e:
+        await logger.alog(session_id=session_id, event_type="error", agent="api", action="run", input_text=req.pergunta, output_text=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
 
-        logger.log(session_id=session_id, event_type="routing_decision", agent="router-cognitivo", action="route", input_text=req.pergunta, output_text=agente)
 
-        logger.log(session_id=session_id, event_type="agent_start", agent=agente, action="execute", input_text=req.pergunta)
-        saida = executar_agente_query(agente, req.pergunta)
-        logger.log(session_id=session_id, event_type="agent_end", agent=agente, action="respond", input_text=req.pergunta, output_text=saida)
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-        return RouteResponse(agente=agente, saida=saida, meta={"execucao": "ok", "session_id": session_id})
+
+@app.post("/run/stream", dependencies=[Depends(require_api_key)])
+async def run_stream(req: RouteRequest, x_session_id: Optional[str] = Header(default=None)):
+    """
+    Igual a /run, mas em Server-Sent Events:
+    - `routing`: agente escolhido (enviado antes da execução)
+    - `token`: trechos da resposta conforme o agente gera
+    - `done`: session_id e tempos; `error` em caso de falha
+    """
+    session_id = x_session_id or logger.new_session_id()
+    enforce_input_limits(req.pergunta)
+    contexto = memoria_sessoes.contexto(session_id) if x_session_id else ""
+
+    async def eventos() -> AsyncIterator[str]:
+        t0 = time.perf_counter()
+        agente = "api"
+        partes: list[str] = []
+        try:
+            with frescor_busca(req.frescor_busca_s):
+                await logger.alog(session_id=session_id, event_type="request_received", agent="api", action="run", input_text=req.pergunta, metadata={"stream": True})
+
+                with Cronometro(LATENCIA_ESTAGIO, stage="routing") as t_rota:
+                    agente, routing_cache_status = await decidir_agente(req.pergunta)
+                routing_ms = t_rota.ms
+                yield _sse("routing", {"agente": agente, "session_id": session_id, "routing_cache": routing_cache_status})
+
+                await logger.alog(session_id=session_id, event_type="routing_decision", agent="router-cognitivo", action="route", input_text=req.pergunta, output_text=agente, metadata={"routing_cache": routing_cache_status, "stream": True}, duration_ms=routing_ms)
+
+                first_token_ms = None
+                saida, cache = await buscar_resposta_em_cache(agente, req.pergunta) if not contexto else (None, "off")
+                if saida is not None:
+                    # resposta do cache: um único token com o texto inteiro
+                    EXECUCOES_AGENTE.inc(agent=agente, outcome="cache_hit")
+                    await logger.alog(session_id=session_id, event_type="response_cache_hit", agent=agente, action="respond", input_text=req.pergunta, output_text=saida, metadata={"stream": True, "cache": cache})
+                    first_token_ms = (time.perf_counter() - t0) * 1000
+                    yield _sse("token", {"delta": saida})
+                else:
+                    await logger.alog(session_id=session_id, event_type="agent_start", agent=agente, action="execute", input_text=req.pergunta, metadata={"stream": True})
+                    t_agente = time.perf_counter()
+                    try:
+                        async for delta in _stream_com_timeout(agente, com_contexto(req.pergunta, contexto)):
+                            if first_token_ms is None:
+                                first_token_ms = (time.perf_counter() - t0) * 1000
+                            partes.append(delta)
+                            yield _sse("token", {"delta": delta})
+                    except TimeoutError:
+                        _registrar_execucao(agente, t_agente, "timeout")
+                        raise
+                    except Exception:
+                        _registrar_execucao(agente, t_agente, "error")
+                        raise
+                    agente_ms = _registrar_execucao(agente, t_agente, "ok")
+
+                    saida = "".join(partes).strip()
+                    await logger.alog(session_id=session_id, event_type="agent_end", agent=agente, action="respond", input_text=req.pergunta, output_text=saida, metadata={"stream": True}, duration_ms=agente_ms)
+                    cache = guardar_resposta(agente, req.pergunta, saida) if not contexto else "off"
+
+                if x_session_id:
+                    memoria_sessoes.registrar_turno(session_id, req.pergunta, saida, agente)
+                yield _sse(
+                    "done",
+                    {
+                        "agente": agente,
+                        "session_id": session_id,
+                        "cache": cache,
+                        "timings_ms": {
+                            "routing": round(routing_ms, 1),
+                            "first_token": round(first_token_ms, 1) if first_token_ms is not None else None,
+                            "total": round((time.perf_counter() - t0) * 1000, 1),
+                        },
+                    },
+                )
+
+        except Exception as e:
+            await logger.alog(session_id=session_id, event_type="error", agent="api", action="run", input_text=req.pergunta, output_text=str(e), metadata={"stream": True, "agente": agente})
+            yield _sse("error", {"detail": str(e), "session_id": session_id})
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _slots_batch(agente: str):
+    pares = [(batch_limites_agentes, agente)]
+    pares += [(batch_limites_provedores, p) for p in provedores_do_agente(agente)]
+    return slots(*pares)
+
+
+async def _executar_item_batch(batch_id: str, indice: int, item: RouteRequest) -> BatchItemResult:
+    """
+    Executa um item do lote com sessão própria. Erros viram resultado do item (não derrubam o lote).
+    """
+    session_id = logger.new_session_id()
+    meta = {"endpoint": "/run/batch", "batch_id": batch_id, "indice": indice}
+    agente: Optional[str] = None
+    try:
+        enforce_input_limits(item.pergunta)
+        await logger.alog(session_id=session_id, event_type="request_received", agent="api", action="run", input_text=item.pergunta, metadata=meta)
+
+        async with _slots_batch("router"):
+            with Cronometro(LATENCIA_ESTAGIO, stage="routing") as t_rota:
+                agente, routing_cache_status = await decidir_agente(item.pergunta)
+        await logger.alog(session_id=session_id, event_type="routing_decision", agent="router-cognitivo", action="route", input_text=item.pergunta, output_text=agente, metadata={**meta, "routing_cache": routing_cache_status}, duration_ms=t_rota.ms)
+
+        with frescor_busca(item.frescor_busca_s):
+            saida, cache = await responder(session_id, agente, item.pergunta, metadata=meta, limites=_slots_batch(agente))
+        return BatchItemResult(indice=indice, session_id=session_id, agente=agente, saida=saida, cache=cache)
 
     except Exception as e:
-        logger.log(session_id=session_id, event_type="error", agent="api", action="run", input_text=req.pergunta, output_text=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        erro = e.detail if isinstance(e, HTTPException) else str(e)
+        await logger.alog(session_id=session_id, event_type="error", agent="api", action="run", input_text=item.pergunta, output_text=str(erro), metadata=meta)
+        return BatchItemResult(indice=indice, session_id=session_id, agente=agente, erro=str(erro))
+
+
+@app.post("/run/batch", response_model=BatchResponse, dependencies=[Depends(require_api_key)])
+async def run_batch(
+    req: BatchRequest,
+    stream: bool = Query(default=False),
+    accept: Optional[str] = Header(default=None),
+):
+    """
+    Executa um lote de perguntas com concorrência limitada por agente e por provedor.
+    - padrão: resposta única, itens na ordem de entrada
+    - `?stream=true` ou `Accept: application/x-ndjson`: um JSON por linha, conforme os itens terminam
+    """
+    if len(req.itens) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Lote muito grande. Limite: {BATCH_MAX_ITEMS} itens.")
+
+    batch_id = str(uuid.uuid4())
+    tarefas = [asyncio.create_task(_executar_item_batch(batch_id, i, it)) for i, it in enumerate(req.itens)]
+
+    if stream or (accept and "application/x-ndjson" in accept):
+        async def linhas() -> AsyncIterator[str]:
+            try:
+                for proxima in asyncio.as_completed(tarefas):
+                    res = await proxima
+                    yield json.dumps({"batch_id": batch_id, **res.model_dump()}, ensure_ascii=False) + "\n"
+            finally:
+                # cliente desconectou: não deixa itens órfãos rodando
+                for t in tarefas:
+                    t.cancel()
+
+        return StreamingResponse(linhas(), media_type="application/x-ndjson")
+
+    resultados = await asyncio.gather(*tarefas)
+    ok = sum(1 for r in resultados if r.erro is None)
+    return BatchResponse(batch_id=batch_id, count=len(resultados), ok=ok, erros=len(resultados) - ok, itens=list(resultados))
 
 
 # -----------------------------
 # Debug endpoints (MVP)
 # -----------------------------
-def _read_jsonl_lines(path: Path, n: int = 50) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
-    # lê as últimas n linhas sem carregar o arquivo inteiro (MVP simples)
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()[-n:]
-    out = []
-    for ln in lines:
-        ln = ln.strip()
-        if not ln:
-            continue
-        try:
-            out.append(json.loads(ln))
-        except Exception:
-            continue
-    return out
-
-
 @app.get("/logs/last", dependencies=[Depends(require_api_key)])
-def logs_last(n: int = Query(default=50, ge=1, le=500)):
-    data = _read_jsonl_lines(logger.jsonl_path, n=n)
+def logs_last(
+    n: int = Query(default=50, ge=1, le=500),
+    event_type: Optional[str] = None,
+    agent: Optional[str] = None,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+):
+    logger.flush()
+    if event_type or agent or desde or ate:
+        data = logger.consultar(event_type=event_type, agent=agent, desde=desde, ate=ate, n=n)
+    else:
+        data = logger.ultimos(n)
     return {"count": len(data), "items": data}
 
 
 @app.get("/sessions/{session_id}", dependencies=[Depends(require_api_key)])
 def logs_by_session(session_id: str, n: int = Query(default=200, ge=1, le=1000)):
-    items = _read_jsonl_lines(logger.jsonl_path, n=n)
-    filtered = [it for it in items if it.get("session_id") == session_id]
+    logger.flush()
+    filtered = logger.eventos_da_sessao(session_id, n=n)
     return {"session_id": session_id, "count": len(filtered), "items": filtered}
@@ -1,13 +1,36 @@
 # api/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class RouteRequest(BaseModel):
     pergunta: str = Field(..., min_length=1)
+    # idade máxima (s) dos resultados de busca web em cache; 0 força busca nova
+    frescor_busca_s: Optional[float] = Field(default=None, ge=0)
 
 
 class RouteResponse(BaseModel):
     agente: str
     saida: Optional[str] = None
     meta: Optional[Dict[str, Any]] = None
+
+
+class BatchRequest(BaseModel):
+    itens: List[RouteRequest] = Field(..., min_length=1)
+
+
+class BatchItemResult(BaseModel):
+    indice: int
+    session_id: str
+    agente: Optional[str] = None
+    saida: Optional[str] = None
+    erro: Optional[str] = None
+    cache: Optional[str] = None  # "hit" | "miss" | "off" (cache de respostas)
+
+
+class BatchResponse(BaseModel):
+    batch_id: str
+    count: int
+    ok: int
+    erros: int
+    itens: List[BatchItemResult]
@@ -21,7 +21,7 @@ except Exception as e:
 
 from agents.agente_orquestrador import main as orquestrador_main
 
-logger = CognitiveLogger(write_markdown=True)
+logger = CognitiveLogger()
 session_id = logger.new_session_id()
 
 logger.log(
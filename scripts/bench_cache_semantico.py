@@ -0,0 +1,70 @@
+# scripts/bench_cache_semantico.py
+"""
+Latência de busca do cache semântico com N entradas (padrão: 100k).
+
+Uso: python scripts/bench_cache_semantico.py --entradas 100000 --dim 128
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_cache_semantico import CacheSemantico, vetorizar
+
+VERBOS = ["crie", "explique", "planeje", "resuma", "pesquise", "organize", "compare", "avalie", "liste", "revise"]
+TEMAS = ["frações", "fotossíntese", "minha semana", "revolução francesa", "funções afins", "ciclo da água",
+         "estudos de cálculo", "projeto de ciências", "redação do enem", "química orgânica", "geometria plana",
+         "inflação", "mercado de ações", "sistema solar", "mitose", "probabilidade", "literatura brasileira"]
+EXTRAS = ["para iniciantes", "com exemplos", "em 5 passos", "para o 9º ano", "de forma simples", "com exercícios", ""]
+
+
+def pergunta(rnd: random.Random) -> str:
+    return f"{rnd.choice(VERBOS)} {rnd.choice(TEMAS)} {rnd.choice(EXTRAS)} #{rnd.randrange(10**6)}"
+
+
+def percentis(tempos):
+    tempos = sorted(tempos)
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1], tempos[int(len(tempos) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache semântico")
+    parser.add_argument("--entradas", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    cache = CacheSemantico(capacidade=args.entradas, dim=args.dim, limiar=0.8)
+
+    t0 = time.perf_counter()
+    for i in range(args.entradas):
+        cache.set(pergunta(rnd), i)
+    carga_s = time.perf_counter() - t0
+
+    consultas = [pergunta(rnd) for _ in range(args.consultas)]
+    vet_ms, busca_ms = [], []
+    for q in consultas:
+        t = time.perf_counter()
+        vetorizar(q, args.dim)
+        vet_ms.append((time.perf_counter() - t) * 1000)
+        t = time.perf_counter()
+        cache.buscar(q)
+        busca_ms.append((time.perf_counter() - t) * 1000)
+
+    st = cache.stats()
+    print(f"\n🔎 Cache semântico: {st['size']:,} entradas, dim={st['dim']}, matriz={st['matrix_bytes'] / 1024 / 1024:.1f} MB")
+    print(f"Carga: {carga_s:.1f}s ({args.entradas / carga_s:,.0f} inserções/s)")
+    print("Vetorização  p50={:.3f}ms p95={:.3f}ms p99={:.3f}ms".format(*percentis(vet_ms)))
+    print("Busca total  p50={:.3f}ms p95={:.3f}ms p99={:.3f}ms".format(*percentis(busca_ms)))
+    print(f"Acertos (limiar {st['threshold']}): {st['hits']}/{args.consultas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# scripts/bench_carga.py
+"""
+Teste de carga ponta a ponta, offline: sobe o stub da OpenAI/Tavily
+(scripts/stub_llm.py) e a API (uvicorn api.main:app) apontada para ele, e
+dispara /route, /run e /logs/last em níveis de concorrência definidos.
+
+Relata por endpoint e nível: requisições/s, latência p50/p95/p99, erros e o
+crescimento de memória (RSS) do processo da API.
+
+    python scripts/bench_carga.py --niveis 1,8,32 --requisicoes 200
+    python scripts/bench_carga.py --saida baseline.json
+    python scripts/bench_carga.py --baseline baseline.json --tolerancia 0.2   # sai com 1 se regredir
+
+Perguntas são únicas e o cache semântico de roteamento fica desligado por padrão
+(os caches não mascaram o custo do caminho completo); `--repetidas 0.5`
+reaproveita metade das perguntas e `--caches` mantém a configuração de caches do ambiente.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+PERGUNTAS = [
+    "Pesquise as tendências de IA na educação",
+    "Crie uma questão de múltipla escolha sobre fotossíntese",
+    "Me ajude a planejar minha semana de estudos",
+    "Escreva um roteiro curto para Instagram sobre produtividade",
+    "Estou desmotivado com meu trabalho, o que faço?",
+]
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Memória residente do processo (Linux: /proc); None se indisponível."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def esperar_pronto(url: str, processo: subprocess.Popen, timeout_s: float = 60.0) -> None:
+    limite = time.monotonic() + timeout_s
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"processo encerrou antes de ficar pronto ({url})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"timeout esperando {url}")
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))]
+
+
+class Gerador:
+    def __init__(self, repetidas: float, semente: int = 42):
+        self.repetidas = repetidas
+        self.rnd = random.Random(semente)
+        self.n = 0
+
+    def pergunta(self) -> str:
+        base = self.rnd.choice(PERGUNTAS)
+        if self.rnd.random() < self.repetidas:
+            return base
+        self.n += 1
+        return f"{base} (variação {self.n})"
+
+
+async def medir(cliente: httpx.AsyncClient, endpoint: str, concorrencia: int, total: int, gerador: Gerador) -> Dict[str, Any]:
+    latencias: List[float] = []
+    erros = 0
+    fila: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(total):
+        fila.put_nowait(i)
+
+    async def uma() -> None:
+        nonlocal erros
+        t0 = time.perf_counter()
+        try:
+            if endpoint == "logs":
+                r = await cliente.get("/logs/last", params={"n": 50})
+            else:
+                r = await cliente.post(f"/{endpoint}", json={"pergunta": gerador.pergunta()})
+            ok = r.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        latencias.append((time.perf_counter() - t0) * 1000)
+        if not ok:
+            erros += 1
+
+    async def trabalhador() -> None:
+        while True:
+            try:
+                fila.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await uma()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - t0
+    return {
+        "requests": total,
+        "errors": erros,
+        "rps": round(total / duracao, 2) if duracao else 0.0,
+        "p50_ms": round(percentil(latencias, 50), 1),
+        "p95_ms": round(percentil(latencias, 95), 1),
+        "p99_ms": round(percentil(latencias, 99), 1),
+    }
+
+
+async def executar_carga(
+    base_url: str,
+    pid_api: int,
+    endpoints: List[str],
+    niveis: List[int],
+    total: int,
+    repetidas: float,
+    aquecimento: int = 5,
+) -> Dict[str, Any]:
+    gerador = Gerador(repetidas)
+    limites = httpx.Limits(max_connections=max(niveis) * 2, max_keepalive_connections=max(niveis) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limites) as cliente:
+        # aquecimento: pools de agentes, conexões e imports fora da medição
+        for endpoint in endpoints:
+            if aquecimento:
+                await medir(cliente, endpoint, 1, aquecimento, gerador)
+        resultados: Dict[str, Any] = {"memoria_mb": {"inicio": rss_mb(pid_api)}, "endpoints": {}}
+        for endpoint in endpoints:
+            for nivel in niveis:
+                r = await medir(cliente, endpoint, nivel, total, gerador)
+                r["rss_mb"] = rss_mb(pid_api)
+                resultados["endpoints"].setdefault(endpoint, {})[str(nivel)] = r
+                print(
+                    f"{'/' + endpoint:<12}{nivel:>6}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}"
+                    f"{(r['rss_mb'] or 0):>10.1f}",
+                    flush=True,
+                )
+    fim = rss_mb(pid_api)
+    inicio = resultados["memoria_mb"]["inicio"]
+    resultados["memoria_mb"].update({"fim": fim, "crescimento": round(fim - inicio, 1) if fim and inicio else None})
+    return resultados
+
+
+def comparar(atual: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Regressões: vazão abaixo de (1 - tol) x baseline ou p95 acima de (1 + tol) x baseline."""
+    regressoes = []
+    for endpoint, niveis in atual["endpoints"].items():
+        for nivel, r in niveis.items():
+            b = baseline.get("endpoints", {}).get(endpoint, {}).get(nivel)
+            if not b:
+                continue
+            if r["rps"] < b["rps"] * (1 - tolerancia):
+                regressoes.append(f"/{endpoint} c={nivel}: rps {r['rps']} < baseline {b['rps']}")
+            if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + tolerancia):
+                regressoes.append(f"/{endpoint} c={nivel}: p95 {r['p95_ms']}ms > baseline {b['p95_ms']}ms")
+    cresc, cresc_b = atual["memoria_mb"].get("crescimento"), baseline.get("memoria_mb", {}).get("crescimento")
+    if cresc is not None and cresc_b is not None and cresc > max(cresc_b * (1 + tolerancia), cresc_b + 10):
+        regressoes.append(f"memória: +{cresc}MB > baseline +{cresc_b}MB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga ponta a ponta da API contra stubs locais (sem custo de provedores)")
+    parser.add_argument("--niveis", default="1,8,32", help="níveis de concorrência (ex: 1,8,32)")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições por endpoint e nível")
+    parser.add_argument("--endpoints", default="route,run,logs", help="subconjunto de route,run,logs")
+    parser.add_argument("--repetidas", type=float, default=0.0, help="fração de perguntas repetidas (acerta caches)")
+    parser.add_argument("--caches", action="store_true", help="mantém o cache semântico de roteamento do ambiente")
+    parser.add_argument("--aquecimento", type=int, default=5, help="requisições por endpoint antes de medir")
+    parser.add_argument("--latencia-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-por-s", type=float, default=200.0)
+    parser.add_argument("--tokens", type=int, default=120)
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    parser.add_argument("--latencia-busca-ms", type=float, default=300.0)
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    parser.add_argument("--saida", help="grava o resultado em JSON (ex: baseline.json)")
+    parser.add_argument("--baseline", help="compara com um JSON anterior; sai com código 1 se regredir")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    niveis = [int(n) for n in args.niveis.split(",") if n.strip()]
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip() in ("route", "run", "logs")]
+    porta_stub, porta_api = porta_livre(), porta_livre()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {k: v for k, v in os.environ.items() if k != "API_KEY"}
+        env.update(
+            {
+                "OPENAI_API_KEY": "stub",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{porta_stub}/v1",
+                "TAVILY_API_KEY": "stub",
+                "TAVILY_BASE_URL": f"http://127.0.0.1:{porta_stub}",
+                "SEARCH_CACHE_PATH": str(Path(tmp) / "search_cache.db"),
+                "LOG_BACKEND": "sqlite",
+                "LOG_SQLITE_PATH": str(Path(tmp) / "cognitive_log.db"),
+            }
+        )
+        if not args.caches:
+            env["SEMANTIC_ROUTING_CACHE"] = "0"
+        stub = subprocess.Popen(
+            [
+                sys.executable, str(PROJECT_ROOT / "scripts" / "stub_llm.py"),
+                "--porta", str(porta_stub),
+                "--latencia-ms", str(args.latencia_ms),
+                "--tokens-por-s", str(args.tokens_por_s),
+                "--tokens", str(args.tokens),
+                "--taxa-erro", str(args.taxa_erro),
+                "--latencia-busca-ms", str(args.latencia_busca_ms),
+            ],
+            cwd=PROJECT_ROOT,
+        )
+        api = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "api.main:app",
+                "--port", str(porta_api), "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+            ],
+            cwd=PROJECT_ROOT,
+            env=env,
+        )
+        try:
+            esperar_pronto(f"http://127.0.0.1:{porta_stub}/stub/stats", stub)
+            esperar_pronto(f"http://127.0.0.1:{porta_api}/health", api)
+
+            print(f"stub: latência {args.latencia_ms}ms, {args.tokens_por_s} tokens/s, erro {args.taxa_erro:.1%} | API pid {api.pid}")
+            print(f"{'endpoint':<12}{'conc':>6}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'erros':>8}{'RSS MB':>10}")
+            resultado = asyncio.run(
+                executar_carga(
+                    f"http://127.0.0.1:{porta_api}", api.pid, endpoints, niveis, args.requisicoes, args.repetidas, args.aquecimento
+                )
+            )
+            resultado["config"] = {k: v for k, v in vars(args).items() if k not in ("saida", "baseline")}
+            resultado["stub"] = httpx.get(f"http://127.0.0.1:{porta_stub}/stub/stats").json()
+        finally:
+            for processo in (api, stub):
+                processo.terminate()
+            for processo in (api, stub):
+                try:
+                    processo.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    processo.kill()
+
+    mem = resultado["memoria_mb"]
+    print(f"\nmemória da API: {mem['inicio']} MB -> {mem['fim']} MB (crescimento: {mem['crescimento']} MB)")
+    print("chamadas ao stub:", resultado["stub"])
+
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print("resultado gravado em", args.saida)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressoes = comparar(resultado, baseline, args.tolerancia)
+        if regressoes:
+            print("\n❌ Regressões em relação ao baseline:")
+            for r in regressoes:
+                print("-", r)
+            sys.exit(1)
+        print("\n✅ Sem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
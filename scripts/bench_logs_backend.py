@@ -0,0 +1,102 @@
+# scripts/bench_logs_backend.py
+"""
+Compara os backends dos logs cognitivos (JSONL segmentado + índice vs SQLite WAL):
+- vazão de escrita (eventos/s, em lotes como a thread do logger grava)
+- latência das consultas da API: /logs/last, /sessions/{id} e /logs/last filtrado
+
+Uso: python scripts/bench_logs_backend.py --eventos 100000 --lote 256
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_logs_armazenamento import EventStore, JsonlEventStore
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import SegmentStore
+from tools.tools_logs_sqlite import SQLiteEventStore
+
+TIPOS = ["user_input", "routing_decision", "agent_start", "agent_end", "error"]
+AGENTES = ["router-cognitivo", "agente-educador", "agente-pesquisador", "agente-planejador"]
+
+
+def gerar_eventos(total: int, sessoes: int) -> list:
+    inicio = datetime.now(timezone.utc) - timedelta(seconds=total)
+    ids = [str(uuid.uuid4()) for _ in range(sessoes)]
+    rnd = random.Random(42)
+    return [
+        {
+            "event_id": str(uuid.uuid4()),
+            "timestamp_utc": (inicio + timedelta(seconds=i)).isoformat(),
+            "session_id": rnd.choice(ids),
+            "event_type": TIPOS[i % len(TIPOS)],
+            "agent": rnd.choice(AGENTES),
+            "action": "execute",
+            "input": "pergunta de exemplo " * 5,
+            "output": "resposta de exemplo " * 20,
+            "metadata": {"i": i},
+        }
+        for i in range(total)
+    ]
+
+
+def medir_ms(fn, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    tempos.sort()
+    return {"p50": statistics.median(tempos), "p95": tempos[int(len(tempos) * 0.95) - 1]}
+
+
+def bench(nome: str, store: EventStore, eventos: list, lote: int, repeticoes: int) -> None:
+    t0 = time.perf_counter()
+    for i in range(0, len(eventos), lote):
+        store.gravar(eventos[i : i + lote])
+    escrita_s = time.perf_counter() - t0
+
+    sessoes = [ev["session_id"] for ev in random.Random(7).sample(eventos, repeticoes)]
+    it = iter(sessoes)
+    consultas = {
+        "ultimos(50)": lambda: store.ultimos(50),
+        "sessao": lambda: store.eventos_da_sessao(next(it), 200),
+        "tipo=error(50)": lambda: store.consultar(event_type="error", n=50),
+    }
+
+    print(f"\n== {nome}")
+    print(f"escrita: {len(eventos) / escrita_s:,.0f} eventos/s ({escrita_s:.2f}s)")
+    for rotulo, fn in consultas.items():
+        r = medir_ms(fn, repeticoes)
+        print(f"{rotulo:<16} p50={r['p50']:.2f}ms p95={r['p95']:.2f}ms")
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de log (JSONL x SQLite)")
+    parser.add_argument("--eventos", type=int, default=100_000)
+    parser.add_argument("--sessoes", type=int, default=5_000)
+    parser.add_argument("--lote", type=int, default=256)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    eventos = gerar_eventos(args.eventos, args.sessoes)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        segmentos = SegmentStore(base / "segments", manutencao_automatica=False)
+        index = SessionIndex(base, base / "segments" / "index")
+        bench("jsonl (segmentos + índice)", JsonlEventStore(base / "legado.jsonl", segmentos, index), eventos, args.lote, args.repeticoes)
+        bench("sqlite (WAL)", SQLiteEventStore(base / "bench.db"), eventos, args.lote, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# scripts/bench_startup.py
+"""
+Benchmark de cold start da API.
+
+- import: `python -X importtime -c "import api.main"` -> tempo total e os
+  pacotes/módulos mais caros (tempo próprio somado por pacote raiz e tempo
+  acumulado dos módulos do projeto)
+- startup: sobe `uvicorn api.main:app` e mede o tempo até o primeiro /health 200
+  (porta aceitando conexões) e até o aquecimento em segundo plano terminar
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --repeticoes 5 --json
+    python scripts/bench_startup.py --orcamento-health-ms 1500 --proibidos agno,openai   # sai com 1 se estourar
+
+Não chama provedores: as chaves são fictícias e logs/cache de busca vão para um diretório temporário.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from bench_carga import porta_livre
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+_PROJETO = ("api", "agents", "tools")
+_LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def medir_imports(top: int) -> Dict[str, Any]:
+    """Tempos de import de `api.main` (ms) a partir do -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    por_pacote: Dict[str, float] = defaultdict(float)
+    projeto: Dict[str, float] = {}
+    total_ms = 0.0
+    for linha in proc.stderr.splitlines():
+        achado = _LINHA_IMPORTTIME.match(linha)
+        if not achado:
+            continue
+        proprio_us, acumulado_us, _, modulo = achado.groups()
+        por_pacote[modulo.split(".")[0]] += int(proprio_us) / 1000
+        if modulo.split(".")[0] in _PROJETO:
+            projeto[modulo] = int(acumulado_us) / 1000
+        if modulo == "api.main":
+            total_ms = int(acumulado_us) / 1000
+    mais_caros = sorted(por_pacote.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_ms, 1),
+        "packages_self_ms": {k: round(v, 1) for k, v in mais_caros},
+        "project_cumulative_ms": {k: round(v, 1) for k, v in sorted(projeto.items(), key=lambda kv: kv[1], reverse=True)[:top]},
+    }
+
+
+def modulos_carregados(modulos: List[str]) -> List[str]:
+    """Quais de `modulos` já estão em sys.modules depois de `import api.main`."""
+    codigo = f"import sys, api.main; print(' '.join(m for m in {modulos!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", codigo], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def medir_startup(env: Dict[str, str], timeout_s: float) -> Dict[str, Optional[float]]:
+    """Tempo (ms) até o primeiro /health 200 e até o aquecimento terminar."""
+    porta = porta_livre()
+    t0 = time.perf_counter()
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    saude_ms: Optional[float] = None
+    aquecido_ms: Optional[float] = None
+    estado = None
+    try:
+        limite = time.monotonic() + timeout_s
+        while time.monotonic() < limite and api.poll() is None:
+            try:
+                r = httpx.get(f"http://127.0.0.1:{porta}/health", timeout=1.0)
+            except httpx.HTTPError:
+                time.sleep(0.01)
+                continue
+            if r.status_code == 200:
+                agora = (time.perf_counter() - t0) * 1000
+                saude_ms = saude_ms or agora
+                estado = r.json().get("warmup")
+                if estado not in ("pending", "running"):
+                    aquecido_ms = agora if estado == "done" else None
+                    break
+            time.sleep(0.02)
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            api.kill()
+    return {"first_healthy_ms": saude_ms, "warm_ms": aquecido_ms, "warmup_state": estado}
+
+
+def _mediana(valores: List[Optional[float]]) -> Optional[float]:
+    validos = [v for v in valores if v is not None]
+    return round(statistics.median(validos), 1) if validos else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de import e de startup da API (cold start)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="subidas da API medidas (mediana)")
+    parser.add_argument("--top", type=int, default=10, help="quantos pacotes/módulos listar")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--proibidos", default="agno,openai", help="módulos que `import api.main` não deve carregar")
+    parser.add_argument("--orcamento-health-ms", type=float, help="falha (código 1) se a mediana do 1º /health passar disso")
+    parser.add_argument("--orcamento-import-ms", type=float, help="falha (código 1) se o import de api.main passar disso")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    imports = medir_imports(args.top)
+    proibidos = [m.strip() for m in args.proibidos.split(",") if m.strip()]
+    carregados = modulos_carregados(proibidos) if proibidos else []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {k: v for k, v in os.environ.items() if k != "API_KEY"}
+        env.update(
+            {
+                "OPENAI_API_KEY": "bench",
+                "TAVILY_API_KEY": "bench",
+                "SEARCH_CACHE_PATH": str(Path(tmp) / "search_cache.db"),
+                "LOG_BACKEND": "sqlite",
+                "LOG_SQLITE_PATH": str(Path(tmp) / "cognitive_log.db"),
+            }
+        )
+        execucoes = [medir_startup(env, args.timeout) for _ in range(max(1, args.repeticoes))]
+
+    resultado = {
+        "import": imports,
+        "eager_modules": carregados,
+        "startup": {
+            "runs": execucoes,
+            "first_healthy_ms": _mediana([e["first_healthy_ms"] for e in execucoes]),
+            "warm_ms": _mediana([e["warm_ms"] for e in execucoes]),
+        },
+    }
+
+    falhas: List[str] = []
+    if carregados:
+        falhas.append(f"import api.main carregou: {', '.join(carregados)}")
+    saude = resultado["startup"]["first_healthy_ms"]
+    if saude is None:
+        falhas.append("a API não respondeu /health")
+    elif args.orcamento_health_ms is not None and saude > args.orcamento_health_ms:
+        falhas.append(f"1º /health em {saude}ms (orçamento: {args.orcamento_health_ms}ms)")
+    if args.orcamento_import_ms is not None and imports["total_ms"] > args.orcamento_import_ms:
+        falhas.append(f"import de api.main em {imports['total_ms']}ms (orçamento: {args.orcamento_import_ms}ms)")
+
+    if args.json:
+        print(json.dumps({**resultado, "failures": falhas}, ensure_ascii=False, indent=2))
+    else:
+        print(f"\n⏱️  import api.main: {imports['total_ms']} ms")
+        print("\nPacotes (tempo próprio):")
+        for pacote, ms in imports["packages_self_ms"].items():
+            print(f"  {pacote:<28}{ms:>10.1f} ms")
+        print("\nMódulos do projeto (acumulado):")
+        for modulo, ms in imports["project_cumulative_ms"].items():
+            print(f"  {modulo:<28}{ms:>10.1f} ms")
+        st = resultado["startup"]
+        print(f"\n🚀 1º /health: {st['first_healthy_ms']} ms | aquecido: {st['warm_ms']} ms (mediana de {len(execucoes)})")
+        for falha in falhas:
+            print("❌", falha)
+
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
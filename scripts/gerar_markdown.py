@@ -0,0 +1,95 @@
+# scripts/gerar_markdown.py
+"""
+Gera a trilha em Markdown dos logs cognitivos sob demanda.
+
+O caminho quente grava só o formato de máquina (segmentos JSONL ou SQLite);
+este script lê os eventos em streaming e renderiza o mesmo registro que o
+antigo `cognitive_log.md` tinha, só para o recorte pedido:
+
+    python scripts/gerar_markdown.py --sessao 3f2a... > sessao.md
+    python scripts/gerar_markdown.py --desde 2026-10-18T00:00 --ate 2026-10-18T06:00 --saida madrugada.md
+    python scripts/gerar_markdown.py --tipo error --agente pesquisador
+    python scripts/gerar_markdown.py --sqlite logs/cognitive_log.db --sessao 3f2a...
+
+Com `--sessao`, o índice de sessões (logs/segments/index/) é usado quando
+existe; sem ele, os segmentos são varridos em ordem.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_logs_cognitivos import linhas_markdown
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import fontes_de_log, iter_eventos_fontes
+
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+
+def carregar_eventos(args) -> Iterable[Dict[str, Any]]:
+    if args.sqlite:
+        from tools.tools_logs_sqlite import SQLiteEventStore
+
+        yield from SQLiteEventStore(Path(args.sqlite)).iter_eventos(desde=args.desde, ate=args.ate)
+        return
+    if args.sessao and not args.arquivo:
+        index_dir = LOGS_DIR / "segments" / "index"
+        if index_dir.exists():
+            # só os registros da sessão (offsets do índice), sem varrer os segmentos
+            eventos = SessionIndex(LOGS_DIR, index_dir).eventos(args.sessao)
+            if eventos:
+                yield from eventos
+                return
+    fontes = [Path(a) for a in args.arquivo] if args.arquivo else fontes_de_log(LOGS_DIR, desde=args.desde, ate=args.ate)
+    yield from iter_eventos_fontes(fontes)
+
+
+def filtrar(eventos: Iterable[Dict[str, Any]], args) -> Iterator[Dict[str, Any]]:
+    n = 0
+    for ev in eventos:
+        ts = ev.get("timestamp_utc", "")
+        if (args.desde and ts < args.desde) or (args.ate and ts > args.ate):
+            continue
+        if args.sessao and ev.get("session_id") != args.sessao:
+            continue
+        if args.tipo and ev.get("event_type") != args.tipo:
+            continue
+        if args.agente and ev.get("agent") != args.agente:
+            continue
+        yield ev
+        n += 1
+        if args.limite is not None and n >= args.limite:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trilha em Markdown dos logs cognitivos (sob demanda)")
+    parser.add_argument("--sessao", help="só os eventos desta sessão (session_id)")
+    parser.add_argument("--desde", help="início do intervalo (ISO 8601 UTC)")
+    parser.add_argument("--ate", help="fim do intervalo (ISO 8601 UTC)")
+    parser.add_argument("--tipo", help="só este event_type")
+    parser.add_argument("--agente", help="só eventos deste agente")
+    parser.add_argument("--limite", type=int, help="para depois de N eventos")
+    parser.add_argument("--arquivo", action="append", help="arquivo(s) .jsonl/.jsonl.gz específicos (padrão: logs/)")
+    parser.add_argument("--sqlite", help="lê os eventos de um banco do backend SQLite")
+    parser.add_argument("--saida", help="arquivo .md de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    total = 0
+    try:
+        for ev in filtrar(carregar_eventos(args), args):
+            saida.writelines(linhas_markdown(ev))
+            total += 1
+    finally:
+        if args.saida:
+            saida.close()
+    print(f"{total} eventos renderizados", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,97 @@
 # scripts/ler_logs.py
+"""
+Análise dos logs cognitivos em streaming.
+
+Cada arquivo (segmentos rotativos, .jsonl.gz e o legado) é agregado em um
+processo separado; os parciais são mesclados na ordem cronológica. A memória
+não cresce com o volume de logs (ver tools/tools_logs_analise.py).
+
+    python scripts/ler_logs.py --desde 2026-10-01 --workers 8
+    python scripts/ler_logs.py --json > resumo.json
+"""
+import argparse
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
-LOG_PATH = Path(__file__).resolve().parents[1] / "logs" / "cognitive_log.jsonl"
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
+from tools.tools_logs_analise import Agregado, agregar_arquivo
+from tools.tools_logs_segmentos import fontes_de_log
 
-def main():
-    if not LOG_PATH.exists():
-        print("Nenhum log encontrado em:", LOG_PATH)
-        return
+LOGS_DIR = PROJECT_ROOT / "logs"
 
-    total = 0
-    por_tipo = {}
 
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            total += 1
-            ev = json.loads(line)
-            t = ev.get("event_type", "unknown")
-            por_tipo[t] = por_tipo.get(t, 0) + 1
+def analisar(fontes, desde=None, ate=None, workers=1):
+    total = Agregado()
+    agregar = partial(agregar_arquivo, desde=desde, ate=ate)
+    if workers <= 1 or len(fontes) <= 1:
+        for path in fontes:
+            total.mesclar(agregar(path))
+        return total
+    # map preserva a ordem das fontes: a mescla continua cronológica
+    with ProcessPoolExecutor(max_workers=min(workers, len(fontes))) as pool:
+        for parcial in pool.map(agregar, fontes):
+            total.mesclar(parcial)
+    return total
 
+
+def imprimir(rel, fontes):
     print("\n📊 Resumo de logs cognitivos")
-    print("Arquivo:", LOG_PATH)
-    print("Total de eventos:", total)
+    print("Arquivos:", len(fontes))
+    for path in fontes:
+        try:
+            print("-", path.relative_to(PROJECT_ROOT))
+        except ValueError:
+            print("-", path)
+    print("Total de eventos:", rel["events"])
+    print(f"Requisições: {rel['requests']} | erros: {rel['errors']} | taxa de erro: {rel['error_rate']:.2%}")
+
     print("\nPor tipo:")
-    for k in sorted(por_tipo.keys()):
-        print(f"- {k}: {por_tipo[k]}")
+    for k, v in rel["by_event_type"].items():
+        print(f"- {k}: {v}")
+
+    print("\nPor agente:")
+    for k, v in rel["by_agent"].items():
+        print(f"- {k}: {v}")
+
+    print("\nPor hora (UTC):")
+    for k, v in rel["by_hour"].items():
+        print(f"- {k}h: {v}")
+
+    print("\nDuração agent_start → agent_end (ms):")
+    print(f"{'agente':<28}{'exec':>8}{'erros':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for agente, a in rel["agents"].items():
+        d = a["duration"]
+        print(f"{agente:<28}{a['executions']:>8}{a['errors']:>8}{d['p50_ms']:>10}{d['p95_ms']:>10}{d['p99_ms']:>10}{d['max_ms']:>10}")
+    if rel["open_executions"] or rel["unpaired_dropped"]:
+        print(f"\nExecuções sem fim registrado: {rel['open_executions']} | descartadas: {rel['unpaired_dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo dos logs cognitivos")
+    parser.add_argument("--desde", help="início do intervalo (ISO 8601 UTC, ex: 2026-10-18T00:00)")
+    parser.add_argument("--ate", help="fim do intervalo (ISO 8601 UTC)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    # o manifesto dos segmentos limita quais arquivos são abertos
+    fontes = fontes_de_log(LOGS_DIR, desde=args.desde, ate=args.ate)
+    if not fontes:
+        print("Nenhum log encontrado em:", LOGS_DIR)
+        return
+
+    rel = analisar(fontes, desde=args.desde, ate=args.ate, workers=args.workers).relatorio()
+    if args.json:
+        print(json.dumps(rel, ensure_ascii=False, indent=2))
+    else:
+        imprimir(rel, fontes)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+# scripts/migrar_logs_sqlite.py
+"""
+Importa os logs JSONL existentes (arquivo legado `logs/cognitive_log.jsonl`
++ segmentos do manifesto) para o banco SQLite usado com LOG_BACKEND=sqlite.
+Idempotente: eventos já importados (mesmo event_id) são ignorados.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_logs_segmentos import fontes_de_log, iter_eventos_arquivo
+from tools.tools_logs_sqlite import SQLiteEventStore
+
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra os logs cognitivos JSONL para SQLite")
+    parser.add_argument("--db", default=str(LOGS_DIR / "cognitive_log.db"), help="caminho do banco (padrão: logs/cognitive_log.db)")
+    parser.add_argument("arquivos", nargs="*", help="arquivos JSONL específicos (padrão: todos os logs em logs/)")
+    args = parser.parse_args()
+
+    fontes = [Path(a) for a in args.arquivos] or fontes_de_log(LOGS_DIR)
+    if not fontes:
+        print("Nenhum log encontrado em:", LOGS_DIR)
+        return
+
+    t0 = time.perf_counter()
+    store = SQLiteEventStore(Path(args.db))
+    lidos = inseridos = 0
+    try:
+        for path in fontes:
+            contador = [0]
+
+            def eventos():
+                for ev in iter_eventos_arquivo(path):
+                    contador[0] += 1
+                    yield ev
+
+            n = store.importar(eventos())
+            lidos += contador[0]
+            inseridos += n
+            print(f"- {path}: {contador[0]} eventos ({n} novos)")
+        total = store.contar()
+    finally:
+        store.close()
+
+    print("\n🗄️ Migração para SQLite concluída")
+    print("Banco:", args.db)
+    print("Eventos lidos:", lidos)
+    print("Eventos novos:", inseridos)
+    print("Total no banco:", total)
+    print(f"Tempo: {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
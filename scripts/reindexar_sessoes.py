@@ -0,0 +1,39 @@
+# scripts/reindexar_sessoes.py
+"""
+Reconstrói o índice de sessões (session_id -> segmento/offset) a partir
+dos logs existentes: arquivo legado `logs/cognitive_log.jsonl` + segmentos
+do manifesto. Rode com a API parada (eventos gravados durante a
+reconstrução não entram no novo índice).
+"""
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import fontes_de_log
+
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+
+def main():
+    fontes = fontes_de_log(LOGS_DIR)
+    if not fontes:
+        print("Nenhum log encontrado em:", LOGS_DIR)
+        return
+
+    t0 = time.perf_counter()
+    index = SessionIndex(LOGS_DIR, LOGS_DIR / "segments" / "index")
+    res = index.reconstruir(fontes)
+
+    print("\n🗂️ Índice de sessões reconstruído")
+    print("Arquivos lidos:", res["arquivos"])
+    print("Eventos indexados:", res["eventos"])
+    print(f"Tempo: {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# scripts/replay_trafego.py
+"""
+Replay do tráfego real gravado nos logs cognitivos contra uma API rodando.
+
+As requisições (`routing_start` -> /route, `request_received` -> /run) são
+reenviadas respeitando os intervalos originais entre chegadas, escalados por
+`--velocidade` (10 = dez vezes mais rápido; 0 = tudo de uma vez, limitado por
+`--max-em-voo`). Para cada resposta: latência, status e o agente escolhido,
+comparado com o `routing_decision` original.
+
+    python scripts/replay_trafego.py --url http://127.0.0.1:8000 --desde 2026-10-17 --velocidade 10
+    python scripts/replay_trafego.py --somente-roteamento --velocidade 0 --max-em-voo 32 --json
+    python scripts/replay_trafego.py --sqlite logs/cognitive_log.db --saida replay.jsonl
+
+Use contra um ambiente de teste (ou o stub de scripts/stub_llm.py): cada
+requisição de /run executa o agente de verdade.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.tools_logs_replay import RequisicaoGravada, ResultadoReplay, extrair_requisicoes, instante_replay
+from tools.tools_logs_segmentos import fontes_de_log, iter_eventos_fontes
+
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+
+def carregar_eventos(args) -> Iterable[Dict[str, Any]]:
+    if args.sqlite:
+        from tools.tools_logs_sqlite import SQLiteEventStore
+
+        yield from SQLiteEventStore(Path(args.sqlite)).iter_eventos(desde=args.desde, ate=args.ate)
+        return
+    fontes = [Path(a) for a in args.arquivo] if args.arquivo else fontes_de_log(LOGS_DIR, desde=args.desde, ate=args.ate)
+    # arquivos de vários workers são intercalados por timestamp
+    for ev in iter_eventos_fontes(fontes):
+        ts = ev.get("timestamp_utc", "")
+        if (args.desde and ts < args.desde) or (args.ate and ts > args.ate):
+            continue
+        yield ev
+
+
+async def reproduzir(
+    requisicoes: List[RequisicaoGravada],
+    url: str,
+    velocidade: float,
+    max_em_voo: int,
+    somente_roteamento: bool,
+    api_key: Optional[str],
+    timeout_s: float,
+    saida: Optional[Any] = None,
+) -> Dict[str, Any]:
+    resultado = ResultadoReplay()
+    limite = asyncio.Semaphore(max(1, max_em_voo))
+    headers = {"X-API-Key": api_key} if api_key else {}
+    limites = httpx.Limits(max_connections=max_em_voo, max_keepalive_connections=max_em_voo)
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, timeout=timeout_s, limits=limites) as cliente:
+        inicio = time.perf_counter()
+
+        async def enviar(req: RequisicaoGravada, atraso_ms: float) -> None:
+            endpoint = "/route" if somente_roteamento else req.endpoint
+            t0 = time.perf_counter()
+            agente, erro = None, None
+            try:
+                r = await cliente.post(endpoint, json={"pergunta": req.pergunta})
+                status = r.status_code
+                if status == 200:
+                    agente = r.json().get("agente")
+                else:
+                    erro = r.text[:200]
+            except httpx.HTTPError as e:
+                status, erro = 0, str(e) or type(e).__name__
+            finally:
+                limite.release()
+            latencia_ms = (time.perf_counter() - t0) * 1000
+            igual = resultado.registrar(req, status, latencia_ms, agente, atraso_ms)
+            if saida is not None:
+                linha = {
+                    "timestamp_original": req.timestamp_utc,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "latency_ms": round(latencia_ms, 1),
+                    "schedule_lag_ms": round(atraso_ms, 1),
+                    "agente_original": req.agente_original,
+                    "agente": agente,
+                    "igual": igual,
+                    "erro": erro,
+                }
+                saida.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+        tarefas: set = set()
+        for req in requisicoes:
+            agendado = instante_replay(req, velocidade)
+            espera = agendado - (time.perf_counter() - inicio)
+            if espera > 0:
+                await asyncio.sleep(espera)
+            # slot antes de criar a tarefa: a memória fica limitada por --max-em-voo
+            await limite.acquire()
+            atraso_ms = max(0.0, (time.perf_counter() - inicio - agendado) * 1000)
+            tarefa = asyncio.create_task(enviar(req, atraso_ms))
+            tarefas.add(tarefa)
+            tarefa.add_done_callback(tarefas.discard)
+        await asyncio.gather(*tarefas)
+        duracao = time.perf_counter() - inicio
+
+    return resultado.resumo(duracao)
+
+
+def imprimir(rel: Dict[str, Any], total_original_s: float, truncadas: int) -> None:
+    print("\n🔁 Replay de tráfego")
+    print(f"Requisições: {rel['requests']} em {rel['duration_s']}s (original: {total_original_s:.1f}s) | {rel['rps']} req/s")
+    print(f"Erros: {rel['errors']} ({rel['error_rate']:.2%}) | status: {rel['status']}")
+    if truncadas:
+        print(f"Perguntas truncadas no log (reenviadas assim mesmo): {truncadas}")
+
+    print(f"\n{'endpoint':<12}{'n':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for endpoint, lat in rel["latency"].items():
+        print(f"{endpoint:<12}{lat['count']:>8}{lat['p50_ms']:>10}{lat['p95_ms']:>10}{lat['p99_ms']:>10}{lat['max_ms']:>10}")
+    lag = rel["schedule_lag"]
+    print(f"\nAtraso de envio vs. agendado: p50 {lag['p50_ms']}ms | p95 {lag['p95_ms']}ms | max {lag['max_ms']}ms")
+
+    rot = rel["routing"]
+    print(f"\nRoteamento: {rot['same']}/{rot['compared']} iguais ao original ({rot['agreement']:.2%}); sem original: {rot['without_original']}")
+    for d in rot["divergences"]:
+        print(f"- {d['original']} -> {d['replay']}: {d['count']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay do tráfego dos logs cognitivos contra uma API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"), help="enviada em X-API-Key (padrão: $API_KEY)")
+    parser.add_argument("--desde", help="início do intervalo (ISO 8601 UTC)")
+    parser.add_argument("--ate", help="fim do intervalo (ISO 8601 UTC)")
+    parser.add_argument("--arquivo", action="append", help="arquivo(s) .jsonl/.jsonl.gz específicos (padrão: logs/)")
+    parser.add_argument("--sqlite", help="lê os eventos de um banco do backend SQLite")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="fator de tempo (10 = 10x mais rápido; 0 = sem espera)")
+    parser.add_argument("--max-em-voo", type=int, default=256, help="requisições simultâneas no máximo")
+    parser.add_argument("--limite", type=int, help="reproduz só as primeiras N requisições")
+    parser.add_argument("--endpoints", default="/route,/run", help="endpoints originais a reproduzir")
+    parser.add_argument("--somente-roteamento", action="store_true", help="envia tudo para /route (não executa agentes)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--saida", help="grava um JSON por requisição (JSONL)")
+    parser.add_argument("--json", action="store_true", help="imprime o resumo em JSON")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    requisicoes = extrair_requisicoes(carregar_eventos(args), endpoints=endpoints, limite=args.limite)
+    if not requisicoes:
+        print("Nenhuma requisição encontrada nos logs.")
+        return
+    total_original_s = requisicoes[-1].offset_s
+    if not args.json:
+        estimado = total_original_s / args.velocidade if args.velocidade > 0 else 0.0
+        print(f"{len(requisicoes)} requisições ({total_original_s:.1f}s de tráfego original; replay em ~{estimado:.1f}s) -> {args.url}")
+
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else None
+    try:
+        rel = asyncio.run(
+            reproduzir(
+                requisicoes,
+                args.url,
+                args.velocidade,
+                args.max_em_voo,
+                args.somente_roteamento,
+                args.api_key,
+                args.timeout,
+                saida,
+            )
+        )
+    finally:
+        if saida is not None:
+            saida.close()
+
+    truncadas = sum(1 for r in requisicoes if r.truncada)
+    if args.json:
+        print(json.dumps({**rel, "original_duration_s": round(total_original_s, 2), "truncated_inputs": truncadas}, ensure_ascii=False, indent=2))
+    else:
+        imprimir(rel, total_original_s, truncadas)
+
+
+if __name__ == "__main__":
+    main()
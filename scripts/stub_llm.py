@@ -0,0 +1,239 @@
+# scripts/stub_llm.py
+"""
+Servidor stub compatível com a OpenAI (chat completions) + substituto do Tavily,
+para testes de carga sem gastar com provedores reais.
+
+- POST /v1/chat/completions: resposta normal ou em stream (SSE), com latência,
+  taxa de tokens e taxa de erro configuráveis
+  - prompt do router ("exatamente uma destas: ..."): responde um agente válido,
+    escolhido de forma determinística pela pergunta
+  - se o request oferece a tool de busca do Tavily e ainda não houve resultado de
+    tool, pede a busca (o agente pesquisador exercita o caminho completo)
+- POST /search: resultado no formato do Tavily (tools/tools_busca_web.BuscaLocal)
+- GET /stub/stats: contadores
+
+    python scripts/stub_llm.py --porta 8900 --latencia-ms 300 --tokens-por-s 80 --taxa-erro 0.01
+
+Aponte a API para o stub:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=stub \\
+    TAVILY_BASE_URL=http://127.0.0.1:8900 TAVILY_API_KEY=stub uvicorn api.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from tools.tools_busca_web import BuscaLocal
+
+_OPCOES_ROUTER = re.compile(r"exatamente uma destas:\s*\n?\s*([^\n]+)", re.IGNORECASE)
+_TOOL_BUSCA = ("web_search_using_tavily", "web_search_with_tavily")
+
+
+class ConfigStub:
+    def __init__(
+        self,
+        latencia_ms: float = 200.0,
+        jitter_ms: float = 0.0,
+        tokens_por_s: float = 50.0,
+        tokens: int = 120,
+        taxa_erro: float = 0.0,
+        latencia_busca_ms: float = 300.0,
+        semente: Optional[int] = None,
+    ):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_por_s = tokens_por_s
+        self.tokens = tokens
+        self.taxa_erro = taxa_erro
+        self.latencia_busca_ms = latencia_busca_ms
+        self.rnd = random.Random(semente)
+
+    def espera_inicial(self) -> float:
+        jitter = self.rnd.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latencia_ms + jitter) / 1000
+
+    def intervalo_token(self) -> float:
+        return 1 / self.tokens_por_s if self.tokens_por_s > 0 else 0.0
+
+    def falhar(self) -> bool:
+        return self.taxa_erro > 0 and self.rnd.random() < self.taxa_erro
+
+
+def _texto(conteudo: Any) -> str:
+    if isinstance(conteudo, list):  # formato multimodal: [{"type": "text", "text": ...}]
+        return " ".join(p.get("text", "") for p in conteudo if isinstance(p, dict))
+    return conteudo or ""
+
+
+def _ultima_pergunta(mensagens: List[Dict[str, Any]]) -> str:
+    for m in reversed(mensagens):
+        if m.get("role") == "user":
+            return _texto(m.get("content"))
+    return ""
+
+
+def _opcoes_router(mensagens: List[Dict[str, Any]]) -> Optional[List[str]]:
+    for m in mensagens:
+        if m.get("role") in ("system", "developer"):
+            achado = _OPCOES_ROUTER.search(_texto(m.get("content")))
+            if achado:
+                return [o.strip() for o in achado.group(1).split(",") if o.strip()]
+    return None
+
+
+def _tool_de_busca(corpo: Dict[str, Any]) -> Optional[str]:
+    if any(m.get("role") == "tool" for m in corpo.get("messages", [])):
+        return None
+    for tool in corpo.get("tools") or []:
+        nome = (tool.get("function") or {}).get("name")
+        if nome in _TOOL_BUSCA:
+            return nome
+    return None
+
+
+def _resposta(corpo: Dict[str, Any], tokens: int) -> Dict[str, Any]:
+    """Mensagem do assistente: {"content": ...} ou {"tool_calls": [...]}."""
+    mensagens = corpo.get("messages", [])
+    pergunta = _ultima_pergunta(mensagens)
+    opcoes = _opcoes_router(mensagens)
+    if opcoes:
+        return {"content": opcoes[zlib.crc32(pergunta.encode("utf-8")) % len(opcoes)]}
+    tool = _tool_de_busca(corpo)
+    if tool:
+        argumentos = {"query": pergunta[:200]} if tool == "web_search_with_tavily" else {"query": pergunta[:200], "max_results": 3}
+        return {
+            "tool_calls": [
+                {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": {"name": tool, "arguments": json.dumps(argumentos, ensure_ascii=False)}}
+            ]
+        }
+    return {"content": " ".join(f"tok{i}" for i in range(tokens))}
+
+
+def _uso(corpo: Dict[str, Any], saida: int) -> Dict[str, int]:
+    entrada = sum(len(_texto(m.get("content")).split()) for m in corpo.get("messages", []))
+    return {"prompt_tokens": entrada, "completion_tokens": saida, "total_tokens": entrada + saida}
+
+
+def criar_app(config: ConfigStub) -> FastAPI:
+    app = FastAPI(title="stub LLM/Tavily")
+    busca = BuscaLocal()
+    contadores = {"chat": 0, "chat_stream": 0, "router": 0, "tool_calls": 0, "erros": 0, "buscas": 0}
+
+    def _erro() -> JSONResponse:
+        contadores["erros"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "erro simulado pelo stub", "type": "server_error", "code": None}},
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        corpo = await request.json()
+        await asyncio.sleep(config.espera_inicial())
+        if config.falhar():
+            return _erro()
+
+        mensagem = _resposta(corpo, config.tokens)
+        if _opcoes_router(corpo.get("messages", [])):
+            contadores["router"] += 1
+        if "tool_calls" in mensagem:
+            contadores["tool_calls"] += 1
+        base = {"id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": corpo.get("model", "stub")}
+        fim = "tool_calls" if "tool_calls" in mensagem else "stop"
+
+        if corpo.get("stream"):
+            contadores["chat_stream"] += 1
+            incluir_uso = bool((corpo.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(_stream(base, mensagem, fim, incluir_uso, corpo), media_type="text/event-stream")
+
+        contadores["chat"] += 1
+        partes = (mensagem.get("content") or "").split()
+        await asyncio.sleep(len(partes) * config.intervalo_token())
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": None, **mensagem}, "finish_reason": fim}],
+            "usage": _uso(corpo, len(partes)),
+        }
+
+    async def _stream(base: Dict[str, Any], mensagem: Dict[str, Any], fim: str, incluir_uso: bool, corpo: Dict[str, Any]) -> AsyncIterator[str]:
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> str:
+            dados = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            return f"data: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+        partes: List[str] = []
+        if "tool_calls" in mensagem:
+            yield chunk({"role": "assistant", "tool_calls": [{"index": 0, **mensagem["tool_calls"][0]}]})
+        else:
+            partes = mensagem["content"].split()
+            yield chunk({"role": "assistant", "content": ""})
+            for i, parte in enumerate(partes):
+                await asyncio.sleep(config.intervalo_token())
+                yield chunk({"content": parte if i == 0 else " " + parte})
+        yield chunk({}, fim)
+        if incluir_uso:
+            dados = {**base, "object": "chat.completion.chunk", "choices": [], "usage": _uso(corpo, len(partes))}
+            yield f"data: {json.dumps(dados)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/search")
+    async def search(request: Request):
+        corpo = await request.json()
+        await asyncio.sleep(config.latencia_busca_ms / 1000)
+        if config.falhar():
+            return _erro()
+        contadores["buscas"] += 1
+        parametros = {k: v for k, v in corpo.items() if k not in ("query", "api_key")}
+        return busca.search(corpo.get("query", ""), **parametros)
+
+    @app.get("/stub/stats")
+    async def stats():
+        return dict(contadores)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatível + Tavily para testes de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8900)
+    parser.add_argument("--latencia-ms", type=float, default=200.0, help="espera antes da resposta (tempo até o 1º token)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="variação uniforme (±) da latência")
+    parser.add_argument("--tokens-por-s", type=float, default=50.0, help="taxa de geração (0 = instantâneo)")
+    parser.add_argument("--tokens", type=int, default=120, help="tokens por resposta dos agentes")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 500 (0..1)")
+    parser.add_argument("--latencia-busca-ms", type=float, default=300.0, help="latência do /search (Tavily)")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = ConfigStub(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_por_s=args.tokens_por_s,
+        tokens=args.tokens,
+        taxa_erro=args.taxa_erro,
+        latencia_busca_ms=args.latencia_busca_ms,
+        semente=args.semente,
+    )
+    uvicorn.run(criar_app(config), host=args.host, port=args.porta, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
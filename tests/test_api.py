@@ -0,0 +1,367 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from tools.tools_cache import CacheRespostas
+from tools.tools_cache_semantico import CacheSemantico
+from tools.tools_logs_cognitivos import CognitiveLogger
+from tools.tools_memoria_sessao import MemoriaSessoes
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setenv("AGENT_POOL_WARMUP", "0")
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search_cache.db"))
+    monkeypatch.delenv("API_KEY", raising=False)
+
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", md_path=tmp_path / "log.md")
+    monkeypatch.setattr(api_main, "logger", logger)
+    api_main.routing_cache.clear()
+    api_main.semantic_routing_cache.clear()
+
+    async def rotear(pergunta):
+        return "educador", "llm"
+
+    async def executar(nome, pergunta):
+        if "falhe" in pergunta:
+            raise RuntimeError("falha simulada")
+        return f"resposta do {nome}"
+
+    async def stream(nome, pergunta):
+        for parte in ["resposta ", "do ", nome]:
+            yield parte
+
+    monkeypatch.setattr(api_main, "decidir_agente_llm_com_origem_async", rotear)
+    monkeypatch.setattr(api_main, "executar_agente_query_async", executar)
+    monkeypatch.setattr(api_main, "executar_agente_stream", stream)
+
+    with TestClient(api_main.app) as c:
+        c.logger = logger
+        yield c
+
+
+def test_import_da_api_nao_carrega_agentes():
+    # agentes (e o agno) são importados sob demanda ou pelo aquecimento em segundo plano
+    codigo = "import sys, api.main; print(sorted(m for m in ('agno', 'openai', 'agents.agente_educador') if m in sys.modules))"
+    raiz = Path(__file__).resolve().parents[1]
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True, cwd=raiz)
+    assert saida.stdout.strip() == "[]"
+
+
+def test_router_tem_pool_proprio(client, monkeypatch):
+    from agents.pool_agentes import obter_pool
+
+    # o router não fica limitado ao tamanho padrão dos agentes
+    assert obter_pool("router").size == 16
+    monkeypatch.setenv("BATCH_AGENT_LIMITS", "router:32")
+    assert api_main.get_router_pool_size() == 32
+    monkeypatch.setenv("ROUTER_POOL_SIZE", "4")
+    assert api_main.get_router_pool_size() == 4
+
+
+def _eventos_logados(logger):
+    with open(logger.jsonl_path, encoding="utf-8") as f:
+        return [json.loads(ln) for ln in f if ln.strip()]
+
+
+def _parse_sse(texto):
+    eventos = []
+    for bloco in texto.strip().split("\n\n"):
+        linhas = dict(ln.split(": ", 1) for ln in bloco.splitlines())
+        eventos.append((linhas["event"], json.loads(linhas["data"])))
+    return eventos
+
+
+def test_run_usa_cache_de_roteamento(client):
+    r1 = client.post("/run", json={"pergunta": "Crie uma questão"})
+    r2 = client.post("/run", json={"pergunta": "  crie uma QUESTAO "})
+
+    assert r1.json()["saida"] == "resposta do educador"
+    assert r1.json()["meta"]["routing_cache"] == "miss"
+    assert r2.json()["meta"]["routing_cache"] == "hit"
+
+
+def test_run_stream_envia_roteamento_tokens_e_fim(client):
+    r = client.post("/run/stream", json={"pergunta": "Crie uma questão"})
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    eventos = _parse_sse(r.text)
+    assert eventos[0] == ("routing", {"agente": "educador", "session_id": eventos[0][1]["session_id"], "routing_cache": "miss"})
+    assert "".join(d["delta"] for e, d in eventos if e == "token") == "resposta do educador"
+    assert eventos[-1][0] == "done"
+
+    fim = [e for e in _eventos_logados(client.logger) if e["event_type"] == "agent_end"]
+    assert fim[-1]["output"] == "resposta do educador"
+
+
+def test_run_com_accept_event_stream(client):
+    r = client.post("/run", json={"pergunta": "Crie uma questão"}, headers={"Accept": "text/event-stream"})
+    assert _parse_sse(r.text)[-1][0] == "done"
+
+
+def test_batch_preserva_ordem_e_isola_erros(client):
+    perguntas = ["primeira", "falhe aqui", "terceira"]
+    r = client.post("/run/batch", json={"itens": [{"pergunta": p} for p in perguntas]})
+    body = r.json()
+
+    assert r.status_code == 200
+    assert [it["indice"] for it in body["itens"]] == [0, 1, 2]
+    assert body["ok"] == 2 and body["erros"] == 1
+    assert body["itens"][1]["erro"] == "falha simulada"
+    assert len({it["session_id"] for it in body["itens"]}) == 3
+
+    erros = [e for e in _eventos_logados(client.logger) if e["event_type"] == "error"]
+    assert erros[0]["session_id"] == body["itens"][1]["session_id"]
+
+
+def test_batch_ndjson(client):
+    r = client.post("/run/batch?stream=true", json={"itens": [{"pergunta": "a"}, {"pergunta": "b"}]})
+    linhas = [json.loads(ln) for ln in r.text.splitlines()]
+
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(ln["indice"] for ln in linhas) == [0, 1]
+    assert all(ln["saida"] == "resposta do educador" for ln in linhas)
+
+
+def test_logs_last_com_filtros(client):
+    client.post("/run/batch", json={"itens": [{"pergunta": "ok"}, {"pergunta": "falhe"}]})
+
+    body = client.get("/logs/last", params={"event_type": "error"}).json()
+    assert body["count"] == 1
+    assert body["items"][0]["event_type"] == "error"
+
+
+def test_metrics_e_duracoes_nos_eventos(client):
+    client.post("/run", json={"pergunta": "Crie uma questão"})
+    client.post("/run", json={"pergunta": "falhe por favor"})
+
+    r = client.get("/metrics")
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'agnos_http_requests_total{route="/run",method="POST",status="200"}' in r.text
+    assert 'agnos_agent_runs_total{agent="educador",outcome="error"}' in r.text
+    assert 'agnos_stage_duration_seconds_bucket{stage="routing",le="+Inf"}' in r.text
+    assert "agnos_http_requests_in_flight 1" in r.text  # a própria /metrics
+
+    client.logger.flush()
+    eventos = {e["event_type"]: e for e in _eventos_logados(client.logger)}
+    assert eventos["routing_decision"]["duration_ms"] >= 0
+    assert eventos["agent_end"]["duration_ms"] >= 0
+    assert "duration_ms" not in eventos["request_received"]
+
+
+def test_timeout_por_agente(client, monkeypatch):
+    async def lento(nome, pergunta):
+        await asyncio.sleep(1)
+        return "tarde demais"
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", lento)
+    monkeypatch.setattr(api_main, "TIMEOUTS_AGENTE", {"educador": 0.05})
+
+    r = client.post("/run", json={"pergunta": "Crie uma questão lenta"})
+    assert r.status_code == 500
+    assert "educador" in r.json()["detail"] and "0.05s" in r.json()["detail"]
+    assert 'agnos_agent_runs_total{agent="educador",outcome="timeout"}' in client.get("/metrics").text
+
+
+def test_timeout_por_agente_no_stream(client, monkeypatch):
+    async def lento(nome, pergunta):
+        yield "começo "
+        await asyncio.sleep(1)
+        yield "tarde demais"
+
+    monkeypatch.setattr(api_main, "executar_agente_stream", lento)
+    monkeypatch.setattr(api_main, "TIMEOUTS_AGENTE", {"educador": 0.05})
+
+    eventos = _parse_sse(client.post("/run/stream", json={"pergunta": "Crie uma questão lenta"}).text)
+    assert [e for e, _ in eventos] == ["routing", "token", "error"]
+    assert "educador" in eventos[-1][1]["detail"] and "0.05s" in eventos[-1][1]["detail"]
+    assert 'agnos_agent_runs_total{agent="educador",outcome="timeout"}' in client.get("/metrics").text
+
+
+def test_cache_de_respostas(client, monkeypatch):
+    monkeypatch.setattr(api_main, "response_cache", CacheRespostas(max_bytes=1024 * 1024))
+    chamadas = []
+    original = api_main.executar_agente_query_async
+
+    async def contar(nome, pergunta):
+        chamadas.append(pergunta)
+        return await original(nome, pergunta)
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", contar)
+
+    r1 = client.post("/run", json={"pergunta": "Crie uma questão"})
+    r2 = client.post("/run", json={"pergunta": "crie uma QUESTAO"})
+
+    assert r1.headers["x-cache"] == "MISS" and r1.json()["meta"]["cache"] == "miss"
+    assert r2.headers["x-cache"] == "HIT" and r2.json()["meta"]["cache"] == "hit"
+    assert r2.json()["saida"] == "resposta do educador"
+    assert len(chamadas) == 1
+
+    client.logger.flush()
+    hits = [e for e in _eventos_logados(client.logger) if e["event_type"] == "response_cache_hit"]
+    assert hits[0]["agent"] == "educador" and hits[0]["session_id"] == r2.json()["meta"]["session_id"]
+
+
+def test_cache_de_respostas_nao_guarda_falha_nem_vazio(client, monkeypatch):
+    monkeypatch.setattr(api_main, "response_cache", CacheRespostas(max_bytes=1024 * 1024))
+    saidas = [RuntimeError("Error code: 429 - rate limit"), "  ", "resposta boa"]
+
+    async def executar(nome, pergunta):
+        saida = saidas.pop(0)
+        if isinstance(saida, Exception):
+            raise saida
+        return saida
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", executar)
+
+    assert client.post("/run", json={"pergunta": "Crie uma questão"}).status_code == 500
+    assert client.post("/run", json={"pergunta": "Crie uma questão"}).json()["saida"].strip() == ""
+    assert api_main.response_cache.stats()["size"] == 0
+    r = client.post("/run", json={"pergunta": "Crie uma questão"})
+    assert r.json()["saida"] == "resposta boa" and r.json()["meta"]["cache"] == "miss"
+    assert client.post("/run", json={"pergunta": "Crie uma questão"}).json()["meta"]["cache"] == "hit"
+
+
+def test_cache_semantico_de_respostas_nao_guarda_falha(client, monkeypatch):
+    monkeypatch.setattr(api_main, "response_cache", CacheRespostas(max_bytes=1024 * 1024))
+    monkeypatch.setattr(api_main, "semantic_answer_cache", CacheSemantico(capacidade=100, limiar=0.65))
+
+    async def falhar(nome, pergunta):
+        raise RuntimeError("Error code: 503 - provedor indisponível")
+
+    async def stream_falho(nome, pergunta):
+        yield "resposta parcial "
+        raise RuntimeError("Error code: 503 - provedor indisponível")
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", falhar)
+    monkeypatch.setattr(api_main, "executar_agente_stream", stream_falho)
+
+    assert client.post("/run", json={"pergunta": "crie uma questão de frações"}).status_code == 500
+    eventos = _parse_sse(client.post("/run/stream", json={"pergunta": "crie uma questão sobre frações"}).text)
+    assert eventos[-1][0] == "error"
+    assert api_main.semantic_answer_cache.stats()["size"] == 0
+
+    async def responder(nome, pergunta):
+        return "questão de frações"
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", responder)
+    r = client.post("/run", json={"pergunta": "crie uma questão de frações, por favor"})
+    assert r.json()["saida"] == "questão de frações" and r.json()["meta"]["cache"] == "miss"
+
+
+def test_memoria_de_sessao_envia_historico_ao_agente(client, monkeypatch):
+    monkeypatch.setattr(api_main, "memoria_sessoes", MemoriaSessoes(orcamento_tokens=500))
+    recebidas = []
+
+    async def executar(nome, pergunta):
+        recebidas.append(pergunta)
+        return f"resposta {len(recebidas)}"
+
+    monkeypatch.setattr(api_main, "executar_agente_query_async", executar)
+    sessao = {"X-Session-Id": "conversa-1"}
+
+    client.post("/run", json={"pergunta": "Crie uma questão de frações"}, headers=sessao)
+    r = client.post("/run", json={"pergunta": "Agora uma mais difícil"}, headers=sessao)
+    client.post("/run", json={"pergunta": "Agora uma mais difícil"})  # sem header: sem memória
+
+    assert recebidas[0] == "Crie uma questão de frações"
+    assert "Usuário: Crie uma questão de frações\nAssistente: resposta 1" in recebidas[1]
+    assert recebidas[1].endswith("Pergunta atual:\nAgora uma mais difícil")
+    assert recebidas[2] == "Agora uma mais difícil"
+    assert r.json()["meta"]["session_memory_tokens"] > 0 and r.json()["meta"]["cache"] == "off"
+    assert client.get("/stats").json()["session_memory"]["sessions"] == 1
+
+
+def test_roteamento_semantico_para_parafrases(client, monkeypatch):
+    # desligado por padrão; aqui ligado com limiar baixo, para paráfrases
+    monkeypatch.setattr(api_main, "semantic_routing_cache", CacheSemantico(capacidade=100, limiar=0.65))
+    r1 = client.post("/run", json={"pergunta": "me ajude a planejar minha semana"})
+    r2 = client.post("/run", json={"pergunta": "planeje minha semana pra mim"})
+    r3 = client.post("/run", json={"pergunta": "pesquise as notícias de hoje sobre IA"})
+
+    assert r1.json()["meta"]["routing_cache"] == "miss"
+    assert r2.json()["meta"]["routing_cache"] == "semantic"
+    assert r3.json()["meta"]["routing_cache"] == "miss"
+
+
+def test_execucao_especulativa(client, monkeypatch):
+    monkeypatch.setattr(api_main, "SPECULATIVE_EXECUTION", True)
+    antes = client.get("/stats").json()["speculation"]
+
+    # heurística e router concordam (educador): a execução especulativa é aproveitada
+    r1 = client.post("/run", json={"pergunta": "Crie uma questão"})
+    # heurística chuta planejador, router decide educador: especulação cancelada
+    r2 = client.post("/run", json={"pergunta": "me ajude a planejar minha semana"})
+
+    assert r1.json()["meta"]["speculation"] == "hit" and r1.json()["saida"] == "resposta do educador"
+    assert r2.json()["meta"]["speculation"] == "miss" and r2.json()["saida"] == "resposta do educador"
+
+    depois = client.get("/stats").json()["speculation"]
+    assert depois["hits"] - antes["hits"] == 1 and depois["misses"] - antes["misses"] == 1
+
+    client.logger.flush()
+    eventos = _eventos_logados(client.logger)
+    cancelados = [e for e in eventos if e["event_type"] == "speculation_cancelled"]
+    assert cancelados[0]["agent"] == "planejador" and cancelados[0]["metadata"]["routed_to"] == "educador"
+    fins = [e for e in eventos if e["event_type"] == "agent_end"]
+    assert fins[0]["metadata"]["speculative"] is True and "saved_ms" in fins[0]["metadata"]
+
+    # linha do tempo: o agente do palpite começa antes da decisão do router
+    r1_eventos = [e["event_type"] for e in eventos if e["session_id"] == r1.json()["meta"]["session_id"]]
+    assert r1_eventos.index("agent_start") < r1_eventos.index("routing_decision") < r1_eventos.index("agent_end")
+    r2_eventos = [(e["event_type"], e["agent"]) for e in eventos if e["session_id"] == r2.json()["meta"]["session_id"]]
+    assert r2_eventos.index(("agent_start", "planejador")) < r2_eventos.index(("speculation_cancelled", "planejador"))
+    assert r2_eventos.index(("speculation_cancelled", "planejador")) < r2_eventos.index(("agent_start", "educador"))
+
+
+def test_especulacao_nao_repete_busca_no_cache_de_respostas(client, monkeypatch):
+    monkeypatch.setattr(api_main, "SPECULATIVE_EXECUTION", True)
+    monkeypatch.setattr(api_main, "response_cache", CacheRespostas(max_bytes=1024 * 1024))
+    api_main.response_cache.set("educador", "Crie uma questão", "resposta guardada")
+
+    r = client.post("/run", json={"pergunta": "Crie uma questão"})
+
+    assert r.json()["saida"] == "resposta guardada" and r.json()["meta"]["cache"] == "hit"
+    st = api_main.response_cache.stats()
+    assert st["hits"] == 1 and st["misses"] == 0
+
+
+def test_perguntas_identicas_simultaneas_compartilham_execucao(client, monkeypatch):
+    chamadas = {"router": 0, "agente": 0}
+
+    async def rotear(pergunta):
+        chamadas["router"] += 1
+        await asyncio.sleep(0.05)
+        return "educador", "llm"
+
+    async def executar(nome, pergunta):
+        chamadas["agente"] += 1
+        await asyncio.sleep(0.05)
+        return f"resposta do {nome}"
+
+    monkeypatch.setattr(api_main, "decidir_agente_llm_com_origem_async", rotear)
+    monkeypatch.setattr(api_main, "executar_agente_query_async", executar)
+    antes = api_main.COALESCIDAS.valor(op="agent")
+
+    async def main():
+        sessoes = [f"s{i}" for i in range(5)]
+        perguntas = ["Crie uma questão", "crie uma QUESTAO ", "Crie uma questão", "crie uma questão", "Crie uma questao"]
+        return await asyncio.gather(*(api_main.rotear_e_responder(s, p) for s, p in zip(sessoes, perguntas)))
+
+    resultados = asyncio.run(main())
+
+    assert [r[2] for r in resultados] == ["resposta do educador"] * 5
+    assert chamadas == {"router": 1, "agente": 1}
+    assert api_main.COALESCIDAS.valor(op="agent") - antes == 4
+
+    client.logger.flush()
+    fins = [e for e in _eventos_logados(client.logger) if e["event_type"] == "agent_end"]
+    assert sorted(e["session_id"] for e in fins) == [f"s{i}" for i in range(5)]
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+from tools import tools_busca_web as busca
+from tools.tools_busca_web import BuscaLocal, CacheBuscas, criar_ferramenta_busca, frescor_busca
+
+
+class Relogio:
+    def __init__(self):
+        self.t = 1_000_000.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def busca_local(tmp_path):
+    busca.configurar_busca("local", cache_path=tmp_path / "buscas.db", ttl_s=3600)
+    busca._busca_local.chamadas = 0
+    yield busca._busca_local
+    busca.configurar_busca()
+
+
+def test_cache_por_consulta_normalizada_e_parametros(tmp_path):
+    cache = CacheBuscas(tmp_path / "b.db", ttl_s=60)
+    cache.set("IA na Educação", {"max_results": 5}, {"results": [1]})
+
+    assert cache.get("  ia na educacao ", {"max_results": 5}) == {"results": [1]}
+    assert cache.get("ia na educacao", {"max_results": 3}) is None
+    assert cache.get("ia na educacao", {"max_results": 5, "search_depth": None}) == {"results": [1]}
+
+
+def test_cache_sobrevive_a_reinicio_e_respeita_ttl(tmp_path):
+    relogio = Relogio()
+    cache = CacheBuscas(tmp_path / "b.db", ttl_s=60, clock=relogio)
+    cache.set("consulta", {}, {"ok": True})
+    cache.close()
+
+    reaberto = CacheBuscas(tmp_path / "b.db", ttl_s=60, clock=relogio)
+    assert reaberto.get("consulta", {}) == {"ok": True}
+    relogio.t += 30
+    assert reaberto.get("consulta", {}, max_idade_s=10) is None  # frescor da requisição
+    assert reaberto.get("consulta", {}) == {"ok": True}
+    relogio.t += 31
+    assert reaberto.get("consulta", {}) is None
+    assert reaberto.limpar_expirados() == 1
+    assert reaberto.stats()["entries"] == 0
+
+
+def test_expirados_sao_removidos_na_abertura_e_periodicamente(tmp_path):
+    relogio = Relogio()
+    cache = CacheBuscas(tmp_path / "b.db", ttl_s=60, clock=relogio, intervalo_limpeza_s=120)
+    cache.set("velha", {}, {"ok": 1})
+    relogio.t += 62
+    cache.set("nova", {}, {"ok": 2})  # ainda dentro do intervalo: não limpa
+    assert cache.stats()["entries"] == 2
+
+    relogio.t += 59
+    cache.set("outra", {}, {"ok": 3})  # intervalo vencido: a gravação limpa as expiradas
+    assert cache.stats()["entries"] == 2 and cache.stats()["expired_removed"] == 1
+    cache.close()
+
+    # reabrir (startup / configurar_busca) também limpa
+    relogio.t += 5  # "nova" venceu, "outra" não
+    reaberto = CacheBuscas(tmp_path / "b.db", ttl_s=60, clock=relogio)
+    assert reaberto.stats()["entries"] == 1
+
+
+def test_ferramenta_usa_backend_local_e_cache(busca_local):
+    tools = criar_ferramenta_busca(format="json")
+
+    r1 = json.loads(tools.web_search_using_tavily("tendências de IA", max_results=3))
+    r2 = json.loads(tools.web_search_using_tavily("Tendencias de IA ", max_results=3))
+
+    assert len(r1["results"]) == 3 and r1["results"] == r2["results"]
+    assert busca_local.chamadas == 1
+    assert busca.estatisticas_busca()["cache"]["hits"] == 1
+
+    tools.web_search_using_tavily("tendências de IA", max_results=4)  # parâmetros diferentes
+    assert busca_local.chamadas == 2
+
+
+def test_frescor_zero_forca_busca_nova_e_vale_em_threads(busca_local):
+    tools = criar_ferramenta_busca(format="json")
+    tools.web_search_using_tavily("notícias de hoje")
+
+    async def main():
+        with frescor_busca(0):
+            # as tools síncronas rodam em thread (asyncio.to_thread copia o contexto)
+            return await asyncio.to_thread(tools.web_search_using_tavily, "notícias de hoje")
+
+    asyncio.run(main())
+    tools.web_search_using_tavily("notícias de hoje")
+    assert busca_local.chamadas == 2
+
+
+def test_busca_local_com_respostas_prontas():
+    local = BuscaLocal(respostas={"Capital do Brasil": {"query": "x", "results": [{"title": "Brasília"}]}})
+    assert local.search(query="capital do brasil")["results"][0]["title"] == "Brasília"
+    assert len(local.search(query="outra", max_results=2)["results"]) == 2
+
+
+def test_tavily_base_url_aponta_o_cliente_para_outro_servidor():
+    class ClienteFalso:
+        base_url = "https://api.tavily.com"
+
+        def search(self, query, **params):
+            return {"query": query, "base_url": self.base_url, "results": []}
+
+    busca.configurar_busca("tavily", tavily_base_url="http://127.0.0.1:8900/")
+    try:
+        resposta = busca.ClienteBuscaCacheado(ClienteFalso()).search("consulta")
+    finally:
+        busca.configurar_busca()
+    assert resposta["base_url"] == "http://127.0.0.1:8900"
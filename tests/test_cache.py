@@ -0,0 +1,88 @@
+from tools.tools_cache import CacheRespostas, LRUCacheTTL, normalizar_chave
+
+
+class RelogioFake:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_normalizar_chave():
+    assert normalizar_chave("  Planeje   MINHA\tsemana ") == "planeje minha semana"
+    assert normalizar_chave("Questão de Programação") == normalizar_chave("questao de programacao")
+
+
+def test_lru_evicta_menos_recente():
+    cache = LRUCacheTTL(maxsize=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" vira o menos recente
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    st = cache.stats()
+    assert st["evictions"] == 1
+    assert st["hits"] == 3
+    assert st["misses"] == 1
+
+
+def test_ttl_expira_entrada():
+    relogio = RelogioFake()
+    cache = LRUCacheTTL(maxsize=10, ttl_s=5, clock=relogio)
+    cache.set("a", "educador")
+    relogio.t = 4.9
+    assert cache.get("a") == "educador"
+    relogio.t = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_maxsize_zero_desativa():
+    cache = LRUCacheTTL(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_limitado_por_bytes():
+    cache = LRUCacheTTL(maxsize=1000, ttl_s=60, max_bytes=3000)
+    for i in range(10):
+        cache.set(i, "x" * 1000)
+    st = cache.stats()
+    assert st["bytes"] <= 3000
+    assert st["size"] == 2 and st["evictions"] == 8
+    assert cache.get(9) is not None and cache.get(0) is None
+
+    cache.set("enorme", "x" * 10_000)  # maior que o limite: não entra
+    assert cache.get("enorme") is None
+
+
+def test_lru_bytes_contam_o_conteudo_da_chave_em_tupla():
+    cache = LRUCacheTTL(maxsize=1000, ttl_s=60, max_bytes=10_000)
+    cache.set(("educador", "p" * 3000), "r")
+    assert cache.stats()["bytes"] >= 3000
+
+    cache.set(("educador", "q" * 3000), "r")
+    cache.set(("educador", "s" * 3000), "r")
+    cache.set(("educador", "t" * 3000), "r")
+    assert cache.stats()["bytes"] <= 10_000 and cache.stats()["size"] == 3
+
+
+def test_cache_respostas_ttl_por_agente():
+    relogio = RelogioFake()
+    cache = CacheRespostas(max_bytes=1024 * 1024, ttl_padrao_s=60, ttl_por_agente={"educador": 600, "pesquisador": 0}, clock=relogio)
+    cache.set("educador", "Crie uma questão", "q1")
+    cache.set("planejador", "Planeje a semana", "p1")
+    cache.set("pesquisador", "Notícias de hoje", "n1")
+
+    assert cache.get("educador", "  crie uma QUESTAO") == "q1"
+    assert cache.get("planejador", "crie uma questão") is None  # chave inclui o agente
+    assert not cache.ativo("pesquisador") and cache.get("pesquisador", "Notícias de hoje") is None
+
+    relogio.t = 120
+    assert cache.get("planejador", "Planeje a semana") is None
+    assert cache.get("educador", "Crie uma questão") == "q1"
@@ -0,0 +1,59 @@
+from tools.tools_cache_semantico import CacheSemantico, vetorizar
+
+
+class RelogioFake:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_vetor_normalizado_e_parafrases_proximas():
+    a = vetorizar("me ajude a planejar minha semana")
+    b = vetorizar("Planeje minha semana pra mim")
+    c = vetorizar("pesquise as notícias de hoje sobre IA")
+    assert abs(float(a @ a) - 1.0) < 1e-5
+    assert float(a @ b) > 0.65 > float(a @ c)
+
+
+def test_limiar_escopo_e_ttl():
+    relogio = RelogioFake()
+    cache = CacheSemantico(capacidade=10, limiar=0.85, ttl_s=60, clock=relogio)
+    cache.set("crie uma questão de matemática sobre frações", "q1", escopo="educador")
+
+    assert cache.get("crie uma questao de matematica sobre fracoes por favor", escopo="educador") == "q1"
+    assert cache.get("crie uma questao de matematica sobre fracoes por favor", escopo="planejador") is None
+    assert cache.get("crie uma questão de física sobre energia", escopo="educador") is None
+
+    relogio.t = 61
+    assert cache.get("crie uma questão de matemática sobre frações", escopo="educador") is None
+
+
+def test_capacidade_com_evicao_lru():
+    cache = CacheSemantico(capacidade=2, limiar=0.99)
+    cache.set("explique fotossíntese", 1)
+    cache.set("explique mitose", 2)
+    assert cache.get("explique fotossíntese") == 1  # mitose vira a menos usada
+    cache.set("explique a revolução francesa", 3)
+
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+    assert cache.get("explique mitose") is None
+    assert cache.get("explique fotossíntese") == 1
+    cache.set("explique fotossíntese", 10)  # mesma pergunta: sobrescreve sem evictar
+    assert cache.get("explique fotossíntese") == 10 and cache.stats()["evictions"] == 1
+
+
+def test_mesmo_tema_com_intencao_diferente_nao_reaproveita_roteamento(monkeypatch):
+    from api.bootstrap_runtime import get_semantic_routing_cache_config
+
+    monkeypatch.delenv("SEMANTIC_ROUTING_THRESHOLD", raising=False)
+    monkeypatch.setenv("SEMANTIC_ROUTING_CACHE", "1")
+    cache = CacheSemantico(**get_semantic_routing_cache_config())
+    cache.set("pesquise as tendências de IA na educação em 2024", "pesquisador")
+
+    assert cache.get("crie um roteiro sobre as tendências de IA na educação em 2024") is None
+    assert cache.get("Pesquise as tendencias de IA na educacao em 2024") == "pesquisador"
+
+    monkeypatch.delenv("SEMANTIC_ROUTING_CACHE")
+    assert get_semantic_routing_cache_config()["capacidade"] == 0
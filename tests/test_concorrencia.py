@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from tools.tools_concorrencia import SingleFlight
+
+
+def test_single_flight_compartilha_execucao_em_andamento():
+    voos = SingleFlight()
+    chamadas = []
+
+    async def lento(valor):
+        chamadas.append(valor)
+        await asyncio.sleep(0.02)
+        return valor
+
+    async def main():
+        iguais = [voos.executar("k", lambda: lento("a")) for _ in range(5)]
+        return await asyncio.gather(*iguais, voos.executar("outra", lambda: lento("b")))
+
+    resultados = asyncio.run(main())
+
+    assert [r for r, _ in resultados] == ["a"] * 5 + ["b"]
+    assert sum(compartilhado for _, compartilhado in resultados) == 4
+    assert sorted(chamadas) == ["a", "b"]
+    assert voos.stats()["coalesced"] == 4 and voos.stats()["in_flight"] == 0
+
+
+def test_single_flight_propaga_excecao_e_nao_guarda_resultado():
+    voos = SingleFlight()
+    chamadas = []
+
+    async def falha():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falha simulada")
+
+    async def main():
+        return await asyncio.gather(*(voos.executar("k", falha) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+    assert len(chamadas) == 1
+    # terminada a execução, a próxima chamada executa de novo
+    with pytest.raises(RuntimeError):
+        asyncio.run(voos.executar("k", falha))
+    assert len(chamadas) == 2
+
+
+def test_single_flight_cancelamento_so_com_o_ultimo_chamador():
+    voos = SingleFlight()
+
+    async def main():
+        estado = {"cancelada": False}
+
+        async def lento():
+            try:
+                await asyncio.sleep(0.05)
+                return "ok"
+            except asyncio.CancelledError:
+                estado["cancelada"] = True
+                raise
+
+        a = asyncio.create_task(voos.executar("k", lento))
+        b = asyncio.create_task(voos.executar("k", lento))
+        await asyncio.sleep(0.01)
+        a.cancel()
+        assert await b == ("ok", True)
+        assert not estado["cancelada"]
+
+        c = asyncio.create_task(voos.executar("k", lento))
+        await asyncio.sleep(0.01)
+        c.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await c
+        await asyncio.sleep(0)
+        return estado["cancelada"]
+
+    assert asyncio.run(main()) is True
+    assert voos.stats()["in_flight"] == 0
+
+
+def test_single_flight_desativado_executa_sempre():
+    voos = SingleFlight(ativo=False)
+    chamadas = []
+
+    async def contar():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return len(chamadas)
+
+    async def main():
+        return await asyncio.gather(*(voos.executar("k", contar) for _ in range(3)))
+
+    asyncio.run(main())
+    assert len(chamadas) == 3
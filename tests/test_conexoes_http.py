@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from agno.utils import http as agno_http
+
+from agents import conexoes_http
+
+
+@pytest.fixture(autouse=True)
+def pool_limpo():
+    asyncio.run(conexoes_http.fechar_pool_http())
+    conexoes_http._metricas = conexoes_http._MetricasConexao()
+    conexoes_http._config = {}
+    conexoes_http._limites_pendentes = {}
+    yield
+    asyncio.run(conexoes_http.fechar_pool_http())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        corpo = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    th = threading.Thread(target=srv.serve_forever, daemon=True)
+    th.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_pool_compartilhado_instalado_no_agno():
+    conexoes_http.definir_limites_http(max_connections=7, max_keepalive_connections=3)
+    assert conexoes_http.estatisticas_http()["installed"] is False
+
+    conexoes_http.garantir_pool_http()
+    sync_client = conexoes_http._sync_client
+    conexoes_http.garantir_pool_http()
+
+    assert conexoes_http._sync_client is sync_client
+    assert agno_http.get_default_sync_client() is sync_client
+    assert agno_http.get_default_async_client() is conexoes_http._async_client
+    st = conexoes_http.estatisticas_http()
+    assert st["installed"] is True
+    assert st["config"]["max_connections"] == 7
+    assert st["config"]["max_keepalive_connections"] == 3
+
+
+def test_estatisticas_contam_reuso_de_conexao(servidor):
+    conexoes_http.garantir_pool_http()
+    for _ in range(3):
+        assert conexoes_http._sync_client.get(servidor).status_code == 200
+
+    async def chamadas_async():
+        for _ in range(2):
+            await conexoes_http._async_client.get(servidor)
+        st = conexoes_http.estatisticas_http()
+        # as conexões do AsyncClient pertencem a este loop: fecha antes de ele terminar
+        await conexoes_http.fechar_pool_http()
+        return st
+
+    st = asyncio.run(chamadas_async())
+    assert st["requests"] == 5
+    assert st["responses"] == 5
+    # uma conexão por cliente; as demais chamadas reaproveitam o keep-alive
+    assert st["new_connections"] == 2
+    assert st["reused_connections"] == 3
+    assert st["reuse_ratio"] == 0.6
+
+
+def test_reconfigurar_fecha_os_clientes_antigos():
+    conexoes_http.configurar_pool_http()
+    sync_antigo, async_antigo = conexoes_http._sync_client, conexoes_http._async_client
+
+    conexoes_http.definir_limites_http(max_connections=10)
+
+    assert sync_antigo.is_closed
+    assert async_antigo.is_closed
+    assert not conexoes_http._sync_client.is_closed
+    assert not conexoes_http._async_client.is_closed
+    assert conexoes_http.estatisticas_http()["config"]["max_connections"] == 10
+
+
+def test_reconfigurar_dentro_do_loop_fecha_o_cliente_async():
+    async def cenario():
+        conexoes_http.configurar_pool_http()
+        async_antigo = conexoes_http._async_client
+        conexoes_http.configurar_pool_http(max_connections=5)
+        await asyncio.sleep(0)
+        await asyncio.gather(*conexoes_http._fechamentos)
+        return async_antigo
+
+    assert asyncio.run(cenario()).is_closed
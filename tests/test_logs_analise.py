@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from tools.tools_logs_analise import Agregado, HistogramaDuracoes, agregar_arquivo
+
+
+def _ev(session_id, event_type, agent="", ms=0):
+    ts = datetime(2026, 10, 18, 10, tzinfo=timezone.utc) + timedelta(milliseconds=ms)
+    return {"session_id": session_id, "event_type": event_type, "agent": agent, "timestamp_utc": ts.isoformat()}
+
+
+def _gravar(path, eventos):
+    path.write_text("".join(json.dumps(ev) + "\n" for ev in eventos), encoding="utf-8")
+    return path
+
+
+def test_histograma_percentis_aproximados():
+    h = HistogramaDuracoes()
+    for ms in range(1, 1001):
+        h.registrar(ms)
+    assert abs(h.percentil(50) - 500) / 500 < 0.05
+    assert abs(h.percentil(99) - 990) / 990 < 0.05
+    assert h.percentil(100) <= 1000
+
+
+def test_pares_entre_arquivos_e_mescla(tmp_path):
+    a = _gravar(tmp_path / "a.jsonl", [
+        _ev("s1", "request_received", "api", 0),
+        _ev("s1", "agent_start", "educador", 0),
+        _ev("s1", "agent_end", "educador", 200),
+        _ev("s2", "request_received", "api", 300),
+        _ev("s2", "agent_start", "pesquisador", 300),
+    ])
+    b = _gravar(tmp_path / "b.jsonl", [
+        _ev("s2", "agent_end", "pesquisador", 1300),
+        _ev("s3", "request_received", "api", 1400),
+        _ev("s3", "agent_start", "educador", 1400),
+        _ev("s3", "error", "api", 1500),
+    ])
+
+    total = Agregado()
+    for path in (a, b):
+        total.mesclar(agregar_arquivo(path))
+    rel = total.relatorio()
+
+    assert rel["files"] == 2 and rel["events"] == 9
+    assert rel["requests"] == 3 and rel["errors"] == 1
+    assert rel["by_hour"] == {"2026-10-18T10": 9}
+    assert rel["agents"]["pesquisador"]["duration"]["count"] == 1
+    assert abs(rel["agents"]["pesquisador"]["duration"]["p50_ms"] - 1000) < 50
+    assert rel["agents"]["educador"]["executions"] == 2
+    assert rel["agents"]["educador"]["error_rate"] == 0.5
+    assert rel["open_executions"] == 0
+
+
+def test_pendentes_limitados(tmp_path):
+    path = _gravar(tmp_path / "a.jsonl", [_ev(f"s{i}", "agent_start", "educador", i) for i in range(50)])
+    ag = agregar_arquivo(path, max_pendentes=10)
+    assert len(ag.pendentes) == 10 and ag.descartados == 40
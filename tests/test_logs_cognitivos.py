@@ -0,0 +1,358 @@
+import gzip
+import json
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from tools.tools_logs_cognitivos import CognitiveLogger, linhas_markdown
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import (
+    SegmentStore,
+    fontes_de_log,
+    iter_eventos_arquivo,
+    ler_manifesto,
+    ler_ultimos_eventos,
+    manifestos,
+)
+from tools.tools_logs_sqlite import SQLiteEventStore
+
+
+def _linhas(path):
+    if not path.exists():
+        return []
+    return [json.loads(ln) for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+
+
+def test_logger_sincrono_grava_jsonl_e_markdown(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", md_path=tmp_path / "log.md", write_markdown=True)
+    logger.log(session_id="s1", event_type="agent_end", agent="educador", output_text="ok")
+
+    ev = _linhas(logger.jsonl_path)[0]
+    assert ev["session_id"] == "s1" and ev["output"] == "ok"
+    assert "agent_end" in logger.md_path.read_text(encoding="utf-8")
+
+
+def test_markdown_desligado_por_padrao_e_gerado_do_jsonl(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", md_path=tmp_path / "log.md")
+    logger.log(session_id="s1", event_type="agent_end", agent="educador", output_text="ok", metadata={"k": 1})
+    assert not logger.md_path.exists()
+
+    # o registro renderizado do JSONL é o mesmo que o logger gravaria
+    ev = _linhas(logger.jsonl_path)[0]
+    md = "".join(linhas_markdown(ev))
+    assert f"## {ev['timestamp_utc']} — agent_end" in md
+    assert "- **agent:** `educador`" in md and "> ok" in md and '{"k": 1}' in md
+
+    ligado = CognitiveLogger(jsonl_path=tmp_path / "b.jsonl", md_path=tmp_path / "b.md", write_markdown=True)
+    ligado.log(session_id="s1", event_type="agent_end", agent="educador", output_text="ok", metadata={"k": 1})
+    escrito = ligado.md_path.read_text(encoding="utf-8")
+    assert escrito == "".join(linhas_markdown(_linhas(ligado.jsonl_path)[0]))
+
+
+def test_logger_assincrono_grava_em_lote_e_flush(tmp_path):
+    logger = CognitiveLogger(
+        jsonl_path=tmp_path / "log.jsonl",
+        write_markdown=False,
+        async_mode=True,
+        flush_batch=50,
+        flush_interval_s=10,
+    )
+    for i in range(120):
+        logger.log(session_id="s1", event_type="agent_start", metadata={"i": i})
+    logger.flush()
+
+    eventos = _linhas(logger.jsonl_path)
+    assert [e["metadata"]["i"] for e in eventos] == list(range(120))
+    st = logger.stats()
+    assert st["written"] == 120
+    assert st["flushes"] <= 4
+    logger.close()
+
+
+def test_logger_close_grava_pendentes(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", write_markdown=False, async_mode=True, flush_interval_s=10)
+    logger.log(session_id="s1", event_type="request_received")
+    logger.close()
+    assert len(_linhas(logger.jsonl_path)) == 1
+
+    # depois do close, volta a gravar de forma síncrona
+    logger.log(session_id="s1", event_type="agent_end")
+    assert len(_linhas(logger.jsonl_path)) == 2
+
+
+def test_logger_overflow_drop(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", write_markdown=False, async_mode=True, queue_size=1, flush_batch=1, overflow="drop")
+    original = logger._escrever_lote
+
+    def escrita_lenta(eventos):
+        # segura a thread de escrita para a fila encher
+        time.sleep(0.2)
+        original(eventos)
+
+    logger._escrever_lote = escrita_lenta
+    for _ in range(20):
+        logger.log(session_id="s1", event_type="agent_start")
+    logger.close()
+
+    st = logger.stats()
+    assert st["dropped"] > 0
+    assert st["enqueued"] + st["dropped"] == 20
+    assert len(_linhas(logger.jsonl_path)) == st["enqueued"]
+
+
+def test_flush_nao_espera_eventos_que_chegam_depois(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", async_mode=True, flush_batch=10, flush_interval_s=0.01)
+    original = logger._escrever_lote
+
+    def escrita_lenta(eventos):
+        time.sleep(0.02)
+        original(eventos)
+
+    logger._escrever_lote = escrita_lenta
+    parar = threading.Event()
+
+    def trafego():
+        # tráfego contínuo: a fila nunca esvazia
+        while not parar.is_set():
+            logger.log(session_id="s1", event_type="agent_start")
+            time.sleep(0.0005)
+
+    t = threading.Thread(target=trafego)
+    t.start()
+    try:
+        time.sleep(0.1)
+        logger.log(session_id="s1", event_type="agent_end")
+        t0 = time.perf_counter()
+        assert logger.flush(timeout_s=5) is True
+        assert time.perf_counter() - t0 < 2
+        assert any(e["event_type"] == "agent_end" for e in _linhas(logger.jsonl_path))
+
+        # escrita travada: o flush desiste no timeout em vez de bloquear
+        logger._escrever_lote = lambda eventos: time.sleep(0.5)
+        logger.log(session_id="s1", event_type="agent_end")
+        assert logger.flush(timeout_s=0.05) is False
+    finally:
+        parar.set()
+        t.join()
+        logger._escrever_lote = original
+        logger.close()
+
+
+def _evento(ts, i=0):
+    return {"event_id": str(i), "timestamp_utc": ts, "session_id": "s", "event_type": "agent_start", "metadata": {"i": i}}
+
+
+def test_segmentos_rotacionam_por_hora_e_tamanho(tmp_path):
+    store = SegmentStore(tmp_path / "seg", max_bytes=1024, compactar_apos_h=None)
+    store.append([_evento("2026-10-18T14:00:00+00:00", 0), _evento("2026-10-18T15:00:00+00:00", 1)])
+    store.append([_evento("2026-10-18T15:30:00+00:00", i) for i in range(2, 30)])
+    store.close()
+
+    segs = ler_manifesto(tmp_path / "seg")
+    assert segs[0]["bucket"] == "2026-10-18T14" and segs[0]["events"] == 1
+    assert len(segs) > 2  # hora 15 dividida por tamanho
+    assert all(s["bytes"] <= 1024 for s in segs)
+    assert sum(s["events"] for s in segs) == 30
+
+    so_14h = store.segmentos(desde="2026-10-18T14:00", ate="2026-10-18T14:59")
+    assert [s["file"] for s in so_14h] == [segs[0]["file"]]
+
+
+def test_segmentos_retencao_e_compactacao(tmp_path):
+    store = SegmentStore(tmp_path / "seg", retencao_dias=7, compactar_apos_h=24, manutencao_automatica=False)
+    store.append([_evento("2026-10-01T10:00:00+00:00", 0)])
+    store.append([_evento("2026-10-16T10:00:00+00:00", 1)])
+    store.append([_evento("2026-10-18T10:00:00+00:00", 2)])
+
+    res = store.aplicar_politicas(agora=datetime(2026, 10, 18, 12, tzinfo=timezone.utc))
+    assert res == {"removidos": 1, "compactados": 1}
+
+    arquivos = [s["file"] for s in store.segmentos()]
+    assert arquivos[0].endswith(".jsonl.gz")
+    assert [e["metadata"]["i"] for p in arquivos for e in iter_eventos_arquivo(tmp_path / "seg" / p)] == [1, 2]
+
+
+def test_retencao_poda_o_indice_de_sessoes(tmp_path):
+    store = SegmentStore(tmp_path / "segments", retencao_dias=7, compactar_apos_h=24, manutencao_automatica=False)
+    index = SessionIndex(tmp_path, tmp_path / "segments" / "index", shards=2)
+    logger = CognitiveLogger(jsonl_path=tmp_path / "legado.jsonl", segment_store=store, session_index=index)
+    for i, ts in enumerate(["2026-10-01T10:00:00+00:00", "2026-10-16T10:00:00+00:00", "2026-10-18T10:00:00+00:00"]):
+        logger.store.gravar([{**_evento(ts, i), "session_id": f"s{i}"}, {**_evento(ts, i), "session_id": "longa"}])
+    linhas_antes = sum(len(p.read_text().splitlines()) for p in index.index_dir.glob("*.idx"))
+
+    res = store.aplicar_politicas(agora=datetime(2026, 10, 18, 12, tzinfo=timezone.utc))
+    assert res == {"removidos": 1, "compactados": 1}
+
+    # registros do segmento removido saíram das partições; os do compactado continuam
+    linhas = [ln for p in index.index_dir.glob("*.idx") for ln in p.read_text().splitlines()]
+    assert len(linhas) == linhas_antes - 2 and not any(ln.startswith("s0\t") for ln in linhas)
+    assert index.eventos("s0") == []
+    assert [e["metadata"]["i"] for e in index.eventos("s1")] == [1]
+    assert [e["metadata"]["i"] for e in index.eventos("longa")] == [1, 2]
+
+    # appends continuam depois da poda
+    logger.store.gravar([{**_evento("2026-10-18T11:00:00+00:00", 3), "session_id": "longa"}])
+    assert [e["metadata"]["i"] for e in index.eventos("longa")] == [1, 2, 3]
+
+
+def test_logger_com_segmentos_le_ultimos_pelo_manifesto(tmp_path):
+    store = SegmentStore(tmp_path / "seg", max_bytes=2048)
+    logger = CognitiveLogger(jsonl_path=tmp_path / "legado.jsonl", write_markdown=False, segment_store=store)
+    for i in range(40):
+        logger.log(session_id=f"s{i % 2}", event_type="agent_start", metadata={"i": i})
+
+    assert len(logger.fontes()) > 1
+    assert [e["metadata"]["i"] for e in logger.ultimos(5)] == [35, 36, 37, 38, 39]
+    assert all(e["session_id"] == "s1" for e in logger.eventos_da_sessao("s1", n=10))
+
+
+def test_tail_reverso_le_so_o_fim_e_ignora_linha_parcial(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(1000):
+            f.write(json.dumps({"i": i, "pad": "x" * (i % 37)}) + "\n")
+        f.write('{"i": 1000, "pad": "esc')  # escrita em andamento
+
+    assert [e["i"] for e in ler_ultimos_eventos(path, 3, bloco=64)] == [997, 998, 999]
+    assert [e["i"] for e in ler_ultimos_eventos(path, 1, bloco=7)] == [999]
+    assert len(ler_ultimos_eventos(path, 5000)) == 1000
+    assert ler_ultimos_eventos(tmp_path / "nao_existe.jsonl", 3) == []
+
+
+def test_tail_completa_n_eventos_apesar_de_linhas_invalidas(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(10):
+            f.write(json.dumps({"i": i}) + "\n")
+        f.write('{"i": 10, "pad": "cor\n')  # linha truncada por outro writer
+        f.write(json.dumps({"i": 11}) + "\n")
+        f.write('{"i": 12, "pad": "esc')  # escrita em andamento
+
+    for bloco in (1, 5, 64, 64 * 1024):
+        assert [e["i"] for e in ler_ultimos_eventos(path, 3, bloco=bloco)] == [8, 9, 11]
+    assert [e["i"] for e in ler_ultimos_eventos(path, 1, bloco=4)] == [11]
+    assert len(ler_ultimos_eventos(path, 50, bloco=8)) == 11
+
+
+def test_tail_em_segmento_compactado(tmp_path):
+    path = tmp_path / "seg.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for i in range(100):
+            f.write(json.dumps({"i": i}) + "\n")
+
+    assert [e["i"] for e in ler_ultimos_eventos(path, 2)] == [98, 99]
+
+
+def test_indice_de_sessoes_retorna_linha_do_tempo_completa(tmp_path):
+    store = SegmentStore(tmp_path / "segments", max_bytes=1024, compactar_apos_h=None)
+    index = SessionIndex(tmp_path, tmp_path / "segments" / "index", shards=8)
+    logger = CognitiveLogger(jsonl_path=tmp_path / "legado.jsonl", write_markdown=False, segment_store=store, session_index=index)
+
+    logger.log(session_id="antiga", event_type="request_received", metadata={"i": 0})
+    for i in range(1, 60):
+        logger.log(session_id=f"outra-{i}", event_type="agent_start", metadata={"i": i})
+    logger.log(session_id="antiga", event_type="agent_end", metadata={"i": 60})
+
+    # fora da janela dos últimos eventos, mas presente no índice
+    eventos = logger.eventos_da_sessao("antiga", n=10)
+    assert [e["metadata"]["i"] for e in eventos] == [0, 60]
+    assert len({e for e, _, _ in index.buscar("antiga")}) == 2  # dois segmentos diferentes
+
+
+def test_indice_reconstruido_inclui_legado_e_compactados(tmp_path):
+    legado = tmp_path / "cognitive_log.jsonl"
+    legado.write_text(json.dumps({"session_id": "s1", "timestamp_utc": "2026-01-01T00:00:00", "i": 0}) + "\n", encoding="utf-8")
+
+    store = SegmentStore(tmp_path / "segments", manutencao_automatica=False)
+    store.append([{"session_id": "s1", "timestamp_utc": "2026-10-10T10:00:00+00:00", "i": 1}])
+    store.append([{"session_id": "s2", "timestamp_utc": "2026-10-18T10:00:00+00:00", "i": 2}])
+    store.close()
+
+    index = SessionIndex(tmp_path, tmp_path / "segments" / "index", shards=4)
+    assert index.reconstruir(fontes_de_log(tmp_path)) == {"arquivos": 3, "eventos": 3}
+
+    # compactação depois de indexar: o índice resolve o .gz
+    store.aplicar_politicas(agora=datetime(2026, 10, 18, 12, tzinfo=timezone.utc))
+    assert [e["i"] for e in index.eventos("s1")] == [0, 1]
+
+
+def _worker_de_log(base, n):
+    # processo de um "worker" da API: segmentos próprios, índice compartilhado
+    store = SegmentStore(base / "segments", max_bytes=64 * 1024, worker=os.getpid(), manutencao_automatica=False)
+    index = SessionIndex(base, base / "segments" / "index", shards=4)
+    logger = CognitiveLogger(
+        jsonl_path=base / "legado.jsonl",
+        md_path=base / f"log-w{os.getpid()}.md",
+        async_mode=True,
+        flush_batch=8,
+        segment_store=store,
+        session_index=index,
+    )
+    for i in range(n):
+        logger.log(session_id=f"s{i % 5}", event_type="agent_end", output_text="x" * 1990, metadata={"i": i, "pid": os.getpid()})
+    logger.close()
+
+
+def test_varios_processos_gravam_sem_intercalar_e_leitura_mescla(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    processos = [ctx.Process(target=_worker_de_log, args=(tmp_path, 150)) for _ in range(3)]
+    for p in processos:
+        p.start()
+    for p in processos:
+        p.join(timeout=60)
+    assert all(p.exitcode == 0 for p in processos)
+
+    fontes = fontes_de_log(tmp_path)
+    eventos = [ev for path in fontes for ev in iter_eventos_arquivo(path)]
+    assert len(eventos) == 450  # nenhuma linha corrompida
+    assert len(manifestos(tmp_path / "segments")) == 3
+
+    # um novo worker adota os manifestos dos que morreram e lê tudo, em ordem
+    store = SegmentStore(tmp_path / "segments", worker=os.getpid(), manutencao_automatica=False)
+    index = SessionIndex(tmp_path, tmp_path / "segments" / "index", shards=4)
+    logger = CognitiveLogger(jsonl_path=tmp_path / "legado.jsonl", write_markdown=False, segment_store=store, session_index=index)
+    assert manifestos(tmp_path / "segments") == [tmp_path / "segments" / f"manifest-w{os.getpid()}.json"]
+    assert all(s["closed"] for s in store.segmentos())
+
+    todos = list(logger.iter_eventos())
+    assert [e["timestamp_utc"] for e in todos] == sorted(e["timestamp_utc"] for e in todos)
+    assert logger.ultimos(10) == todos[-10:]
+
+    sessao = logger.eventos_da_sessao("s3", n=1000)
+    assert len(sessao) == 90
+    for pid in {e["metadata"]["pid"] for e in sessao}:
+        ordem = [e["metadata"]["i"] for e in sessao if e["metadata"]["pid"] == pid]
+        assert ordem == sorted(ordem)
+
+
+def test_backend_sqlite_consultas_indexadas(tmp_path):
+    store = SQLiteEventStore(tmp_path / "log.db")
+    logger = CognitiveLogger(md_path=tmp_path / "log.md", write_markdown=False, async_mode=True, store=store)
+    for i in range(30):
+        logger.log(session_id=f"s{i % 3}", event_type="error" if i % 10 == 0 else "agent_end", agent=f"a{i % 2}", metadata={"i": i})
+    logger.flush()
+
+    assert [e["metadata"]["i"] for e in logger.ultimos(3)] == [27, 28, 29]
+    assert [e["metadata"]["i"] for e in logger.eventos_da_sessao("s1", n=2)] == [25, 28]
+    assert [e["metadata"]["i"] for e in logger.consultar(event_type="error", agent="a0")] == [0, 10, 20]
+    assert logger.stats()["storage"]["backend"] == "sqlite"
+
+    plano = store._leitura().execute("EXPLAIN QUERY PLAN SELECT data FROM events WHERE session_id = ?", ["s1"]).fetchall()
+    assert "ix_events_session" in str(plano)
+
+    logger.close()
+    assert store._leitura().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_importacao_sqlite_e_idempotente(tmp_path):
+    logger = CognitiveLogger(jsonl_path=tmp_path / "log.jsonl", write_markdown=False)
+    for i in range(5):
+        logger.log(session_id="s1", event_type="agent_end", metadata={"i": i})
+
+    store = SQLiteEventStore(tmp_path / "log.db")
+    assert store.importar(iter_eventos_arquivo(logger.jsonl_path), lote=2) == 5
+    assert store.importar(iter_eventos_arquivo(logger.jsonl_path)) == 0
+    assert store.contar() == 5
+    assert [e["metadata"]["i"] for e in store.eventos_da_sessao("s1")] == list(range(5))
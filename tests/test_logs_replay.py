@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from tools.tools_logs_replay import ResultadoReplay, extrair_requisicoes, instante_replay
+
+
+def _ev(event_type, session_id, ms, entrada="", saida=""):
+    ts = datetime(2026, 10, 18, 10, tzinfo=timezone.utc) + timedelta(milliseconds=ms)
+    return {"event_type": event_type, "session_id": session_id, "timestamp_utc": ts.isoformat(), "input": entrada, "output": saida}
+
+
+def test_extrai_requisicoes_com_decisao_original_e_intervalos():
+    eventos = [
+        _ev("request_received", "a", 0, "Crie uma questão"),
+        _ev("routing_start", "b", 500, "Pesquise IA"),
+        _ev("routing_decision", "b", 700, "Pesquise IA", "pesquisador"),
+        _ev("routing_decision", "a", 900, "Crie uma questão", "educador"),
+        _ev("agent_end", "a", 1500, "Crie uma questão", "resposta"),
+        # mesma sessão (X-Session-Id) com duas perguntas
+        _ev("request_received", "a", 2000, "planejar semana"),
+        _ev("routing_decision", "a", 2100, "planejar semana", "planejador"),
+        _ev("request_received", "c", 3000, "sem decisão registrada"),
+    ]
+
+    reqs = extrair_requisicoes(eventos)
+
+    assert [(r.endpoint, r.agente_original, r.offset_s) for r in reqs] == [
+        ("/run", "educador", 0.0),
+        ("/route", "pesquisador", 0.5),
+        ("/run", "planejador", 2.0),
+        ("/run", None, 3.0),
+    ]
+    assert instante_replay(reqs[2], velocidade=10) == 0.2
+    assert instante_replay(reqs[2], velocidade=0) == 0.0
+    assert [r.endpoint for r in extrair_requisicoes(eventos, endpoints=["/route"])] == ["/route"]
+    assert len(extrair_requisicoes(eventos, limite=2)) == 2
+
+
+def test_resultado_compara_roteamento_e_conta_erros():
+    reqs = extrair_requisicoes(
+        [
+            _ev("request_received", "a", 0, "q1"),
+            _ev("routing_decision", "a", 10, "q1", "educador"),
+            _ev("request_received", "b", 20, "q2"),
+            _ev("routing_decision", "b", 30, "q2", "planejador"),
+            _ev("request_received", "c", 40, "q3"),
+        ]
+    )
+    res = ResultadoReplay()
+    assert res.registrar(reqs[0], 200, 120.0, "educador") is True
+    assert res.registrar(reqs[1], 200, 80.0, "conteudo") is False
+    assert res.registrar(reqs[2], 500, 5.0) is None
+
+    rel = res.resumo(duracao_s=2.0)
+    assert rel["requests"] == 3 and rel["errors"] == 1 and rel["rps"] == 1.5
+    assert rel["routing"]["agreement"] == 0.5
+    assert rel["routing"]["divergences"] == [{"original": "planejador", "replay": "conteudo", "count": 1}]
+    assert rel["latency"]["/run"]["count"] == 3
@@ -0,0 +1,53 @@
+from tools.tools_memoria_sessao import MemoriaSessoes, estimar_tokens
+
+
+class RelogioFake:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_turnos_antigos_viram_resumo_dentro_do_orcamento():
+    memoria = MemoriaSessoes(orcamento_tokens=300, max_turnos=3)
+    for i in range(20):
+        memoria.registrar_turno("s1", f"pergunta {i} " + "x" * 80, f"resposta {i} " + "y" * 200, agente="educador")
+        assert estimar_tokens(memoria.contexto("s1")) <= 300 + 20  # + cabeçalhos
+
+    contexto = memoria.contexto("s1")
+    # o último turno fica na íntegra; os antigos, como linhas do resumo rolante
+    assert "Usuário: pergunta 19" in contexto
+    assert "Resumo da conversa até aqui:\n- [educador] pergunta" in contexto
+    assert "pergunta 0 " not in contexto
+    st = memoria.stats()
+    assert st["turns"] == 20 and st["compactions"] >= 17
+
+    # turno maior que o orçamento é cortado
+    memoria.registrar_turno("s2", "p", "z" * 10_000)
+    assert estimar_tokens(memoria.contexto("s2")) <= 300
+
+
+def test_sessoes_com_lru_ttl_e_limite_de_bytes():
+    relogio = RelogioFake()
+    memoria = MemoriaSessoes(max_sessoes=2, ttl_s=10, clock=relogio)
+    memoria.registrar_turno("a", "oi", "olá")
+    memoria.registrar_turno("b", "oi", "olá")
+    assert memoria.contexto("a")  # "b" vira a menos recente
+    memoria.registrar_turno("c", "oi", "olá")
+    assert memoria.contexto("b") == "" and memoria.contexto("a") and memoria.contexto("c")
+    assert memoria.stats()["evictions"] == 1
+
+    relogio.t = 9.9
+    assert memoria.contexto("a")  # uso renova o TTL
+    relogio.t = 15.0
+    assert memoria.contexto("c") == "" and memoria.contexto("a")
+    assert memoria.stats()["expirations"] == 1
+
+    # limite de bytes: milhares de sessões cabem num teto fixo
+    memoria = MemoriaSessoes(max_sessoes=100_000, max_bytes=200_000)
+    for i in range(5000):
+        memoria.registrar_turno(f"s{i}", "pergunta " * 10, "resposta " * 40)
+    st = memoria.stats()
+    assert st["bytes"] <= 200_000 and 0 < st["sessions"] < 5000
+    assert memoria.contexto("s4999") and memoria.contexto("s0") == ""
@@ -0,0 +1,29 @@
+from tools.tools_metricas import Cronometro, RegistroMetricas
+
+
+def test_exportacao_prometheus():
+    reg = RegistroMetricas()
+    req = reg.contador("x_requests_total", "Requisições", ["route"])
+    lat = reg.histograma("x_duration_seconds", "Latência", ["stage"], buckets=(0.1, 1.0))
+    req.inc(route='/a"b')
+    req.inc(2, route='/a"b')
+    lat.observar(0.05, stage="agent")
+    lat.observar(0.5, stage="agent")
+    lat.observar(5, stage="agent")
+
+    texto = reg.exportar()
+    assert "# TYPE x_requests_total counter" in texto
+    assert 'x_requests_total{route="/a\\"b"} 3' in texto
+    assert 'x_duration_seconds_bucket{stage="agent",le="0.1"} 1' in texto
+    assert 'x_duration_seconds_bucket{stage="agent",le="1"} 2' in texto
+    assert 'x_duration_seconds_bucket{stage="agent",le="+Inf"} 3' in texto
+    assert 'x_duration_seconds_count{stage="agent"} 3' in texto
+    assert reg.contador("x_requests_total", "Requisições", ["route"]) is req
+
+
+def test_cronometro_observa_ao_sair():
+    reg = RegistroMetricas()
+    lat = reg.histograma("y_seconds", "Latência", ["stage"])
+    with Cronometro(lat, stage="routing") as c:
+        pass
+    assert c.ms >= 0 and lat.total(stage="routing") == 1
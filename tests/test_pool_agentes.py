@@ -0,0 +1,197 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents.pool_agentes import AgentPool, AgentPoolTimeout, ConsultasAgente
+
+
+def _factory():
+    return object()
+
+
+def test_pool_reaproveita_instancia():
+    pool = AgentPool("teste", _factory, size=2)
+
+    with pool.checkout() as a1:
+        pass
+    with pool.checkout() as a2:
+        pass
+
+    assert a1 is a2
+    st = pool.stats()
+    assert st["misses"] == 1
+    assert st["hits"] == 1
+    assert st["created"] == 1
+    assert st["in_use"] == 0
+
+
+def test_pool_warmup_preenche_ate_size():
+    pool = AgentPool("teste", _factory, size=3)
+    assert pool.warmup() == 3
+    assert pool.warmup() == 0
+    assert pool.stats()["idle"] == 3
+
+
+def test_pool_espera_devolucao_e_timeout():
+    pool = AgentPool("teste", _factory, size=1)
+    agent = pool.acquire()
+
+    with pytest.raises(AgentPoolTimeout):
+        pool.acquire(timeout=0.01)
+
+    threading.Timer(0.05, pool.release, args=(agent,)).start()
+    assert pool.acquire(timeout=2) is agent
+
+    st = pool.stats()
+    assert st["waits"] == 2
+    assert st["timeouts"] == 1
+
+
+def test_pool_falha_na_factory_libera_vaga():
+    chamadas = []
+
+    def factory():
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            raise RuntimeError("falhou")
+        return object()
+
+    pool = AgentPool("teste", factory, size=1)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.acquire(timeout=0.1) is not None
+
+
+def test_pool_acheckout_espera_sem_bloquear_loop():
+    pool = AgentPool("teste", _factory, size=1)
+
+    async def usar(ordem, tag):
+        async with pool.acheckout(timeout=2):
+            ordem.append(tag)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ordem = []
+        await asyncio.gather(*(usar(ordem, i) for i in range(3)))
+        return ordem
+
+    assert sorted(asyncio.run(main())) == [0, 1, 2]
+    st = pool.stats()
+    assert st["created"] == 1
+    assert st["in_use"] == 0
+    assert st["waits"] == 2
+
+
+def test_configuracao_vale_para_pools_registrados_depois(monkeypatch):
+    from agents import pool_agentes
+
+    monkeypatch.setattr(pool_agentes, "_POOLS", {})
+    monkeypatch.setattr(pool_agentes, "_CONFIG", {})
+
+    pool_agentes.configurar_pools(4, overrides={"educador": 1}, acquire_timeout=5)
+    educador = pool_agentes.registrar_pool("educador", _factory)
+    outro = pool_agentes.registrar_pool("conteudo", _factory)
+
+    assert educador.size == 1
+    assert outro.size == 4
+    assert outro.acquire_timeout == 5
+
+
+def test_pool_acheckout_espera_sem_ocupar_threads_do_executor():
+    pool = AgentPool("teste", _factory, size=2)
+
+    async def usar():
+        async with pool.acheckout(timeout=5):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        esperas = [asyncio.create_task(usar()) for _ in range(60)]
+        await asyncio.sleep(0)
+        # com o pool esgotado, outras chamadas ao executor não ficam na fila atrás das esperas
+        t0 = asyncio.get_running_loop().time()
+        await asyncio.to_thread(lambda: None)
+        atraso = asyncio.get_running_loop().time() - t0
+        await asyncio.gather(*esperas)
+        return atraso
+
+    assert asyncio.run(main()) < 0.1
+    st = pool.stats()
+    assert st["created"] == 2 and st["in_use"] == 0 and st["waits"] == 58
+
+
+def test_pool_aacquire_timeout_e_devolucao_por_outra_thread():
+    pool = AgentPool("teste", _factory, size=1)
+    agent = pool.acquire()
+
+    async def main():
+        with pytest.raises(AgentPoolTimeout):
+            await pool.aacquire(timeout=0.01)
+        # devolução feita por uma thread (caminho síncrono) acorda a corrotina
+        threading.Timer(0.05, pool.release, args=(agent,)).start()
+        return await pool.aacquire(timeout=2)
+
+    assert asyncio.run(main()) is agent
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_padrao_aceita_mais_execucoes_simultaneas_que_o_lote(monkeypatch):
+    from agents import pool_agentes
+
+    monkeypatch.setattr(pool_agentes, "_POOLS", {})
+    monkeypatch.setattr(pool_agentes, "_CONFIG", {})
+    pool = pool_agentes.registrar_pool("educador", _factory)
+
+    async def main():
+        todos_dentro = asyncio.Event()
+        dentro = []
+
+        async def usar():
+            async with pool.acheckout(timeout=1):
+                dentro.append(1)
+                if len(dentro) == 6:
+                    todos_dentro.set()
+                # só sai quando as 6 execuções estão ao mesmo tempo com uma instância
+                await asyncio.wait_for(todos_dentro.wait(), 1)
+
+        await asyncio.gather(*(usar() for _ in range(6)))
+
+    asyncio.run(main())
+    st = pool.stats()
+    assert st["created"] == 6 and st["waits"] == 0
+
+
+class _AgenteStub:
+    def __init__(self, saida):
+        self.saida = saida
+
+    def run(self, pergunta):
+        return self.saida
+
+    async def arun(self, pergunta):
+        return self.saida
+
+
+def test_consultas_levantam_erro_do_provedor():
+    from agno.run.agent import RunOutput
+    from agno.run.base import RunStatus
+
+    falha = RunOutput(content="Error code: 429 - rate limit", status=RunStatus.error)
+    consultas = ConsultasAgente(AgentPool("teste", lambda: _AgenteStub(falha), size=1), _factory)
+
+    with pytest.raises(RuntimeError, match="429"):
+        consultas.run_query("oi")
+    with pytest.raises(RuntimeError, match="429"):
+        asyncio.run(consultas.arun_query("oi"))
+    assert consultas.pool.stats()["in_use"] == 0
+
+
+def test_consultas_devolvem_conteudo():
+    from agno.run.agent import RunOutput
+    from agno.run.base import RunStatus
+
+    ok = RunOutput(content="  resposta  ", status=RunStatus.completed)
+    consultas = ConsultasAgente(AgentPool("teste", lambda: _AgenteStub(ok), size=1), _factory)
+
+    assert consultas.run_query("oi") == "resposta"
+    assert asyncio.run(consultas.arun_query("oi")) == "resposta"
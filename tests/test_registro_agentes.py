@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import types
+
+from agents import agente_orquestrador as orquestrador
+from agents import registro_agentes
+from agents.registro_agentes import AgentSpec
+
+
+def test_registro_declara_agentes_e_heuristica():
+    assert registro_agentes.nomes_agentes() == ["pesquisador", "educador", "planejador", "conteudo", "diagnostico"]
+    assert orquestrador.palpite_heuristico("Pesquise artigos sobre provas") == "pesquisador"  # ordem = prioridade
+    assert orquestrador.palpite_heuristico("Quero planejar minha rotina") == "planejador"
+    assert orquestrador.decidir_agente_heuristica("oi") == "diagnostico"
+    assert registro_agentes.obter_agente("inexistente").nome == "diagnostico"
+    assert registro_agentes.provedores_do_agente("pesquisador") == ("openai", "tavily")
+    assert registro_agentes.config_por_agente("cache_ttl_s") == {"pesquisador": 0}
+
+
+def test_agente_novo_sem_tocar_no_orquestrador(monkeypatch):
+    modulo = types.ModuleType("tests.agente_eco")
+
+    async def arun_query(pergunta):
+        return f"eco: {pergunta}"
+
+    modulo.arun_query = arun_query
+    monkeypatch.setitem(sys.modules, "tests.agente_eco", modulo)
+    monkeypatch.setattr(registro_agentes, "_AGENTES", dict(registro_agentes._AGENTES))
+    monkeypatch.setattr(orquestrador, "_carregados", {})
+
+    registro_agentes.registrar_agente(
+        AgentSpec(nome="eco", modulo="tests.agente_eco", palavras_chave=("repita",), timeout_s=5)
+    )
+
+    assert orquestrador.decidir_agente_por_resposta("eco") == "eco"
+    assert orquestrador.palpite_heuristico("repita isso") == "eco"
+    assert asyncio.run(orquestrador.executar_agente_query_async("eco", "oi")) == "eco: oi"
+    assert orquestrador.agentes_carregados() == ["eco"]
+    assert registro_agentes.config_por_agente("timeout_s") == {"eco": 5}
+
+
+def test_carregar_agente_async_usa_nome_do_registro(monkeypatch):
+    modulo = types.ModuleType("agente_diagnostico_stub")
+    monkeypatch.setattr(orquestrador, "_carregados", {"diagnostico": modulo})
+
+    async def sem_thread(*args, **kwargs):
+        raise AssertionError("módulo já carregado não deveria ir para o executor")
+
+    monkeypatch.setattr(orquestrador.asyncio, "to_thread", sem_thread)
+
+    assert asyncio.run(orquestrador.carregar_agente_async("inexistente")) is modulo
+    assert asyncio.run(orquestrador.carregar_agente_async("diagnostico")) is modulo
@@ -0,0 +1,304 @@
+# tools/tools_busca_web.py
+"""
+BUSCA WEB COM CACHE PERSISTENTE (SQLITE)
+
+A busca do Tavily é a etapa mais lenta e cara do agente pesquisador, e muitas
+perguntas de pesquisa se repetem ao longo do dia. Aqui o cliente do `TavilyTools`
+ganha um cache em disco:
+
+- chave: consulta normalizada + parâmetros da busca (profundidade, max_results, ...)
+- SQLite (WAL): sobrevive a reinícios e é compartilhado entre workers
+- TTL na leitura; `frescor_busca(max_idade_s)` restringe a idade aceita por requisição
+  (0 = força busca nova; o resultado novo é gravado mesmo assim)
+- `BuscaLocal`: backend offline e determinístico no lugar do Tavily (testes, dev sem chave)
+
+A configuração (`configurar_busca`) é global e lida a cada busca: instâncias do
+agente criadas antes do startup passam a usar o cache sem serem reconstruídas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.tools_cache import normalizar_chave
+
+# idade máxima aceita para um resultado em cache, por requisição (None = TTL do cache)
+_FRESCOR: ContextVar[Optional[float]] = ContextVar("frescor_busca", default=None)
+
+
+@contextmanager
+def frescor_busca(max_idade_s: Optional[float]) -> Iterator[None]:
+    """Limita a idade dos resultados em cache dentro do bloco (vale para tarefas e threads filhas)."""
+    token = _FRESCOR.set(max_idade_s)
+    try:
+        yield
+    finally:
+        _FRESCOR.reset(token)
+
+
+def frescor_atual() -> Optional[float]:
+    return _FRESCOR.get()
+
+
+def chave_busca(consulta: str, parametros: Dict[str, Any]) -> str:
+    params = {k: v for k, v in parametros.items() if v is not None}
+    bruto = json.dumps([normalizar_chave(consulta), params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buscas (
+    chave TEXT PRIMARY KEY,
+    consulta TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    resposta TEXT NOT NULL,
+    gravado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_buscas_gravado ON buscas (gravado_em);
+"""
+
+
+class CacheBuscas:
+    """
+    Resultados de busca por (consulta normalizada, parâmetros), com TTL.
+    - `ttl_s`: idade máxima padrão; entradas mais velhas são ignoradas na leitura
+      e removidas por `limpar_expirados()`: na abertura e, depois, a cada
+      `intervalo_limpeza_s` durante as gravações (o arquivo não cresce sem limite)
+    - uma conexão protegida por lock: as tools rodam em threads do agno
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_s: float = 21600.0,
+        busy_timeout_s: float = 5.0,
+        clock=time.time,
+        intervalo_limpeza_s: float = 3600.0,
+    ):
+        self.path = Path(path)
+        self.ttl_s = float(ttl_s)
+        self.intervalo_limpeza_s = float(intervalo_limpeza_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._limpo_em = 0.0
+        self._removidos = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0  # havia entrada, mas mais velha que o frescor pedido
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout_s, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.limpar_expirados()
+
+    def _max_idade(self, max_idade_s: Optional[float]) -> float:
+        return self.ttl_s if max_idade_s is None else min(self.ttl_s, max(0.0, float(max_idade_s)))
+
+    def get(self, consulta: str, parametros: Dict[str, Any], max_idade_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        chave = chave_busca(consulta, parametros)
+        with self._lock:
+            row = self._conn.execute("SELECT resposta, gravado_em FROM buscas WHERE chave = ?", (chave,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            resposta, gravado_em = row
+            if self._clock() - gravado_em >= self._max_idade(max_idade_s):
+                self._misses += 1
+                self._stale += 1
+                return None
+            self._hits += 1
+        return json.loads(resposta)
+
+    def set(self, consulta: str, parametros: Dict[str, Any], resposta: Dict[str, Any]) -> None:
+        if self.ttl_s <= 0:
+            return
+        linha = (
+            chave_busca(consulta, parametros),
+            consulta,
+            json.dumps(parametros, sort_keys=True, ensure_ascii=False, default=str),
+            json.dumps(resposta, ensure_ascii=False, default=str),
+            self._clock(),
+        )
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO buscas VALUES (?, ?, ?, ?, ?)", linha)
+        if self._clock() - self._limpo_em >= self.intervalo_limpeza_s:
+            self.limpar_expirados()
+
+    def limpar_expirados(self) -> int:
+        """Remove as entradas mais velhas que o TTL (usa o índice em `gravado_em`)."""
+        with self._lock:
+            self._limpo_em = self._clock()
+            cur = self._conn.execute("DELETE FROM buscas WHERE gravado_em <= ?", (self._limpo_em - self.ttl_s,))
+            self._removidos += cur.rowcount
+            return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM buscas")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entradas = int(self._conn.execute("SELECT COUNT(*) FROM buscas").fetchone()[0])
+            total = self._hits + self._misses
+            return {
+                "path": str(self.path),
+                "entries": entradas,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale": self._stale,
+                "expired_removed": self._removidos,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+class BuscaLocal:
+    """
+    Backend offline com a mesma interface do `TavilyClient` usada pelo `TavilyTools`.
+    Resultados determinísticos por consulta (ou os de `respostas`, por consulta normalizada).
+    """
+
+    def __init__(self, respostas: Optional[Dict[str, Dict[str, Any]]] = None, latencia_s: float = 0.0):
+        self.respostas = {normalizar_chave(k): v for k, v in (respostas or {}).items()}
+        self.latencia_s = latencia_s
+        self.chamadas = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results: Optional[int] = None, include_answer: Any = None, **_: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.chamadas += 1
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        pronta = self.respostas.get(normalizar_chave(query))
+        if pronta is not None:
+            return pronta
+
+        semente = zlib.crc32(normalizar_chave(query).encode("utf-8"))
+        resultados: List[Dict[str, Any]] = [
+            {
+                "title": f"{query} — fonte {i + 1}",
+                "url": f"https://busca.local/{semente:08x}/{i + 1}",
+                "content": f"Conteúdo offline sobre '{query}' (resultado {i + 1}).",
+                "score": round(1.0 - i * 0.1, 2),
+            }
+            for i in range(max_results or 5)
+        ]
+        resposta: Dict[str, Any] = {"query": query, "results": resultados}
+        if include_answer:
+            resposta["answer"] = f"Resumo offline para '{query}'."
+        return resposta
+
+    def get_search_context(self, query: str, **params: Any) -> str:
+        return json.dumps(self.search(query, **params)["results"], ensure_ascii=False)
+
+    def extract(self, urls: List[str], **_: Any) -> Dict[str, Any]:
+        return {"results": [{"url": u, "raw_content": f"Conteúdo offline de {u}."} for u in urls]}
+
+
+# ======================================================
+# CONFIGURAÇÃO GLOBAL (startup da API)
+# ======================================================
+_LOCK = threading.Lock()
+_backend = "tavily"
+_cache: Optional[CacheBuscas] = None
+_busca_local = BuscaLocal()
+_tavily_base_url: Optional[str] = None
+_buscas_backend = 0  # buscas que foram ao backend (miss ou cache desligado)
+
+
+def configurar_busca(
+    backend: str = "tavily",
+    cache_path: Optional[Path] = None,
+    ttl_s: float = 21600.0,
+    tavily_base_url: Optional[str] = None,
+) -> None:
+    """
+    `backend`: "tavily" ou "local". Sem `cache_path` (ou com `ttl_s` 0), o cache fica desligado.
+    `tavily_base_url` aponta o cliente Tavily para outro endereço (ex: o stub de scripts/stub_llm.py).
+    """
+    global _backend, _cache, _tavily_base_url
+    with _LOCK:
+        _backend = backend if backend in ("tavily", "local") else "tavily"
+        _tavily_base_url = tavily_base_url
+        anterior, _cache = _cache, None
+        if cache_path is not None and ttl_s > 0:
+            _cache = CacheBuscas(cache_path, ttl_s=ttl_s)
+    if anterior is not None:
+        anterior.close()
+
+
+def backend_busca() -> str:
+    return _backend
+
+
+def cache_buscas() -> Optional[CacheBuscas]:
+    return _cache
+
+
+class ClienteBuscaCacheado:
+    """
+    Substitui o `client` do `TavilyTools`: `search` passa pelo cache; o resto é delegado.
+    Backend e cache são resolvidos a cada chamada (configuração global).
+    """
+
+    def __init__(self, cliente_tavily: Any):
+        self._tavily = cliente_tavily
+
+    def _cliente(self) -> Any:
+        if _backend == "local":
+            return _busca_local
+        if _tavily_base_url:
+            self._tavily.base_url = _tavily_base_url.rstrip("/")
+        return self._tavily
+
+    def search(self, query: str, **parametros: Any) -> Dict[str, Any]:
+        global _buscas_backend
+        cache = _cache
+        if cache is not None:
+            achado = cache.get(query, parametros, frescor_atual())
+            if achado is not None:
+                return achado
+        resposta = self._cliente().search(query=query, **parametros)
+        with _LOCK:
+            _buscas_backend += 1
+        if cache is not None:
+            cache.set(query, parametros, resposta)
+        return resposta
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._cliente(), nome)
+
+
+def criar_ferramenta_busca(**kwargs: Any) -> Any:
+    """`TavilyTools` com o cliente cacheado (mesmos parâmetros do toolkit do agno)."""
+    from agno.tools.tavily import TavilyTools
+
+    if _backend == "local":
+        kwargs.setdefault("api_key", "local")  # o TavilyClient real não é usado
+    tools = TavilyTools(**kwargs)
+    tools.client = ClienteBuscaCacheado(tools.client)
+    return tools
+
+
+def estatisticas_busca() -> Dict[str, Any]:
+    cache = _cache
+    return {
+        "backend": _backend,
+        "backend_calls": _buscas_backend,
+        "cache": cache.stats() if cache is not None else None,
+    }
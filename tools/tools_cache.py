@@ -0,0 +1,168 @@
+# tools/tools_cache.py
+"""
+CAMADA DE CACHE — ESTRUTURAS EM MEMÓRIA
+
+Caches locais ao processo, thread-safe e limitados, usados para evitar
+round trips repetidos ao LLM.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from tools.tools_universais import normalizar_whitespace
+
+
+def normalizar_chave(texto: str) -> str:
+    """
+    Normaliza texto para uso como chave de cache:
+    casefold, remoção de acentos e colapso de espaços.
+    """
+    texto = unicodedata.normalize("NFKD", (texto or "").casefold())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return normalizar_whitespace(texto)
+
+
+class LRUCacheTTL:
+    """
+    Cache LRU com expiração por TTL.
+    - `maxsize` limita o número de entradas (0 desativa o cache)
+    - `max_bytes` (opcional) limita a memória estimada de chaves + valores
+    - `set(..., ttl_s=...)` sobrescreve o TTL padrão por entrada
+    - entradas expiradas são removidas na leitura
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+    ):
+        self.maxsize = max(0, int(maxsize))
+        self.ttl_s = ttl_s
+        self.max_bytes = max(0, int(max_bytes)) if max_bytes is not None else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def _tamanho(key: Hashable, value: Any) -> int:
+        # estimativa do objeto em memória (str: cabeçalho + conteúdo); chave em tupla
+        # conta também os elementos, não só o cabeçalho da tupla
+        nbytes = sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(key, tuple):
+            nbytes += sum(sys.getsizeof(k) for k in key)
+        return nbytes
+
+    def _remover(self, key: Hashable) -> None:
+        _, _, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            expira_em, value, _ = item
+            if expira_em <= self._clock():
+                self._remover(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_s: Optional[float] = None) -> None:
+        if self.maxsize == 0:
+            return
+        ttl = self.ttl_s if ttl_s is None else ttl_s
+        nbytes = self._tamanho(key, value) if self.max_bytes is not None else 0
+        if ttl <= 0 or (self.max_bytes is not None and nbytes > self.max_bytes):
+            return
+        with self._lock:
+            if key in self._data:
+                self._remover(key)
+            self._data[key] = (self._clock() + ttl, value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remover(next(iter(self._data)))
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class CacheRespostas:
+    """
+    Cache de respostas dos agentes, chaveado por (agente, pergunta normalizada).
+    - memória limitada por bytes (não por número de entradas)
+    - TTL por agente; TTL 0 desativa o cache do agente (ex: pesquisador, sensível ao tempo)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_padrao_s: float = 3600.0,
+        ttl_por_agente: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_padrao_s = float(ttl_padrao_s)
+        self.ttl_por_agente = {k: float(v) for k, v in (ttl_por_agente or {}).items()}
+        # maxsize alto: quem limita é max_bytes (0 desativa o cache inteiro)
+        self._cache = LRUCacheTTL(maxsize=sys.maxsize if max_bytes > 0 else 0, ttl_s=self.ttl_padrao_s, clock=clock, max_bytes=max_bytes)
+
+    def ttl(self, agente: str) -> float:
+        return self.ttl_por_agente.get(agente, self.ttl_padrao_s)
+
+    def ativo(self, agente: str) -> bool:
+        return self._cache.maxsize > 0 and self.ttl(agente) > 0
+
+    def get(self, agente: str, pergunta: str) -> Optional[str]:
+        if not self.ativo(agente):
+            return None
+        return self._cache.get((agente, normalizar_chave(pergunta)))
+
+    def set(self, agente: str, pergunta: str, resposta: str) -> None:
+        if self.ativo(agente) and resposta:
+            self._cache.set((agente, normalizar_chave(pergunta)), resposta, ttl_s=self.ttl(agente))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "ttl_por_agente": dict(self.ttl_por_agente)}
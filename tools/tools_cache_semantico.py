@@ -0,0 +1,199 @@
+# tools/tools_cache_semantico.py
+"""
+CACHE SEMÂNTICO LOCAL — QUASE-DUPLICATAS SEM REDE
+
+Paráfrases ("me ajude a planejar minha semana" / "planeje minha semana pra mim")
+não batem no cache exato. Aqui cada pergunta vira um vetor de dimensão fixa
+(hashing vectorizer de n-gramas de caracteres + prefixos de palavras) e a busca
+é um produto escalar contra uma matriz NumPy:
+
+- vetores L2-normalizados: produto escalar = similaridade de cosseno
+- matriz float32 pré-alocada (`capacidade` x `dim`): memória fixa
+- acerto só acima de `limiar`; TTL por entrada; evicção LRU quando cheio
+- `escopo` separa espaços de busca (ex: respostas por agente)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.tools_cache import normalizar_chave
+
+# palavras sem conteúdo: pesam pouco na intenção e muito nos n-gramas
+_STOPWORDS = frozenset(
+    "a o e as os de da do das dos em no na nos nas um uma uns umas para pra por com sem "
+    "me mim minha meu minhas meus te voce que se sobre ao aos".split()
+)
+
+
+def vetorizar(
+    texto: str,
+    dim: int = 128,
+    ngramas: Sequence[int] = (3, 4),
+    prefixo: int = 5,
+    peso_prefixo: float = 2.0,
+) -> np.ndarray:
+    """
+    Hashing vectorizer (sem vocabulário, sem treino):
+    - n-gramas de caracteres do texto normalizado, sem stopwords
+    - prefixo de cada palavra (aproxima flexões: planejar/planeje -> "plane")
+    O sinal vem de um bit do hash (reduz o viés das colisões).
+    """
+    palavras = normalizar_chave(texto).split()
+    palavras = [p for p in palavras if p not in _STOPWORDS] or palavras
+    vetor = np.zeros(dim, dtype=np.float32)
+
+    base = " " + " ".join(palavras) + " "
+    for n in ngramas:
+        for i in range(len(base) - n + 1):
+            h = zlib.crc32(base[i : i + n].encode("utf-8"))
+            vetor[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    for p in palavras:
+        h = zlib.crc32(("w:" + p[:prefixo]).encode("utf-8"))
+        vetor[h % dim] += peso_prefixo if h & 0x80000000 else -peso_prefixo
+
+    norma = float(np.linalg.norm(vetor))
+    return vetor / norma if norma else vetor
+
+
+class CacheSemantico:
+    """
+    Cache de vizinho mais próximo sobre uma matriz fixa.
+    - `capacidade`: máximo de entradas (0 desativa); memória ~ capacidade * dim * 4 bytes
+    - `limiar`: similaridade mínima (cosseno) para considerar acerto
+    """
+
+    def __init__(
+        self,
+        capacidade: int = 10_000,
+        dim: int = 128,
+        limiar: float = 0.8,
+        ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacidade = max(0, int(capacidade))
+        self.dim = int(dim)
+        self.limiar = float(limiar)
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        n = self.capacidade
+        self._matriz = np.zeros((n, self.dim), dtype=np.float32)
+        self._expira = np.full(n, -np.inf)
+        self._uso = np.zeros(n, dtype=np.int64)  # relógio lógico para LRU
+        self._escopos = np.full(n, -1, dtype=np.int32)
+        self._valores: list = [None] * n
+        self._chaves: list = [None] * n
+        self._slots: Dict[Tuple[int, str], int] = {}  # (escopo, texto normalizado) -> linha
+        self._ids_escopo: Dict[str, int] = {}
+        self._ocupados = 0
+        self._tick = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _escopo(self, escopo: str) -> int:
+        i = self._ids_escopo.get(escopo)
+        if i is None:
+            i = len(self._ids_escopo)
+            self._ids_escopo[escopo] = i
+        return i
+
+    def buscar(self, texto: str, escopo: str = "") -> Optional[Tuple[Any, float]]:
+        """Retorna (valor, similaridade) do vizinho mais próximo acima do limiar, ou None."""
+        if self.capacidade == 0:
+            return None
+        q = vetorizar(texto, self.dim)
+        with self._lock:
+            n = self._ocupados
+            id_escopo = self._ids_escopo.get(escopo)
+            if n == 0 or id_escopo is None:
+                self._misses += 1
+                return None
+            sims = self._matriz[:n] @ q
+            invalidos = (self._escopos[:n] != id_escopo) | (self._expira[:n] <= self._clock())
+            sims[invalidos] = -1.0
+            i = int(np.argmax(sims))
+            sim = float(sims[i])
+            if sim < self.limiar:
+                self._misses += 1
+                return None
+            self._tick += 1
+            self._uso[i] = self._tick
+            self._hits += 1
+            return self._valores[i], sim
+
+    def get(self, texto: str, escopo: str = "") -> Optional[Any]:
+        achado = self.buscar(texto, escopo)
+        return achado[0] if achado is not None else None
+
+    def set(self, texto: str, valor: Any, escopo: str = "", ttl_s: Optional[float] = None) -> None:
+        # valor vazio não entra: por similaridade, seria servido a toda pergunta parecida
+        if self.capacidade == 0 or valor is None or valor == "":
+            return
+        ttl = self.ttl_s if ttl_s is None else ttl_s
+        if ttl <= 0:
+            return
+        v = vetorizar(texto, self.dim)
+        with self._lock:
+            chave = (self._escopo(escopo), normalizar_chave(texto))
+            n = self._ocupados
+            agora = self._clock()
+
+            # mesma pergunta no mesmo escopo: sobrescreve a linha
+            i = self._slots.get(chave, -1)
+            if i < 0 and n < self.capacidade:
+                i = n
+                self._ocupados += 1
+            if i < 0:
+                expirados = np.flatnonzero(self._expira[:n] <= agora)
+                if expirados.size:
+                    i = int(expirados[0])
+                else:
+                    i = int(np.argmin(self._uso[:n]))
+                    self._evictions += 1
+                self._slots.pop(self._chaves[i], None)
+
+            self._slots[chave] = i
+            self._chaves[i] = chave
+            self._tick += 1
+            self._matriz[i] = v
+            self._expira[i] = agora + ttl
+            self._uso[i] = self._tick
+            self._escopos[i] = chave[0]
+            self._valores[i] = valor
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matriz[:] = 0
+            self._expira[:] = -np.inf
+            self._escopos[:] = -1
+            self._valores = [None] * self.capacidade
+            self._chaves = [None] * self.capacidade
+            self._slots.clear()
+            self._ocupados = 0
+
+    def __len__(self) -> int:
+        return self._ocupados
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": self._ocupados,
+                "capacity": self.capacidade,
+                "dim": self.dim,
+                "threshold": self.limiar,
+                "matrix_bytes": int(self._matriz.nbytes),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,145 @@
+# tools/tools_concorrencia.py
+"""
+CAMADA DE CONCORRÊNCIA — PRIMITIVAS ASYNC
+
+Limites de concorrência por chave (agente, provedor) para o caminho async da API,
+e deduplicação de chamadas idênticas em andamento (single-flight).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LimitadorConcorrencia:
+    """
+    Um semáforo por chave, criado sob demanda.
+    - `padrao` vale para chaves sem limite explícito
+    - `limites` sobrescreve por chave (ex: {"pesquisador": 2})
+    """
+
+    def __init__(self, padrao: int, limites: Optional[Dict[str, int]] = None):
+        self.padrao = max(1, int(padrao))
+        self.limites = dict(limites or {})
+        self._semaforos: Dict[str, asyncio.Semaphore] = {}
+        self._ativos: Dict[str, int] = {}
+        self._esperas: Dict[str, int] = {}
+
+    def limite(self, chave: str) -> int:
+        return max(1, int(self.limites.get(chave, self.padrao)))
+
+    def _semaforo(self, chave: str) -> asyncio.Semaphore:
+        sem = self._semaforos.get(chave)
+        if sem is None:
+            sem = asyncio.Semaphore(self.limite(chave))
+            self._semaforos[chave] = sem
+        return sem
+
+    @asynccontextmanager
+    async def slot(self, chave: str) -> AsyncIterator[None]:
+        sem = self._semaforo(chave)
+        if sem.locked():
+            self._esperas[chave] = self._esperas.get(chave, 0) + 1
+        async with sem:
+            self._ativos[chave] = self._ativos.get(chave, 0) + 1
+            try:
+                yield
+            finally:
+                self._ativos[chave] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            chave: {
+                "limit": self.limite(chave),
+                "active": self._ativos.get(chave, 0),
+                "waits": self._esperas.get(chave, 0),
+            }
+            for chave in self._semaforos
+        }
+
+
+@asynccontextmanager
+async def slots(*pares: "tuple[LimitadorConcorrencia, str]") -> AsyncIterator[None]:
+    """
+    Adquire vários slots em ordem estável (evita deadlock entre chamadas
+    que pedem as mesmas chaves em ordens diferentes).
+    """
+    ordenados = sorted(pares, key=lambda p: (id(p[0]), p[1]))
+    async with AsyncExitStack() as stack:
+        for limitador, chave in ordenados:
+            await stack.enter_async_context(limitador.slot(chave))
+        yield
+
+
+class _Voo:
+    __slots__ = ("tarefa", "esperando")
+
+    def __init__(self, tarefa: "asyncio.Future[Any]"):
+        self.tarefa = tarefa
+        self.esperando = 0
+
+
+class SingleFlight:
+    """
+    Chamadas concorrentes com a mesma chave compartilham uma única execução em andamento.
+    - o primeiro chamador dispara `fabrica()`; os seguintes aguardam o mesmo resultado (ou a mesma exceção)
+    - a execução roda em uma tarefa própria: cancelar um chamador não afeta os demais;
+      só é cancelada quando todos os chamadores desistem
+    - nada é guardado após o término (não é cache)
+    """
+
+    def __init__(self, ativo: bool = True):
+        self.ativo = ativo
+        self._em_voo: Dict[Hashable, _Voo] = {}
+        self._execucoes = 0
+        self._coalescidas = 0
+
+    def _encerrar(self, chave: Hashable, voo: _Voo) -> None:
+        if self._em_voo.get(chave) is voo:
+            del self._em_voo[chave]
+
+    def _finalizada(self, chave: Hashable, voo: _Voo, tarefa: "asyncio.Future[Any]") -> None:
+        self._encerrar(chave, voo)
+        if not tarefa.cancelled():
+            tarefa.exception()  # já entregue aos chamadores; evita aviso de exceção não lida
+
+    async def executar(self, chave: Hashable, fabrica: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Retorna (resultado, compartilhado): `compartilhado` é True para quem aproveitou uma execução alheia."""
+        if not self.ativo:
+            return await fabrica(), False
+
+        voo = self._em_voo.get(chave)
+        compartilhado = voo is not None
+        if voo is None:
+            voo = _Voo(asyncio.ensure_future(fabrica()))
+            self._em_voo[chave] = voo
+            voo.tarefa.add_done_callback(lambda t, c=chave, v=voo: self._finalizada(c, v, t))
+            self._execucoes += 1
+        else:
+            self._coalescidas += 1
+
+        voo.esperando += 1
+        try:
+            return await asyncio.shield(voo.tarefa), compartilhado
+        except asyncio.CancelledError:
+            if voo.esperando == 1 and not voo.tarefa.done():
+                # último interessado: novos chamadores não devem pegar uma execução sendo cancelada
+                self._encerrar(chave, voo)
+                voo.tarefa.cancel()
+            raise
+        finally:
+            voo.esperando -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self._execucoes + self._coalescidas
+        return {
+            "enabled": self.ativo,
+            "in_flight": len(self._em_voo),
+            "executions": self._execucoes,
+            "coalesced": self._coalescidas,
+            "coalesced_rate": round(self._coalescidas / total, 4) if total else 0.0,
+        }
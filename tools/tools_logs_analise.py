@@ -0,0 +1,249 @@
+# tools/tools_logs_analise.py
+"""
+ANÁLISE DOS LOGS COGNITIVOS — AGREGADOS PARCIAIS E MESCLÁVEIS
+
+Cada arquivo de log (segmento, .gz ou legado) vira um `Agregado` parcial,
+calculado em streaming (uma linha por vez). Os parciais são mesclados na
+ordem cronológica dos arquivos, o que permite processá-los em paralelo.
+
+Memória constante em relação ao volume de logs:
+- contagens por agente / tipo / hora (limitadas pela cardinalidade, não pelo nº de eventos)
+- durações em histograma de buckets fixos em escala log (percentis aproximados, erro < ~5%)
+- pares agent_start -> agent_end pendentes limitados a `max_pendentes` por sessão em aberto
+"""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.tools_logs_segmentos import iter_eventos_arquivo
+
+# 8 buckets por potência de 2, de 0.1ms até ~7h
+_FATOR = 2 ** (1 / 8)
+_MINIMO_MS = 0.1
+_BUCKETS = 256
+
+
+class HistogramaDuracoes:
+    """Histograma de durações (ms) com buckets fixos em escala log; mesclável por soma."""
+
+    def __init__(self) -> None:
+        self.contagens = [0] * _BUCKETS
+        self.total = 0
+        self.soma = 0.0
+        self.minimo = math.inf
+        self.maximo = 0.0
+
+    @staticmethod
+    def _bucket(ms: float) -> int:
+        if ms <= _MINIMO_MS:
+            return 0
+        return min(_BUCKETS - 1, int(math.log(ms / _MINIMO_MS, _FATOR)) + 1)
+
+    def registrar(self, ms: float) -> None:
+        ms = max(0.0, float(ms))
+        self.contagens[self._bucket(ms)] += 1
+        self.total += 1
+        self.soma += ms
+        self.minimo = min(self.minimo, ms)
+        self.maximo = max(self.maximo, ms)
+
+    def mesclar(self, outro: "HistogramaDuracoes") -> None:
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.total += outro.total
+        self.soma += outro.soma
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+
+    def percentil(self, p: float) -> float:
+        if not self.total:
+            return 0.0
+        alvo = max(1, math.ceil(self.total * p / 100))
+        acumulado = 0
+        for i, c in enumerate(self.contagens):
+            acumulado += c
+            if acumulado >= alvo:
+                # ponto médio geométrico do bucket, limitado ao min/max observados
+                if i == 0:
+                    valor = _MINIMO_MS
+                else:
+                    valor = _MINIMO_MS * _FATOR ** (i - 0.5)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+    def resumo(self) -> Dict[str, float]:
+        return {
+            "count": self.total,
+            "avg_ms": round(self.soma / self.total, 2) if self.total else 0.0,
+            "p50_ms": round(self.percentil(50), 2),
+            "p95_ms": round(self.percentil(95), 2),
+            "p99_ms": round(self.percentil(99), 2),
+            "max_ms": round(self.maximo, 2),
+        }
+
+
+def _ts(valor: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(valor).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class Agregado:
+    """
+    Agregado parcial de um ou mais arquivos.
+    - `pendentes`: session_id -> (agente, início) ainda sem agent_end/error
+    - `fins_sem_inicio`: fins cujo início pode estar em um arquivo anterior
+    """
+
+    def __init__(self, max_pendentes: int = 100_000) -> None:
+        self.max_pendentes = max_pendentes
+        self.arquivos = 0
+        self.total = 0
+        self.por_tipo: Dict[str, int] = {}
+        self.por_agente: Dict[str, int] = {}
+        self.por_hora: Dict[str, int] = {}
+        self.requisicoes = 0
+        self.erros = 0
+        self.execucoes: Dict[str, int] = {}
+        self.erros_por_agente: Dict[str, int] = {}
+        self.duracoes: Dict[str, HistogramaDuracoes] = {}
+        self.pendentes: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.fins_sem_inicio: List[Tuple[str, str, float]] = []  # (session_id, event_type, ts)
+        self.descartados = 0  # inícios/fins sem par descartados pelo limite de memória
+
+    # ------------------------------
+    # alimentação (um evento por vez)
+    # ------------------------------
+    def adicionar(self, ev: Dict[str, Any]) -> None:
+        tipo = ev.get("event_type") or "unknown"
+        agente = ev.get("agent") or ""
+        ts_txt = ev.get("timestamp_utc") or ""
+
+        self.total += 1
+        self.por_tipo[tipo] = self.por_tipo.get(tipo, 0) + 1
+        if agente:
+            self.por_agente[agente] = self.por_agente.get(agente, 0) + 1
+        hora = ts_txt[:13]
+        if hora:
+            self.por_hora[hora] = self.por_hora.get(hora, 0) + 1
+
+        if tipo == "request_received":
+            self.requisicoes += 1
+        elif tipo == "error":
+            self.erros += 1
+        if tipo not in ("agent_start", "agent_end", "error"):
+            return
+
+        session_id = ev.get("session_id") or ""
+        ts = _ts(ts_txt)
+        if not session_id or ts is None:
+            return
+        if tipo == "agent_start":
+            self.execucoes[agente] = self.execucoes.get(agente, 0) + 1
+            self.pendentes.pop(session_id, None)
+            self.pendentes[session_id] = (agente, ts)
+            if len(self.pendentes) > self.max_pendentes:
+                self.pendentes.popitem(last=False)
+                self.descartados += 1
+        elif tipo == "agent_end" and ev.get("duration_ms") is not None:
+            # duração medida na própria API (relógio monotônico): dispensa o par por timestamp
+            self.pendentes.pop(session_id, None)
+            self.duracoes.setdefault(agente, HistogramaDuracoes()).registrar(ev["duration_ms"])
+        else:
+            self._fechar(session_id, tipo, ts, guardar=True)
+
+    def _fechar(self, session_id: str, tipo: str, ts: float, guardar: bool) -> None:
+        par = self.pendentes.pop(session_id, None)
+        if par is None:
+            if guardar:
+                if len(self.fins_sem_inicio) < self.max_pendentes:
+                    self.fins_sem_inicio.append((session_id, tipo, ts))
+                else:
+                    self.descartados += 1
+            return
+        agente, inicio = par
+        if tipo == "agent_end":
+            self.duracoes.setdefault(agente, HistogramaDuracoes()).registrar((ts - inicio) * 1000)
+        else:
+            self.erros_por_agente[agente] = self.erros_por_agente.get(agente, 0) + 1
+
+    # ------------------------------
+    # mescla (na ordem cronológica dos arquivos)
+    # ------------------------------
+    def mesclar(self, posterior: "Agregado") -> None:
+        self.arquivos += posterior.arquivos
+        self.total += posterior.total
+        self.requisicoes += posterior.requisicoes
+        self.erros += posterior.erros
+        self.descartados += posterior.descartados
+        for destino, origem in (
+            (self.por_tipo, posterior.por_tipo),
+            (self.por_agente, posterior.por_agente),
+            (self.por_hora, posterior.por_hora),
+            (self.execucoes, posterior.execucoes),
+            (self.erros_por_agente, posterior.erros_por_agente),
+        ):
+            for k, v in origem.items():
+                destino[k] = destino.get(k, 0) + v
+        for agente, hist in posterior.duracoes.items():
+            self.duracoes.setdefault(agente, HistogramaDuracoes()).mesclar(hist)
+
+        # fins do arquivo posterior cujo início ficou pendente em arquivos anteriores
+        for session_id, tipo, ts in posterior.fins_sem_inicio:
+            self._fechar(session_id, tipo, ts, guardar=False)
+        for session_id, par in posterior.pendentes.items():
+            self.pendentes.pop(session_id, None)
+            self.pendentes[session_id] = par
+        while len(self.pendentes) > self.max_pendentes:
+            self.pendentes.popitem(last=False)
+            self.descartados += 1
+
+    # ------------------------------
+    # relatório
+    # ------------------------------
+    def relatorio(self) -> Dict[str, Any]:
+        agentes = {}
+        for agente in sorted(set(self.execucoes) | set(self.duracoes)):
+            execucoes = self.execucoes.get(agente, 0)
+            erros = self.erros_por_agente.get(agente, 0)
+            agentes[agente] = {
+                "executions": execucoes,
+                "errors": erros,
+                "error_rate": round(erros / execucoes, 4) if execucoes else 0.0,
+                "duration": self.duracoes.get(agente, HistogramaDuracoes()).resumo(),
+            }
+        return {
+            "files": self.arquivos,
+            "events": self.total,
+            "requests": self.requisicoes,
+            "errors": self.erros,
+            "error_rate": round(self.erros / self.requisicoes, 4) if self.requisicoes else 0.0,
+            "by_event_type": dict(sorted(self.por_tipo.items())),
+            "by_agent": dict(sorted(self.por_agente.items())),
+            "by_hour": dict(sorted(self.por_hora.items())),
+            "agents": agentes,
+            "open_executions": len(self.pendentes),
+            "unpaired_dropped": self.descartados,
+        }
+
+
+def agregar_arquivo(
+    path: Path,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+    max_pendentes: int = 100_000,
+) -> Agregado:
+    """Agregado parcial de um arquivo (função de módulo: serializável para ProcessPoolExecutor)."""
+    ag = Agregado(max_pendentes=max_pendentes)
+    ag.arquivos = 1
+    for ev in iter_eventos_arquivo(path):
+        ts = ev.get("timestamp_utc", "")
+        if (desde and ts < desde) or (ate and ts > ate):
+            continue
+        ag.adicionar(ev)
+    return ag
@@ -0,0 +1,153 @@
+# tools/tools_logs_armazenamento.py
+"""
+ARMAZENAMENTO DOS LOGS COGNITIVOS — BACKENDS PLUGÁVEIS
+
+O CognitiveLogger cuida da fila, dos lotes e do Markdown; a persistência e as
+consultas ficam com um `EventStore`:
+
+- JsonlEventStore: arquivo único ou segmentos rotativos + índice de sessões (padrão)
+- SQLiteEventStore: banco embutido em modo WAL (ver tools_logs_sqlite)
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import SegmentStore, iter_eventos_fontes, ultimos_eventos_fontes
+
+
+class EventStore(abc.ABC):
+    """
+    Interface mínima de um backend de eventos.
+    - `gravar` recebe lotes já serializáveis (dicts), na ordem de chegada
+    - as consultas devolvem eventos em ordem cronológica
+    """
+
+    nome = "base"
+
+    @abc.abstractmethod
+    def gravar(self, eventos: List[Dict[str, Any]]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def iter_eventos(self, desde: Optional[str] = None, ate: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    def ultimos(self, n: int = 50) -> List[Dict[str, Any]]:
+        ...
+
+    def eventos_da_sessao(self, session_id: str, n: int = 200) -> List[Dict[str, Any]]:
+        return [ev for ev in self.ultimos(n) if ev.get("session_id") == session_id]
+
+    def consultar(
+        self,
+        event_type: Optional[str] = None,
+        agent: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+        n: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Últimos `n` eventos que atendem aos filtros (implementação genérica: varredura)."""
+        out: deque = deque(maxlen=max(0, n))
+        for ev in self.iter_eventos(desde, ate):
+            if event_type and ev.get("event_type") != event_type:
+                continue
+            if agent and ev.get("agent") != agent:
+                continue
+            out.append(ev)
+        return list(out)
+
+    def fontes(self, desde: Optional[str] = None, ate: Optional[str] = None) -> List[Path]:
+        """Arquivos JSONL por trás do backend (vazio para backends que não são arquivos)."""
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.nome}
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlEventStore(EventStore):
+    """
+    JSONL append-only.
+    - sem `segment_store`: arquivo único `jsonl_path`
+    - com `segment_store`: segmentos rotativos; `jsonl_path` continua sendo lido como a fonte mais antiga
+    - com `session_index`: cada evento gravado em segmento é indexado por session_id
+    - segmentos de vários workers (SegmentStore com `worker`) são intercalados na leitura
+    """
+
+    nome = "jsonl"
+
+    def __init__(
+        self,
+        jsonl_path: Path,
+        segment_store: Optional[SegmentStore] = None,
+        session_index: Optional[SessionIndex] = None,
+    ):
+        self.jsonl_path = Path(jsonl_path)
+        self.segment_store = segment_store
+        self.session_index = session_index if segment_store is not None else None
+        if self.session_index is not None:
+            # segmentos apagados pela retenção saem do índice na mesma manutenção
+            self.segment_store.apos_retencao = self.session_index.podar
+
+    def gravar(self, eventos: List[Dict[str, Any]]) -> None:
+        if self.segment_store is not None:
+            posicoes = self.segment_store.append(eventos)
+            if self.session_index is not None:
+                prefixo = self.session_index._relativo(self.segment_store.dir)
+                self.session_index.registrar(
+                    (ev.get("session_id", ""), f"{prefixo}/{seg}", offset, tamanho)
+                    for ev, (seg, offset, tamanho) in zip(eventos, posicoes)
+                )
+        else:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(ev, ensure_ascii=False) + "\n" for ev in eventos))
+
+    def fontes(self, desde: Optional[str] = None, ate: Optional[str] = None) -> List[Path]:
+        """
+        Arquivos JSONL relevantes para o intervalo [desde, ate], do mais antigo ao mais recente.
+        Com segmentos, o manifesto limita quais arquivos são abertos.
+        """
+        out = [self.jsonl_path] if self.jsonl_path.exists() else []
+        if self.segment_store is None:
+            return out
+        for seg in self.segment_store.segmentos(desde, ate):
+            path = self.segment_store.caminho(seg)
+            if path.exists():
+                out.append(path)
+        return out
+
+    def iter_eventos(self, desde: Optional[str] = None, ate: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for ev in iter_eventos_fontes(self.fontes(desde, ate)):
+            ts = ev.get("timestamp_utc", "")
+            if (desde and ts < desde) or (ate and ts > ate):
+                continue
+            yield ev
+
+    def ultimos(self, n: int = 50) -> List[Dict[str, Any]]:
+        """Últimos `n` eventos, abrindo segmentos do mais recente para trás só até completar `n`."""
+        return ultimos_eventos_fontes(self.fontes(), n)
+
+    def eventos_da_sessao(self, session_id: str, n: int = 200) -> List[Dict[str, Any]]:
+        """
+        Com índice: linha do tempo completa por seek direto; sem índice: filtra os últimos `n` eventos.
+        """
+        if self.session_index is not None:
+            return self.session_index.eventos(session_id)[-n:]
+        return super().eventos_da_sessao(session_id, n)
+
+    def stats(self) -> Dict[str, Any]:
+        worker = self.segment_store.worker if self.segment_store is not None else None
+        return {"backend": self.nome, "worker": worker}
+
+    def close(self) -> None:
+        if self.segment_store is not None:
+            self.segment_store.close()
@@ -1,13 +1,23 @@
 # tools/tools_logs_cognitivos.py
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import os
+import queue
+import threading
+import time
 import uuid
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.tools_logs_armazenamento import EventStore, JsonlEventStore
+from tools.tools_logs_indice import SessionIndex
+from tools.tools_logs_segmentos import SegmentStore
+from tools.tools_metricas import LATENCIA_ESTAGIO
 
 
 def utc_now_iso() -> str:
@@ -32,6 +42,32 @@ def safe_truncate(text: str, max_len: int = 500) -> str:
     return text if len(text) <= max_len else text[:max_len] + "…"
 
 
+def linhas_markdown(ev: Dict[str, Any]) -> list[str]:
+    """
+    Registro em Markdown de um evento (dict do JSONL): trilha humana, curta e legível.
+    Usado por scripts/gerar_markdown.py; o logger só grava Markdown com `write_markdown=True`.
+    """
+    lines = []
+    lines.append(f"\n---\n")
+    lines.append(f"## {ev.get('timestamp_utc', '')} — {ev.get('event_type', '')}\n")
+    lines.append(f"- **session_id:** `{ev.get('session_id', '')}`\n")
+    if ev.get("agent"):
+        lines.append(f"- **agent:** `{ev['agent']}`\n")
+    if ev.get("action"):
+        lines.append(f"- **action:** `{ev['action']}`\n")
+    if ev.get("duration_ms") is not None:
+        lines.append(f"- **duration_ms:** `{ev['duration_ms']}`\n")
+    if ev.get("input"):
+        lines.append(f"\n**input:**\n\n> {safe_truncate(ev['input'], 800)}\n")
+    if ev.get("output"):
+        lines.append(f"\n**output:**\n\n> {safe_truncate(ev['output'], 800)}\n")
+    if ev.get("metadata"):
+        # metadados em json compacto
+        md_meta = json.dumps(ev["metadata"], ensure_ascii=False)
+        lines.append(f"\n**metadata:** `{safe_truncate(md_meta, 800)}`\n")
+    return lines
+
+
 def mask_secrets(value: str) -> str:
     # máscara simples para não vazar chaves caso alguém logue sem querer
     if not value:
@@ -52,35 +88,99 @@ class CognitiveEvent:
     input: str = ""
     output: str = ""
     metadata: Dict[str, Any] = None
+    duration_ms: Optional[float] = None  # duração do estágio registrado (ex: routing, execução do agente)
 
     def to_dict(self) -> Dict[str, Any]:
         d = asdict(self)
         d["metadata"] = d["metadata"] or {}
+        if d["duration_ms"] is None:
+            del d["duration_ms"]
         return d
 
 
+class _MarcadorFlush:
+    """Marcador de flush na fila: a thread de escrita sinaliza `feito` depois de gravar o que veio antes dele."""
+
+    __slots__ = ("feito",)
+
+    def __init__(self) -> None:
+        self.feito = threading.Event()
+
+
+_PARAR = object()
+
+
 class CognitiveLogger:
     """
     Logger persistente (JSONL + Markdown opcional).
     - JSONL: ideal para máquina / auditoria / ingestão futura
-    - MD: trilha humana, útil para leitura rápida
+    - MD: trilha humana; desligado por padrão (`write_markdown=False`): o Markdown é
+      gerado sob demanda a partir do JSONL por scripts/gerar_markdown.py
+
+    Modo assíncrono (`async_mode=True`): `log()` só enfileira o evento e uma
+    thread de escrita grava em lotes (por tamanho ou por intervalo).
+    - `overflow="block"`: com a fila cheia, espera até `block_timeout_s`
+    - `overflow="drop"`: com a fila cheia, descarta o evento (contabilizado)
+    - `close()` (também via atexit) garante o flush do que estiver na fila
+
+    Armazenamento plugável (ver tools_logs_armazenamento):
+    - padrão: JSONL em `jsonl_path`; com `segment_store`, em segmentos rotativos;
+      com `session_index`, cada evento gravado em segmento é indexado por session_id
+    - `store`: qualquer EventStore (ex: SQLiteEventStore); substitui o JSONL
     """
 
     def __init__(
         self,
         jsonl_path: Optional[Path] = None,
         md_path: Optional[Path] = None,
-        write_markdown: bool = True,
+        write_markdown: bool = False,
+        async_mode: bool = False,
+        queue_size: int = 10000,
+        flush_batch: int = 256,
+        flush_interval_s: float = 0.5,
+        overflow: str = "block",
+        block_timeout_s: Optional[float] = None,
+        segment_store: Optional[SegmentStore] = None,
+        session_index: Optional[SessionIndex] = None,
+        store: Optional[EventStore] = None,
     ):
         logs_dir = ensure_logs_dir()
         self.jsonl_path = jsonl_path or (logs_dir / "cognitive_log.jsonl")
         self.md_path = md_path or (logs_dir / "cognitive_log.md")
         self.write_markdown = write_markdown
+        self.store = store or JsonlEventStore(self.jsonl_path, segment_store, session_index)
+
+        if overflow not in ("block", "drop"):
+            raise ValueError("overflow deve ser 'block' ou 'drop'")
+        self.async_mode = async_mode
+        self.flush_batch = max(1, int(flush_batch))
+        self.flush_interval_s = max(0.001, float(flush_interval_s))
+        self.overflow = overflow
+        self.block_timeout_s = block_timeout_s
+
+        self._stats_lock = threading.Lock()
+        self._enfileirados = 0
+        self._descartados = 0
+        self._escritos = 0
+        self._flushes = 0
+        self._erros_escrita = 0
+        self._enqueue_us_total = 0.0
+        self._enqueue_us_max = 0.0
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+
+        self._queue: Optional["queue.Queue[Any]"] = None
+        self._writer: Optional[threading.Thread] = None
+        if async_mode:
+            self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+            self._writer = threading.Thread(target=self._loop_escrita, name="cognitive-log-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
 
     def new_session_id(self) -> str:
         return str(uuid.uuid4())
 
-    def log(
+    def _criar_evento(
         self,
         session_id: str,
         event_type: str,
@@ -89,8 +189,9 @@ class CognitiveLogger:
         input_text: str = "",
         output_text: str = "",
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> str:
-        event = CognitiveEvent(
+        duration_ms: Optional[float] = None,
+    ) -> CognitiveEvent:
+        return CognitiveEvent(
             event_id=str(uuid.uuid4()),
             timestamp_utc=utc_now_iso(),
             session_id=session_id,
@@ -100,36 +201,198 @@ class CognitiveLogger:
             input=safe_truncate(input_text, 2000),
             output=safe_truncate(output_text, 2000),
             metadata=metadata or {},
+            duration_ms=round(duration_ms, 3) if duration_ms is not None else None,
         )
 
-        # JSONL (append)
-        with open(self.jsonl_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+    def log(
+        self,
+        session_id: str,
+        event_type: str,
+        agent: str = "",
+        action: str = "",
+        input_text: str = "",
+        output_text: str = "",
+        metadata: Optional[Dict[str, Any]] = None,
+        duration_ms: Optional[float] = None,
+    ) -> str:
+        t0 = time.perf_counter()
+        event = self._criar_evento(session_id, event_type, agent, action, input_text, output_text, metadata, duration_ms)
+
+        if self._queue is not None:
+            self._enfileirar(event, bloquear=self.overflow == "block")
+        else:
+            self._escrever_lote([event])
+
+        LATENCIA_ESTAGIO.observar(time.perf_counter() - t0, stage="logging")
+        return event.event_id
+
+    async def alog(self, *args: Any, **kwargs: Any) -> str:
+        """
+        Versão async de `log`: a escrita em disco roda fora do event loop.
+        No modo assíncrono, só recorre a uma thread se a fila estiver cheia.
+        """
+        if self._queue is None:
+            return await asyncio.to_thread(self.log, *args, **kwargs)
+
+        t0 = time.perf_counter()
+        event = self._criar_evento(*args, **kwargs)
+        if not self._enfileirar(event, bloquear=False, contar_descarte=False):
+            if self.overflow == "block":
+                await asyncio.to_thread(self._enfileirar, event, True)
+            else:
+                self._registrar_descarte()
+        LATENCIA_ESTAGIO.observar(time.perf_counter() - t0, stage="logging")
+        return event.event_id
+
+    # ------------------------------
+    # fila + thread de escrita
+    # ------------------------------
+    def _registrar_descarte(self) -> None:
+        with self._stats_lock:
+            self._descartados += 1
+
+    def _enfileirar(self, event: CognitiveEvent, bloquear: bool, contar_descarte: bool = True) -> bool:
+        t0 = time.perf_counter()
+        try:
+            if bloquear:
+                self._queue.put(event, timeout=self.block_timeout_s)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            if contar_descarte:
+                self._registrar_descarte()
+            return False
+        us = (time.perf_counter() - t0) * 1_000_000
+        with self._stats_lock:
+            self._enfileirados += 1
+            self._enqueue_us_total += us
+            self._enqueue_us_max = max(self._enqueue_us_max, us)
+        return True
+
+    def _loop_escrita(self) -> None:
+        while True:
+            item = self._queue.get()
+            lote: list[CognitiveEvent] = []
+            marcadores = [item] if isinstance(item, _MarcadorFlush) or item is _PARAR else []
+            if not marcadores:
+                lote.append(item)
+
+            # junta mais eventos até encher o lote, vencer o intervalo ou chegar um marcador
+            prazo = time.monotonic() + self.flush_interval_s
+            while not marcadores and len(lote) < self.flush_batch:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if isinstance(item, _MarcadorFlush) or item is _PARAR:
+                    marcadores.append(item)
+                else:
+                    lote.append(item)
+
+            if lote:
+                try:
+                    self._escrever_lote(lote)
+                except Exception:
+                    with self._stats_lock:
+                        self._erros_escrita += 1
+
+            for marcador in marcadores:
+                if isinstance(marcador, _MarcadorFlush):
+                    marcador.feito.set()
+            if _PARAR in marcadores:
+                return
+
+    def flush(self, timeout_s: float = 5.0) -> bool:
+        """
+        Bloqueia até os eventos enfileirados ANTES da chamada estarem em disco
+        (os que chegarem depois não atrasam o flush). Retorna False se `timeout_s` vencer.
+        """
+        if self._queue is None or self._writer is None or not self._writer.is_alive():
+            return True
+        marcador = _MarcadorFlush()
+        limite = time.monotonic() + timeout_s
+        try:
+            self._queue.put(marcador, timeout=timeout_s)
+        except queue.Full:
+            return False
+        return marcador.feito.wait(max(0.0, limite - time.monotonic()))
+
+    def close(self) -> None:
+        """Grava o que estiver na fila e encerra a thread de escrita."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_PARAR)
+            self._writer.join()
+            # eventos posteriores ao close são gravados de forma síncrona
+            self._queue = None
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "storage": self.store.stats(),
+                "async_mode": self.async_mode,
+                "overflow": self.overflow,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "enqueued": self._enfileirados,
+                "dropped": self._descartados,
+                "written": self._escritos,
+                "flushes": self._flushes,
+                "write_errors": self._erros_escrita,
+                "avg_batch": round(self._escritos / self._flushes, 2) if self._flushes else 0.0,
+                "enqueue_us_avg": round(self._enqueue_us_total / self._enfileirados, 2) if self._enfileirados else 0.0,
+                "enqueue_us_max": round(self._enqueue_us_max, 2),
+                "flush_ms_avg": round(self._flush_ms_total / self._flushes, 3) if self._flushes else 0.0,
+                "flush_ms_max": round(self._flush_ms_max, 3),
+            }
+
+    # ------------------------------
+    # escrita em disco
+    # ------------------------------
+    def _escrever_lote(self, eventos: list[CognitiveEvent]) -> None:
+        t0 = time.perf_counter()
+
+        self.store.gravar([ev.to_dict() for ev in eventos])
 
         # Markdown (append) - opcional
         if self.write_markdown:
-            self._append_markdown(event)
+            with open(self.md_path, "a", encoding="utf-8") as f:
+                for ev in eventos:
+                    f.writelines(self._markdown_lines(ev))
 
-        return event.event_id
+        ms = (time.perf_counter() - t0) * 1000
+        with self._stats_lock:
+            self._escritos += len(eventos)
+            self._flushes += 1
+            self._flush_ms_total += ms
+            self._flush_ms_max = max(self._flush_ms_max, ms)
+
+    # ------------------------------
+    # leitura
+    # ------------------------------
+    def fontes(self, desde: Optional[str] = None, ate: Optional[str] = None) -> List[Path]:
+        return self.store.fontes(desde, ate)
+
+    def iter_eventos(self, desde: Optional[str] = None, ate: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        return self.store.iter_eventos(desde, ate)
+
+    def ultimos(self, n: int = 50) -> List[Dict[str, Any]]:
+        return self.store.ultimos(n)
+
+    def eventos_da_sessao(self, session_id: str, n: int = 200) -> List[Dict[str, Any]]:
+        return self.store.eventos_da_sessao(session_id, n)
+
+    def consultar(
+        self,
+        event_type: Optional[str] = None,
+        agent: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+        n: int = 50,
+    ) -> List[Dict[str, Any]]:
+        return self.store.consultar(event_type=event_type, agent=agent, desde=desde, ate=ate, n=n)
 
-    def _append_markdown(self, event: CognitiveEvent) -> None:
-        # trilha humana: curta, legível, sem poluição
-        lines = []
-        lines.append(f"\n---\n")
-        lines.append(f"## {event.timestamp_utc} — {event.event_type}\n")
-        lines.append(f"- **session_id:** `{event.session_id}`\n")
-        if event.agent:
-            lines.append(f"- **agent:** `{event.agent}`\n")
-        if event.action:
-            lines.append(f"- **action:** `{event.action}`\n")
-        if event.input:
-            lines.append(f"\n**input:**\n\n> {safe_truncate(event.input, 800)}\n")
-        if event.output:
-            lines.append(f"\n**output:**\n\n> {safe_truncate(event.output, 800)}\n")
-        if event.metadata:
-            # metadados em json compacto
-            md_meta = json.dumps(event.metadata, ensure_ascii=False)
-            lines.append(f"\n**metadata:** `{safe_truncate(md_meta, 800)}`\n")
-
-        with open(self.md_path, "a", encoding="utf-8") as f:
-            f.writelines(lines)
+    def _markdown_lines(self, event: CognitiveEvent) -> list[str]:
+        return linhas_markdown(event.to_dict())
@@ -0,0 +1,227 @@
+# tools/tools_logs_indice.py
+"""
+ÍNDICE DE SESSÕES — session_id -> posição dos eventos nos segmentos
+
+Índice incremental em disco, particionado por hash do session_id:
+
+    logs/segments/index/
+        03a1.idx      (linhas: session_id \t segmento \t offset \t tamanho)
+
+Uma consulta lê apenas a partição da sessão e faz seek direto em cada
+registro, sem varrer o log. Vários workers podem gravar no mesmo índice.
+A retenção dos segmentos poda as partições (`podar`), então o tamanho de
+cada partição acompanha a janela de retenção, não o histórico inteiro.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: poda sem coordenação entre processos
+    fcntl = None
+
+Entrada = Tuple[str, str, int, int]  # (session_id, segmento relativo à base, offset, tamanho)
+
+
+class SessionIndex:
+    """
+    - `base_dir`: diretório ao qual os caminhos de segmento são relativos (ex: logs/)
+    - `index_dir`: onde ficam as partições
+    - `shards`: número de partições (o custo da consulta é ~ eventos / shards)
+    """
+
+    def __init__(self, base_dir: Path, index_dir: Path, shards: int = 1024):
+        self.base_dir = Path(base_dir)
+        self.index_dir = Path(index_dir)
+        self.shards = max(1, int(shards))
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _travado(self, exclusivo: bool) -> Iterator[None]:
+        """
+        Trava entre processos: appends compartilham (O_APPEND já não intercala),
+        a reescrita de uma partição pela poda é exclusiva.
+        """
+        if fcntl is None:
+            yield
+            return
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _shard(self, session_id: str) -> Path:
+        h = int(hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:8], 16) % self.shards
+        return self.index_dir / f"{h:04x}.idx"
+
+    def registrar(self, entradas: Iterable[Entrada]) -> None:
+        """Acrescenta entradas (uma escrita por partição envolvida)."""
+        por_shard: Dict[Path, List[str]] = defaultdict(list)
+        for session_id, segmento, offset, tamanho in entradas:
+            if not session_id or "\t" in session_id or "\n" in session_id:
+                continue
+            por_shard[self._shard(session_id)].append(f"{session_id}\t{segmento}\t{offset}\t{tamanho}\n")
+        if not por_shard:
+            return
+        with self._lock, self._travado(exclusivo=False):
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            for path, linhas in por_shard.items():
+                # um único write com O_APPEND por partição: workers podem gravar
+                # na mesma partição sem intercalar linhas
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, "".join(linhas).encode("utf-8"))
+                finally:
+                    os.close(fd)
+
+    def buscar(self, session_id: str) -> List[Tuple[str, int, int]]:
+        path = self._shard(session_id)
+        if not path.exists():
+            return []
+        out = []
+        prefixo = session_id + "\t"
+        with open(path, "r", encoding="utf-8") as f:
+            for ln in f:
+                if not ln.startswith(prefixo):
+                    continue
+                try:
+                    _, segmento, offset, tamanho = ln.rstrip("\n").split("\t")
+                    out.append((segmento, int(offset), int(tamanho)))
+                except ValueError:
+                    continue
+        return out
+
+    def _resolver(self, segmento: str) -> Optional[Path]:
+        path = self.base_dir / segmento
+        if path.exists():
+            return path
+        # segmento compactado depois de indexado (offsets valem para o conteúdo descompactado)
+        gz = path.with_name(path.name + ".gz")
+        return gz if gz.exists() else None
+
+    def eventos(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Linha do tempo completa da sessão, lida por seek direto em cada registro.
+        Registros de segmentos já removidos pela retenção são ignorados.
+        """
+        por_segmento: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for segmento, offset, tamanho in self.buscar(session_id):
+            por_segmento[segmento].append((offset, tamanho))
+
+        out: List[Dict[str, Any]] = []
+        for segmento, posicoes in por_segmento.items():
+            path = self._resolver(segmento)
+            if path is None:
+                continue
+            abrir = gzip.open if path.suffix == ".gz" else open
+            with abrir(path, "rb") as f:
+                for offset, tamanho in sorted(posicoes):
+                    f.seek(offset)
+                    try:
+                        ev = json.loads(f.read(tamanho))
+                    except Exception:
+                        continue
+                    if ev.get("session_id") == session_id:
+                        out.append(ev)
+        out.sort(key=lambda ev: ev.get("timestamp_utc", ""))
+        return out
+
+    def podar(self) -> Dict[str, int]:
+        """
+        Remove os registros de segmentos que não existem mais (retenção); segmentos
+        compactados continuam valendo. Cada partição alterada é reescrita (temporário +
+        os.replace) sob a trava exclusiva; os appends esperam só a partição da vez.
+        """
+        existe: Dict[str, bool] = {}
+        particoes = removidos = 0
+        for path in sorted(self.index_dir.glob("*.idx")):
+            with self._lock, self._travado(exclusivo=True):
+                with open(path, "r", encoding="utf-8") as f:
+                    linhas = f.readlines()
+                manter = []
+                for ln in linhas:
+                    partes = ln.split("\t", 2)
+                    if len(partes) < 3:
+                        continue
+                    segmento = partes[1]
+                    if segmento not in existe:
+                        existe[segmento] = self._resolver(segmento) is not None
+                    if existe[segmento]:
+                        manter.append(ln)
+                if len(manter) == len(linhas):
+                    continue
+                particoes += 1
+                removidos += len(linhas) - len(manter)
+                if not manter:
+                    path.unlink()
+                    continue
+                tmp = path.with_name(path.name + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(manter)
+                os.replace(tmp, path)
+        return {"particoes": particoes, "registros_removidos": removidos}
+
+    def reconstruir(self, fontes: Iterable[Path]) -> Dict[str, int]:
+        """
+        Recria o índice a partir dos arquivos de log (mais antigos primeiro).
+        Gera as partições em um diretório temporário e troca no final.
+        """
+        tmp = SessionIndex(self.base_dir, self.index_dir.with_name(self.index_dir.name + ".rebuild"), self.shards)
+        shutil.rmtree(tmp.index_dir, ignore_errors=True)
+
+        arquivos = eventos = 0
+        buffer: List[Entrada] = []
+        for path in fontes:
+            arquivos += 1
+            segmento = self._relativo(path)
+            abrir = gzip.open if path.suffix == ".gz" else open
+            offset = 0
+            with abrir(path, "rb") as f:
+                for linha in f:
+                    tamanho = len(linha)
+                    try:
+                        session_id = json.loads(linha).get("session_id", "")
+                    except Exception:
+                        session_id = ""
+                    if session_id:
+                        buffer.append((session_id, segmento, offset, tamanho))
+                        eventos += 1
+                    offset += tamanho
+                    if len(buffer) >= 50_000:
+                        tmp.registrar(buffer)
+                        buffer.clear()
+        tmp.registrar(buffer)
+
+        with self._lock:
+            antigo = self.index_dir.with_name(self.index_dir.name + ".old")
+            shutil.rmtree(antigo, ignore_errors=True)
+            if self.index_dir.exists():
+                os.replace(self.index_dir, antigo)
+            tmp.index_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp.index_dir, self.index_dir)
+            shutil.rmtree(antigo, ignore_errors=True)
+        return {"arquivos": arquivos, "eventos": eventos}
+
+    def _relativo(self, path: Path) -> str:
+        path = Path(path)
+        # o índice sempre aponta para o nome não compactado
+        if path.suffix == ".gz":
+            path = path.with_suffix("")
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
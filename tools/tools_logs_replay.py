@@ -0,0 +1,166 @@
+# tools/tools_logs_replay.py
+"""
+REPLAY DE TRÁFEGO A PARTIR DOS LOGS COGNITIVOS
+
+Reconstrói o fluxo de requisições reais a partir dos eventos gravados:
+
+- `routing_start` (endpoint /route) e `request_received` (/run, /run/stream, itens de lote)
+  viram requisições com o instante original
+- o `routing_decision` seguinte da mesma sessão (mesma pergunta) é a decisão original,
+  usada para comparar com a decisão do replay
+- o agendamento preserva os intervalos entre chegadas, escalados por `velocidade`
+
+Usado por scripts/replay_trafego.py; a comparação e as latências ficam em `ResultadoReplay`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from tools.tools_logs_analise import HistogramaDuracoes
+
+# tipo de evento -> endpoint da requisição original
+_ENDPOINTS = {"routing_start": "/route", "request_received": "/run"}
+
+
+@dataclass
+class RequisicaoGravada:
+    timestamp_utc: str
+    endpoint: str
+    pergunta: str
+    session_id: str = ""
+    agente_original: Optional[str] = None
+    offset_s: float = 0.0  # segundos desde a primeira requisição (tempo original)
+
+    @property
+    def truncada(self) -> bool:
+        # o logger corta input em 2000 caracteres e marca com "…"
+        return self.pergunta.endswith("…")
+
+
+def _ts(valor: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(valor).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def extrair_requisicoes(
+    eventos: Iterable[Dict[str, Any]],
+    endpoints: Iterable[str] = ("/route", "/run"),
+    limite: Optional[int] = None,
+) -> List[RequisicaoGravada]:
+    """
+    Requisições em ordem cronológica, com a decisão de roteamento original quando registrada.
+    `limite` corta as primeiras N requisições (na ordem dos eventos).
+    """
+    aceitos = set(endpoints)
+    requisicoes: List[RequisicaoGravada] = []
+    pendentes: Dict[str, Deque[RequisicaoGravada]] = {}
+
+    for ev in eventos:
+        tipo = ev.get("event_type")
+        session_id = ev.get("session_id") or ""
+        if tipo == "routing_decision":
+            fila = pendentes.get(session_id)
+            if not fila:
+                continue
+            pergunta = ev.get("input") or ""
+            for req in fila:
+                if req.pergunta == pergunta:
+                    req.agente_original = ev.get("output") or None
+                    fila.remove(req)
+                    break
+            continue
+
+        endpoint = _ENDPOINTS.get(tipo)
+        if endpoint is None or endpoint not in aceitos:
+            continue
+        pergunta = ev.get("input") or ""
+        ts = ev.get("timestamp_utc") or ""
+        if not pergunta.strip() or _ts(ts) is None:
+            continue
+        if limite is not None and len(requisicoes) >= limite:
+            continue
+        req = RequisicaoGravada(timestamp_utc=ts, endpoint=endpoint, pergunta=pergunta, session_id=session_id)
+        requisicoes.append(req)
+        pendentes.setdefault(session_id, deque()).append(req)
+
+    requisicoes.sort(key=lambda r: r.timestamp_utc)
+    if requisicoes:
+        inicio = _ts(requisicoes[0].timestamp_utc) or 0.0
+        for req in requisicoes:
+            req.offset_s = max(0.0, (_ts(req.timestamp_utc) or inicio) - inicio)
+    return requisicoes
+
+
+def instante_replay(req: RequisicaoGravada, velocidade: float) -> float:
+    """Segundos desde o início do replay: tempo original / velocidade (velocidade <= 0: sem espera)."""
+    return req.offset_s / velocidade if velocidade > 0 else 0.0
+
+
+@dataclass
+class ResultadoReplay:
+    """Latências por endpoint e concordância de roteamento com o log original."""
+
+    latencias: Dict[str, HistogramaDuracoes] = field(default_factory=dict)
+    atrasos: HistogramaDuracoes = field(default_factory=HistogramaDuracoes)  # envio real - instante agendado
+    enviadas: int = 0
+    erros: int = 0
+    status: Counter = field(default_factory=Counter)
+    iguais: int = 0
+    diferentes: int = 0
+    sem_original: int = 0
+    divergencias: Counter = field(default_factory=Counter)  # (original, replay) -> n
+
+    def registrar(
+        self,
+        req: RequisicaoGravada,
+        status: int,
+        latencia_ms: float,
+        agente: Optional[str] = None,
+        atraso_ms: float = 0.0,
+    ) -> Optional[bool]:
+        """Registra uma resposta; retorna se o agente bate com o original (None se não há o que comparar)."""
+        self.enviadas += 1
+        self.status[str(status)] += 1
+        self.latencias.setdefault(req.endpoint, HistogramaDuracoes()).registrar(latencia_ms)
+        self.atrasos.registrar(atraso_ms)
+        if not 200 <= status < 300:
+            self.erros += 1
+            return None
+        if not req.agente_original or not agente:
+            self.sem_original += 1
+            return None
+        if agente == req.agente_original:
+            self.iguais += 1
+            return True
+        self.diferentes += 1
+        self.divergencias[(req.agente_original, agente)] += 1
+        return False
+
+    def resumo(self, duracao_s: float) -> Dict[str, Any]:
+        comparadas = self.iguais + self.diferentes
+        return {
+            "requests": self.enviadas,
+            "errors": self.erros,
+            "error_rate": round(self.erros / self.enviadas, 4) if self.enviadas else 0.0,
+            "status": dict(sorted(self.status.items())),
+            "duration_s": round(duracao_s, 2),
+            "rps": round(self.enviadas / duracao_s, 2) if duracao_s else 0.0,
+            "latency": {endpoint: h.resumo() for endpoint, h in sorted(self.latencias.items())},
+            "schedule_lag": self.atrasos.resumo(),
+            "routing": {
+                "compared": comparadas,
+                "same": self.iguais,
+                "different": self.diferentes,
+                "without_original": self.sem_original,
+                "agreement": round(self.iguais / comparadas, 4) if comparadas else 0.0,
+                "divergences": [
+                    {"original": o, "replay": r, "count": n} for (o, r), n in self.divergencias.most_common(20)
+                ],
+            },
+        }
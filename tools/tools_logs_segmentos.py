@@ -0,0 +1,503 @@
+# tools/tools_logs_segmentos.py
+"""
+SEGMENTOS DE LOG — JSONL ROTATIVO COM MANIFESTO
+
+Os eventos são gravados em arquivos limitados por tempo (hora/dia) e por
+tamanho. Um manifesto pequeno registra, por segmento, o intervalo de tempo,
+a contagem de eventos e o tamanho, para que os leitores abram apenas os
+segmentos relevantes.
+
+    logs/segments/
+        manifest.json
+        cognitive_log-2026-10-18T14-0001.jsonl
+        cognitive_log-2026-10-17T09-0001.jsonl.gz   (compactado)
+
+Com vários processos (ex: `uvicorn --workers N`), cada worker grava os próprios
+segmentos e o próprio manifesto (`worker`, normalmente o pid), sem lock entre
+processos:
+
+        manifest-w4242.json
+        cognitive_log-2026-10-18T14-w4242-0001.jsonl
+
+Os leitores juntam todos os manifestos e intercalam os arquivos dos workers por
+timestamp (`iter_eventos_fontes`, `ultimos_eventos_fontes`). Manifestos de
+workers que morreram são adotados pelo próximo SegmentStore que abrir o diretório
+(retenção e compactação continuam valendo para eles).
+"""
+
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem adoção de manifestos órfãos
+    fcntl = None
+
+MANIFEST = "manifest.json"
+_MANIFEST_WORKER = "manifest-w{}.json"
+_WORKER_DO_ARQUIVO = re.compile(r"-w([^-/]+)-\d{4}\.jsonl(?:\.gz)?$")
+
+
+def abrir_texto(path: Path) -> IO[str]:
+    """Abre um segmento para leitura (transparente para .gz)."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _ler_manifesto_arquivo(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("segments", [])
+    except Exception:
+        return []
+
+
+def manifestos(segments_dir: Path) -> List[Path]:
+    """Manifesto do modo processo único (se existir) e os manifestos por worker."""
+    segments_dir = Path(segments_dir)
+    out = [segments_dir / MANIFEST] if (segments_dir / MANIFEST).exists() else []
+    return out + sorted(segments_dir.glob(_MANIFEST_WORKER.format("*")))
+
+
+def ler_manifesto(segments_dir: Path) -> List[Dict[str, Any]]:
+    """Segmentos de todos os manifestos do diretório (vários workers: ordenados pelo início)."""
+    paths = manifestos(segments_dir)
+    if len(paths) == 1:
+        return _ler_manifesto_arquivo(paths[0])
+    return sorted((seg for p in paths for seg in _ler_manifesto_arquivo(p)), key=lambda seg: seg.get("start", ""))
+
+
+def worker_do_arquivo(path: Path) -> str:
+    """Worker que gravou o arquivo ("" para o modo processo único e o arquivo legado)."""
+    achado = _WORKER_DO_ARQUIVO.search(Path(path).name)
+    return achado.group(1) if achado else ""
+
+
+def _sobrepoe(seg: Dict[str, Any], desde: Optional[str], ate: Optional[str]) -> bool:
+    # segmento aberto: o "end" de outro worker pode estar atrasado no manifesto
+    if desde and seg.get("end") and seg.get("closed") and seg["end"] < desde:
+        return False
+    if ate and seg.get("start") and seg["start"] > ate:
+        return False
+    return True
+
+
+def fontes_de_log(
+    logs_dir: Path,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+    legacy_name: str = "cognitive_log.jsonl",
+    segments_subdir: str = "segments",
+) -> List[Path]:
+    """
+    Arquivos de log relevantes para o intervalo [desde, ate] (ISO 8601, UTC),
+    do mais antigo para o mais recente. O arquivo único legado (sem intervalo
+    conhecido) entra sempre primeiro, se existir.
+    """
+    out: List[Path] = []
+    legacy = logs_dir / legacy_name
+    if legacy.exists():
+        out.append(legacy)
+    segments_dir = logs_dir / segments_subdir
+    for seg in ler_manifesto(segments_dir):
+        if _sobrepoe(seg, desde, ate):
+            path = segments_dir / seg["file"]
+            if path.exists():
+                out.append(path)
+    return out
+
+
+class SegmentStore:
+    """
+    Escritor de segmentos JSONL.
+    - rotação por período (`rotacao`: "hour" ou "day") e por tamanho (`max_bytes`)
+    - retenção: segmentos encerrados há mais de `retencao_dias` são removidos
+    - compactação: segmentos encerrados há mais de `compactar_apos_h` viram .jsonl.gz
+    - o manifesto é regravado na rotação, no close e no máximo a cada `manifest_interval_s`
+    - `worker` (ex: pid): segmentos e manifesto próprios do processo, para vários
+      processos gravarem no mesmo diretório; a leitura (`segmentos`) inclui os demais
+    """
+
+    def __init__(
+        self,
+        segments_dir: Path,
+        prefix: str = "cognitive_log",
+        rotacao: str = "hour",
+        max_bytes: int = 64 * 1024 * 1024,
+        retencao_dias: Optional[float] = 30,
+        compactar_apos_h: Optional[float] = 24,
+        manifest_interval_s: float = 5.0,
+        manutencao_automatica: bool = True,
+        worker: Optional[str] = None,
+    ):
+        if rotacao not in ("hour", "day"):
+            raise ValueError("rotacao deve ser 'hour' ou 'day'")
+        self.dir = Path(segments_dir)
+        self.prefix = prefix
+        self.rotacao = rotacao
+        self.max_bytes = max(1024, int(max_bytes))
+        self.retencao_dias = retencao_dias
+        self.compactar_apos_h = compactar_apos_h
+        self.manifest_interval_s = manifest_interval_s
+        self.manutencao_automatica = manutencao_automatica
+        self.worker = str(worker) if worker is not None else None
+        self._manifesto = self.dir / (_MANIFEST_WORKER.format(self.worker) if self.worker else MANIFEST)
+        self._outros_cache: Dict[Path, tuple[int, List[Dict[str, Any]]]] = {}
+
+        self._lock = threading.RLock()
+        self._segmentos: List[Dict[str, Any]] = [
+            s for s in _ler_manifesto_arquivo(self._manifesto) if (self.dir / s["file"]).exists()
+        ]
+        self._atual: Optional[Dict[str, Any]] = None
+        self._arquivo: Optional[IO[bytes]] = None
+        self._manifest_em = 0.0
+        self._manutencao: Optional[threading.Thread] = None
+        self._manutencao_lock = threading.Lock()
+        # chamado na mesma passada de manutenção quando a retenção remove segmentos (ex: poda do índice)
+        self.apos_retencao: Optional[Callable[[], Any]] = None
+        self._sujo = False
+
+        # retoma o último segmento aberto (ex: restart do processo)
+        if self._segmentos and not self._segmentos[-1].get("closed"):
+            ultimo = self._segmentos[-1]
+            ultimo["bytes"] = (self.dir / ultimo["file"]).stat().st_size
+            self._atual = ultimo
+        if self.worker is not None:
+            self._adotar_orfaos()
+
+    # ------------------------------
+    # escrita
+    # ------------------------------
+    def _bucket(self, timestamp: str) -> str:
+        return timestamp[:13] if self.rotacao == "hour" else timestamp[:10]
+
+    def _abrir_novo(self, bucket: str, timestamp: str) -> None:
+        self._fechar_atual()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        seq = 1 + sum(1 for s in self._segmentos if s.get("bucket") == bucket and worker_do_arquivo(s["file"]) == (self.worker or ""))
+        sufixo = f"-w{self.worker}" if self.worker else ""
+        nome = f"{self.prefix}-{bucket.replace(':', '')}{sufixo}-{seq:04d}.jsonl"
+        self._atual = {
+            "file": nome,
+            "bucket": bucket,
+            "start": timestamp,
+            "end": timestamp,
+            "events": 0,
+            "bytes": 0,
+            "closed": False,
+        }
+        self._segmentos.append(self._atual)
+        self._gravar_manifesto()
+        self._iniciar_manutencao()
+
+    def _fechar_atual(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        if self._atual is not None:
+            self._atual["closed"] = True
+            self._atual = None
+
+    def append(self, eventos: List[Dict[str, Any]]) -> List[tuple[str, int, int]]:
+        """
+        Grava eventos (dicts já serializáveis) e retorna, para cada um,
+        (segmento, offset, tamanho em bytes) da linha gravada.
+        """
+        posicoes: List[tuple[str, int, int]] = []
+        with self._lock:
+            for ev in eventos:
+                ts = ev.get("timestamp_utc") or datetime.now(timezone.utc).isoformat()
+                linha = (json.dumps(ev, ensure_ascii=False) + "\n").encode("utf-8")
+                bucket = self._bucket(ts)
+
+                atual = self._atual
+                if (
+                    atual is None
+                    or bucket > atual["bucket"]
+                    or (atual["bytes"] > 0 and atual["bytes"] + len(linha) > self.max_bytes)
+                ):
+                    self._abrir_novo(max(bucket, atual["bucket"]) if atual else bucket, ts)
+                    atual = self._atual
+
+                if self._arquivo is None:
+                    self._arquivo = open(self.dir / atual["file"], "ab")
+                offset = atual["bytes"]
+                self._arquivo.write(linha)
+                posicoes.append((atual["file"], offset, len(linha)))
+
+                atual["bytes"] += len(linha)
+                atual["events"] += 1
+                atual["start"] = min(atual["start"], ts)
+                atual["end"] = max(atual["end"], ts)
+
+            if self._arquivo is not None:
+                self._arquivo.flush()
+            self._sujo = True
+            if time.monotonic() - self._manifest_em >= self.manifest_interval_s:
+                self._gravar_manifesto()
+        return posicoes
+
+    def _gravar_manifesto(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._manifesto.with_name(self._manifesto.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segmentos}, f, ensure_ascii=False)
+        os.replace(tmp, self._manifesto)
+        self._manifest_em = time.monotonic()
+        self._sujo = False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            if self._sujo:
+                self._gravar_manifesto()
+
+    # ------------------------------
+    # leitura
+    # ------------------------------
+    def segmentos(self, desde: Optional[str] = None, ate: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Segmentos deste processo (estado em memória) e dos outros manifestos do diretório."""
+        with self._lock:
+            out = [dict(s) for s in self._segmentos if _sobrepoe(s, desde, ate)]
+        outros = [s for s in self._segmentos_de_outros() if _sobrepoe(s, desde, ate)]
+        if not outros:
+            return out
+        return sorted(out + outros, key=lambda s: s.get("start", ""))
+
+    def _segmentos_de_outros(self) -> List[Dict[str, Any]]:
+        """Manifestos de outros processos, relidos só quando mudam (mtime)."""
+        out: List[Dict[str, Any]] = []
+        for path in manifestos(self.dir):
+            if path == self._manifesto:
+                continue
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            cache = self._outros_cache.get(path)
+            if cache is None or cache[0] != mtime:
+                cache = (mtime, _ler_manifesto_arquivo(path))
+                self._outros_cache[path] = cache
+            out.extend(dict(s) for s in cache[1])
+        return out
+
+    def _adotar_orfaos(self) -> None:
+        """
+        Incorpora (como encerrados) os segmentos de manifestos de workers que não
+        existem mais, para que a retenção e a compactação continuem valendo para eles.
+        """
+        if fcntl is None:
+            return
+        for path in self.dir.glob(_MANIFEST_WORKER.format("*")):
+            pid = path.name[len("manifest-w"):-len(".json")]
+            if path == self._manifesto or not pid.isdigit() or _processo_vivo(int(pid)):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # outro processo está adotando
+                    if not path.exists() or os.fstat(f.fileno()).st_ino != path.stat().st_ino:
+                        continue  # já adotado
+                    adotados = json.load(f).get("segments", [])
+                    with self._lock:
+                        for seg in adotados:
+                            if (self.dir / seg["file"]).exists():
+                                self._segmentos.append({**seg, "closed": True})
+                        self._segmentos.sort(key=lambda s: s.get("start", ""))
+                        self._gravar_manifesto()
+                    path.unlink()
+            except (OSError, ValueError):
+                continue
+
+    def caminho(self, seg: Dict[str, Any]) -> Path:
+        return self.dir / seg["file"]
+
+    # ------------------------------
+    # retenção e compactação
+    # ------------------------------
+    def _iniciar_manutencao(self) -> None:
+        if not self.manutencao_automatica:
+            return
+        if self._manutencao is not None and self._manutencao.is_alive():
+            return
+        self._manutencao = threading.Thread(target=self.aplicar_politicas, name="log-segment-maintenance", daemon=True)
+        self._manutencao.start()
+
+    def aplicar_politicas(self, agora: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Remove segmentos fora da retenção e compacta os encerrados antigos.
+        Roda em thread própria a cada rotação; pode ser chamado manualmente.
+        """
+        with self._manutencao_lock:
+            return self._aplicar_politicas(agora or datetime.now(timezone.utc))
+
+    def _aplicar_politicas(self, agora: datetime) -> Dict[str, int]:
+        removidos = compactados = 0
+
+        limite_retencao = (agora - timedelta(days=self.retencao_dias)).isoformat() if self.retencao_dias else None
+        limite_compactacao = (agora - timedelta(hours=self.compactar_apos_h)).isoformat() if self.compactar_apos_h else None
+
+        with self._lock:
+            candidatos = [dict(s) for s in self._segmentos if s.get("closed")]
+
+        for seg in candidatos:
+            path = self.dir / seg["file"]
+            if limite_retencao and seg["end"] < limite_retencao:
+                with self._lock:
+                    self._segmentos = [s for s in self._segmentos if s["file"] != seg["file"]]
+                    self._gravar_manifesto()
+                path.unlink(missing_ok=True)
+                removidos += 1
+                continue
+
+            if limite_compactacao and seg["end"] < limite_compactacao and not seg["file"].endswith(".gz"):
+                destino = path.with_name(path.name + ".gz")
+                with open(path, "rb") as src, gzip.open(destino, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                with self._lock:
+                    for s in self._segmentos:
+                        if s["file"] == seg["file"]:
+                            s["file"] = destino.name
+                            s["compressed_bytes"] = destino.stat().st_size
+                    self._gravar_manifesto()
+                path.unlink(missing_ok=True)
+                compactados += 1
+
+        if removidos and self.apos_retencao is not None:
+            self.apos_retencao()
+        return {"removidos": removidos, "compactados": compactados}
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _parse_linhas(linhas: List[bytes]) -> List[Dict[str, Any]]:
+    out = []
+    for ln in linhas:
+        ln = ln.strip()
+        if not ln:
+            continue
+        try:
+            out.append(json.loads(ln))
+        except Exception:
+            # linha corrompida ou parcialmente gravada (escrita em andamento)
+            continue
+    return out
+
+
+def _tail_eventos(path: Path, n: int, bloco: int) -> List[Dict[str, Any]]:
+    """
+    Lê o arquivo de trás para frente em blocos fixos até reunir `n` eventos válidos.
+    Linhas parciais ou corrompidas (escrita em andamento de outro writer) não contam:
+    a leitura segue para trás até completar `n` ou chegar ao início do arquivo.
+    O custo depende de `n` (e do tamanho das linhas), não do tamanho do arquivo.
+    """
+    eventos: List[Dict[str, Any]] = []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        resto = b""  # início de linha ainda sem a quebra que o delimita
+        while pos > 0 and len(eventos) < n:
+            tam = min(bloco, pos)
+            pos -= tam
+            f.seek(pos)
+            linhas = (f.read(tam) + resto).split(b"\n")
+            # a primeira linha só está completa no início do arquivo
+            resto = linhas.pop(0) if pos > 0 else b""
+            eventos = _parse_linhas(linhas) + eventos
+    return eventos[-n:]
+
+
+def ler_ultimos_eventos(path: Path, n: int = 50, bloco: int = 64 * 1024) -> List[Dict[str, Any]]:
+    """
+    Últimos `n` eventos de um arquivo JSONL sem carregar o arquivo inteiro.
+    - arquivo texto: leitura reversa em blocos a partir do fim
+    - segmento .gz (sem seek reverso): leitura em streaming com janela de `n` linhas
+    Linhas parcialmente gravadas ou corrompidas são ignoradas e não contam nos `n`.
+    """
+    if n <= 0 or not path.exists():
+        return []
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as f:
+            janela = deque((ev for ln in f for ev in _parse_linhas([ln])), maxlen=n)
+        return list(janela)
+    return _tail_eventos(path, n, bloco)
+
+
+def iter_eventos_arquivo(path: Path) -> Iterator[Dict[str, Any]]:
+    with abrir_texto(path) as f:
+        for ln in f:
+            ln = ln.strip()
+            if not ln:
+                continue
+            try:
+                yield json.loads(ln)
+            except Exception:
+                continue
+
+
+def _por_worker(paths: Iterable[Path]) -> List[List[Path]]:
+    """Agrupa os arquivos por worker, preservando a ordem (cronológica) de cada grupo."""
+    grupos: Dict[str, List[Path]] = {}
+    for path in paths:
+        grupos.setdefault(worker_do_arquivo(path), []).append(path)
+    return list(grupos.values())
+
+
+def _timestamp(ev: Dict[str, Any]) -> str:
+    return ev.get("timestamp_utc", "")
+
+
+def iter_eventos_fontes(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Eventos de vários arquivos em ordem cronológica: os arquivos de cada worker
+    são lidos em sequência e os workers são intercalados por timestamp.
+    """
+    grupos = _por_worker(paths)
+    fluxos = [chain.from_iterable(iter_eventos_arquivo(p) for p in grupo) for grupo in grupos]
+    if len(fluxos) == 1:
+        return fluxos[0]
+    return heapq.merge(*fluxos, key=_timestamp)
+
+
+def ultimos_eventos_fontes(paths: Iterable[Path], n: int = 50) -> List[Dict[str, Any]]:
+    """Últimos `n` eventos de vários arquivos (por worker, do mais recente para trás)."""
+    por_worker: List[List[Dict[str, Any]]] = []
+    for grupo in _por_worker(paths):
+        out: List[Dict[str, Any]] = []
+        for path in reversed(grupo):
+            faltam = n - len(out)
+            if faltam <= 0:
+                break
+            out = ler_ultimos_eventos(path, faltam) + out
+        por_worker.append(out)
+    if len(por_worker) == 1:
+        return por_worker[0]
+    return list(heapq.merge(*por_worker, key=_timestamp))[-n:] if n > 0 else []
@@ -0,0 +1,215 @@
+# tools/tools_logs_sqlite.py
+"""
+BACKEND SQLITE (WAL) PARA OS LOGS COGNITIVOS
+
+Um banco embutido no lugar do JSONL:
+
+    logs/cognitive_log.db   (+ -wal / -shm enquanto aberto)
+
+- modo WAL: leitores (endpoints) não bloqueiam o escritor (thread do logger)
+- inserts em lote, uma transação por lote
+- índices em session_id, event_type, agent e timestamp_utc: as consultas da API
+  viram buscas no índice em vez de varredura de linhas
+- o evento completo fica em `data` (JSON); as colunas existem para indexar
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from tools.tools_logs_armazenamento import EventStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL UNIQUE,
+    timestamp_utc TEXT NOT NULL,
+    session_id TEXT NOT NULL DEFAULT '',
+    event_type TEXT NOT NULL DEFAULT '',
+    agent TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_events_timestamp ON events (timestamp_utc);
+CREATE INDEX IF NOT EXISTS ix_events_session ON events (session_id, timestamp_utc);
+CREATE INDEX IF NOT EXISTS ix_events_type ON events (event_type, timestamp_utc);
+CREATE INDEX IF NOT EXISTS ix_events_agent ON events (agent, timestamp_utc);
+"""
+
+_INSERT = (
+    "INSERT OR IGNORE INTO events (event_id, timestamp_utc, session_id, event_type, agent, data) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _linha(ev: Dict[str, Any]) -> tuple:
+    return (
+        ev.get("event_id") or "",
+        ev.get("timestamp_utc") or "",
+        ev.get("session_id") or "",
+        ev.get("event_type") or "",
+        ev.get("agent") or "",
+        json.dumps(ev, ensure_ascii=False),
+    )
+
+
+class SQLiteEventStore(EventStore):
+    """
+    - uma conexão de escrita (protegida por lock) + uma conexão de leitura por thread
+    - `INSERT OR IGNORE` por event_id: reimportar o mesmo JSONL não duplica eventos
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, path: Path, busy_timeout_s: float = 5.0):
+        self.path = Path(path)
+        self.busy_timeout_s = float(busy_timeout_s)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._conexoes: List[sqlite3.Connection] = []
+        self._conexoes_lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._escrita: Optional[sqlite3.Connection] = None
+        self._conexao_escrita().executescript(_SCHEMA)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_s, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conexoes_lock:
+            self._conexoes.append(conn)
+        return conn
+
+    def _conexao_escrita(self) -> sqlite3.Connection:
+        # reaberta sob demanda: eventos gravados depois de close() continuam persistidos
+        if self._escrita is None:
+            self._escrita = self._conectar()
+        return self._escrita
+
+    def _leitura(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._conectar()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------
+    # escrita
+    # ------------------------------
+    def gravar(self, eventos: List[Dict[str, Any]]) -> None:
+        self.importar(eventos)
+
+    def importar(self, eventos: Iterable[Dict[str, Any]], lote: int = 5000) -> int:
+        """Insere eventos em transações de até `lote` linhas. Retorna quantos eram novos."""
+        buffer: List[tuple] = []
+        with self._lock:
+            conn = self._conexao_escrita()
+            antes = conn.total_changes
+            for ev in eventos:
+                buffer.append(_linha(ev))
+                if len(buffer) >= lote:
+                    self._inserir(conn, buffer)
+                    buffer.clear()
+            if buffer:
+                self._inserir(conn, buffer)
+            inseridos = conn.total_changes - antes
+        return inseridos
+
+    @staticmethod
+    def _inserir(conn: sqlite3.Connection, linhas: List[tuple]) -> None:
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT, linhas)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ------------------------------
+    # leitura
+    # ------------------------------
+    def _recentes(self, where: List[str], params: List[Any], n: int) -> List[Dict[str, Any]]:
+        """Os `n` eventos mais recentes que atendem a `where`, em ordem cronológica."""
+        sql = "SELECT data FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp_utc DESC, id DESC LIMIT ?"
+        rows = self._leitura().execute(sql, params + [max(0, int(n))]).fetchall()
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    @staticmethod
+    def _filtros(
+        event_type: Optional[str] = None,
+        agent: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+    ) -> "tuple[List[str], List[Any]]":
+        where: List[str] = []
+        params: List[Any] = []
+        for coluna, valor in (("event_type", event_type), ("agent", agent)):
+            if valor:
+                where.append(f"{coluna} = ?")
+                params.append(valor)
+        if desde:
+            where.append("timestamp_utc >= ?")
+            params.append(desde)
+        if ate:
+            where.append("timestamp_utc <= ?")
+            params.append(ate)
+        return where, params
+
+    def iter_eventos(self, desde: Optional[str] = None, ate: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        where, params = self._filtros(desde=desde, ate=ate)
+        sql = "SELECT data FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cur = self._leitura().execute(sql + " ORDER BY timestamp_utc, id", params)
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def ultimos(self, n: int = 50) -> List[Dict[str, Any]]:
+        return self._recentes([], [], n)
+
+    def eventos_da_sessao(self, session_id: str, n: int = 200) -> List[Dict[str, Any]]:
+        return self._recentes(["session_id = ?"], [session_id], n)
+
+    def consultar(
+        self,
+        event_type: Optional[str] = None,
+        agent: Optional[str] = None,
+        desde: Optional[str] = None,
+        ate: Optional[str] = None,
+        n: int = 50,
+    ) -> List[Dict[str, Any]]:
+        where, params = self._filtros(event_type, agent, desde, ate)
+        return self._recentes(where, params, n)
+
+    def contar(self) -> int:
+        return int(self._leitura().execute("SELECT COUNT(*) FROM events").fetchone()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        tamanho = 0
+        for sufixo in ("", "-wal"):
+            p = self.path.with_name(self.path.name + sufixo)
+            if p.exists():
+                tamanho += p.stat().st_size
+        return {"backend": self.nome, "path": str(self.path), "bytes": tamanho}
+
+    def close(self) -> None:
+        with self._lock, self._conexoes_lock:
+            conexoes, self._conexoes = self._conexoes, []
+            self._escrita = None
+        for conn in conexoes:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,239 @@
+# tools/tools_memoria_sessao.py
+"""
+MEMÓRIA DE SESSÃO — HISTÓRICO COM ORÇAMENTO DE TOKENS
+
+Histórico por `session_id` (header X-Session-Id) guardado no servidor: cada
+turno do /run chega ao agente com o contexto da conversa, sem o usuário colar
+tudo de novo na pergunta.
+
+- os turnos recentes ficam na íntegra (no máximo `max_turnos`)
+- os mais antigos são compactados num resumo rolante, uma linha por turno;
+  quando o resumo passa da sua fatia do orçamento, as linhas mais velhas saem
+- resumo + turnos recentes cabem em `orcamento_tokens` (estimativa de ~4 caracteres por token)
+- sessões em LRU com TTL de inatividade, limitadas por número e por bytes estimados
+
+Memória local ao processo, como os caches de tools_cache.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from tools.tools_universais import normalizar_whitespace
+
+_CHARS_POR_TOKEN = 4
+# custo fixo estimado de uma sessão em memória (objetos, deques, entrada no dicionário)
+_BYTES_SESSAO = 640
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa barata, sem tokenizer: ~4 caracteres por token."""
+    return -(-len(texto) // _CHARS_POR_TOKEN) if texto else 0
+
+
+def _cortar(texto: str, max_chars: int) -> str:
+    texto = normalizar_whitespace(texto)
+    return texto if len(texto) <= max_chars else texto[: max(0, max_chars - 1)].rstrip() + "…"
+
+
+@dataclass
+class Turno:
+    pergunta: str
+    resposta: str
+    agente: Optional[str] = None
+    tokens: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.tokens = estimar_tokens(self.texto)
+
+    @property
+    def texto(self) -> str:
+        return f"Usuário: {self.pergunta}\nAssistente: {self.resposta}"
+
+
+def resumo_extrativo(turno: Turno) -> str:
+    """Linha do resumo rolante: início da pergunta e da resposta (sem chamar o LLM)."""
+    agente = f"[{turno.agente}] " if turno.agente else ""
+    return f"- {agente}{_cortar(turno.pergunta, 160)} → {_cortar(turno.resposta, 240)}"
+
+
+def com_contexto(pergunta: str, contexto: str) -> str:
+    """Entrada do agente: histórico da sessão + pergunta atual (sem histórico, a pergunta como veio)."""
+    if not contexto:
+        return pergunta
+    return f"{contexto}\n\nPergunta atual:\n{pergunta}"
+
+
+@dataclass
+class _Sessao:
+    expira_em: float
+    turnos: Deque[Turno] = field(default_factory=deque)
+    resumo: Deque[str] = field(default_factory=deque)
+    tokens_turnos: int = 0
+    tokens_resumo: int = 0
+    nbytes: int = 0
+
+    def medir(self) -> int:
+        textos = [t.pergunta for t in self.turnos] + [t.resposta for t in self.turnos] + list(self.resumo)
+        self.nbytes = _BYTES_SESSAO + sum(sys.getsizeof(t) for t in textos)
+        return self.nbytes
+
+
+class MemoriaSessoes:
+    """
+    Histórico das sessões, thread-safe e limitado.
+    - `orcamento_tokens`: teto do contexto entregue ao agente (0 desativa)
+    - um terço do orçamento é a fatia do resumo rolante; um turno sozinho ocupa no máximo metade
+    - `max_sessoes` / `max_bytes`: sessões menos usadas saem primeiro (0 sessões desativa)
+    - `ttl_s`: sessão sem uso por esse tempo é descartada
+    - `resumir`: turno -> linha do resumo (padrão: extrativo)
+    """
+
+    def __init__(
+        self,
+        orcamento_tokens: int = 2000,
+        max_turnos: int = 6,
+        max_sessoes: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        resumir: Callable[[Turno], str] = resumo_extrativo,
+    ):
+        self.orcamento_tokens = max(0, int(orcamento_tokens))
+        self.orcamento_resumo = self.orcamento_tokens // 3
+        self.max_turnos = max(1, int(max_turnos))
+        self.max_sessoes = max(0, int(max_sessoes))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._resumir = resumir
+        self._lock = threading.Lock()
+        # ordem = último uso; com TTL fixo, é também a ordem de expiração
+        self._sessoes: "OrderedDict[str, _Sessao]" = OrderedDict()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._turnos = 0
+        self._compactacoes = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def ativa(self) -> bool:
+        return self.max_sessoes > 0 and self.orcamento_tokens > 0
+
+    def _remover(self, session_id: str) -> None:
+        self._bytes -= self._sessoes.pop(session_id).nbytes
+
+    def _expurgar(self, agora: float) -> None:
+        while self._sessoes:
+            session_id, sessao = next(iter(self._sessoes.items()))
+            if sessao.expira_em > agora:
+                break
+            self._remover(session_id)
+            self._expirations += 1
+
+    def _obter(self, session_id: str, agora: float) -> Optional[_Sessao]:
+        self._expurgar(agora)
+        sessao = self._sessoes.get(session_id)
+        if sessao is not None:
+            sessao.expira_em = agora + self.ttl_s
+            self._sessoes.move_to_end(session_id)
+        return sessao
+
+    def contexto(self, session_id: str) -> str:
+        """Resumo + últimos turnos da sessão ("" se não há histórico)."""
+        if not self.ativa:
+            return ""
+        with self._lock:
+            sessao = self._obter(session_id, self._clock())
+            if sessao is None:
+                self._misses += 1
+                return ""
+            self._hits += 1
+            partes = []
+            if sessao.resumo:
+                partes.append("Resumo da conversa até aqui:\n" + "\n".join(sessao.resumo))
+            if sessao.turnos:
+                partes.append("Últimas mensagens:\n" + "\n\n".join(t.texto for t in sessao.turnos))
+            return "\n\n".join(partes)
+
+    def _compactar(self, sessao: _Sessao) -> None:
+        turno = sessao.turnos.popleft()
+        sessao.tokens_turnos -= turno.tokens
+        linha = self._resumir(turno)
+        sessao.resumo.append(linha)
+        sessao.tokens_resumo += estimar_tokens(linha) + 1
+        self._compactacoes += 1
+        while sessao.tokens_resumo > self.orcamento_resumo and sessao.resumo:
+            sessao.tokens_resumo -= estimar_tokens(sessao.resumo.popleft()) + 1
+
+    def registrar_turno(self, session_id: str, pergunta: str, resposta: str, agente: Optional[str] = None) -> None:
+        if not self.ativa or not resposta:
+            return
+        # um turno sozinho ocupa no máximo metade do orçamento
+        limite = self.orcamento_tokens * _CHARS_POR_TOKEN
+        turno = Turno(_cortar(pergunta, limite // 6), _cortar(resposta, limite // 3), agente)
+
+        with self._lock:
+            agora = self._clock()
+            sessao = self._obter(session_id, agora)
+            if sessao is None:
+                sessao = self._sessoes[session_id] = _Sessao(expira_em=agora + self.ttl_s)
+            else:
+                self._bytes -= sessao.nbytes
+            sessao.turnos.append(turno)
+            sessao.tokens_turnos += turno.tokens
+            while len(sessao.turnos) > 1 and (
+                len(sessao.turnos) > self.max_turnos
+                or sessao.tokens_turnos + sessao.tokens_resumo > self.orcamento_tokens
+            ):
+                self._compactar(sessao)
+            while sessao.resumo and sessao.tokens_turnos + sessao.tokens_resumo > self.orcamento_tokens:
+                sessao.tokens_resumo -= estimar_tokens(sessao.resumo.popleft()) + 1
+            self._bytes += sessao.medir()
+            self._turnos += 1
+
+            while len(self._sessoes) > self.max_sessoes or self._bytes > self.max_bytes:
+                self._remover(next(iter(self._sessoes)))
+                self._evictions += 1
+
+    def esquecer(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessoes:
+                self._remover(session_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessoes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._sessoes)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "enabled": self.ativa,
+                "sessions": len(self._sessoes),
+                "max_sessions": self.max_sessoes,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "budget_tokens": self.orcamento_tokens,
+                "max_turns": self.max_turnos,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "turns": self._turnos,
+                "compactions": self._compactacoes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
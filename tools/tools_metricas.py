@@ -0,0 +1,264 @@
+# tools/tools_metricas.py
+"""
+MÉTRICAS EM PROCESSO — FORMATO DE TEXTO DO PROMETHEUS
+
+Contadores, medidores (gauges) e histogramas com rótulos, exportados por
+`/metrics`. Sem dependência externa: o formato de exposição 0.0.4 é simples.
+
+- `REGISTRO`: registro padrão do processo
+- `LATENCIA_ESTAGIO`: duração por estágio da requisição (routing, agent, logging)
+- `Cronometro`: mede com relógio monotônico e observa o histograma ao sair
+"""
+
+from __future__ import annotations
+
+import abc
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(pares: Sequence[Tuple[str, str]]) -> str:
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(valor: float) -> str:
+    valor = float(valor)
+    if valor == float("inf"):
+        return "+Inf"
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+class _Metrica(abc.ABC):
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[r]) for r in self.rotulos)
+
+    def _cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {_escapar(self.ajuda)}", f"# TYPE {self.nome} {self.tipo}"]
+
+    @abc.abstractmethod
+    def exportar(self) -> List[str]:
+        ...
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1.0, **rotulos: Any) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valor(self, **rotulos: Any) -> float:
+        return self._valores.get(self._chave(rotulos), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            itens = sorted(self._valores.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(list(zip(self.rotulos, chave)))} {_numero(v)}" for chave, v in itens
+        ]
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1.0, **rotulos: Any) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def dec(self, valor: float = 1.0, **rotulos: Any) -> None:
+        self.inc(-valor, **rotulos)
+
+    def set(self, valor: float, **rotulos: Any) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = float(valor)
+
+    def valor(self, **rotulos: Any) -> float:
+        return self._valores.get(self._chave(rotulos), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            itens = sorted(self._valores.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(list(zip(self.rotulos, chave)))} {_numero(v)}" for chave, v in itens
+        ]
+
+
+class Histograma(_Metrica):
+    """Histograma cumulativo (segundos) com buckets fixos, como o do Prometheus."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+        # por série: [contagem por bucket (+Inf no fim), soma, total]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observar(self, valor: float, **rotulos: Any) -> None:
+        chave = self._chave(rotulos)
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[chave] = serie
+            serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self, **rotulos: Any) -> int:
+        serie = self._series.get(self._chave(rotulos))
+        return serie[2] if serie else 0
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            itens = sorted((chave, (list(s[0]), s[1], s[2])) for chave, s in self._series.items())
+        linhas = self._cabecalho()
+        for chave, (contagens, soma, total) in itens:
+            base = list(zip(self.rotulos, chave))
+            acumulado = 0
+            for limite, c in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += c
+                linhas.append(f"{self.nome}_bucket{_formatar_rotulos(base + [('le', _numero(limite))])} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(base)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(base)} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    def __init__(self) -> None:
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> Any:
+        with self._lock:
+            existente = self._metricas.get(metrica.nome)
+            if existente is not None:
+                # idempotente: reimportar um módulo não duplica a métrica
+                return existente
+            self._metricas[metrica.nome] = metrica
+            return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Medidor:
+        return self._registrar(Medidor(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_PADRAO) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, buckets))
+
+    def exportar(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas: List[str] = []
+        for m in metricas:
+            linhas.extend(m.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRO = RegistroMetricas()
+
+LATENCIA_ESTAGIO = REGISTRO.histograma(
+    "agnos_stage_duration_seconds",
+    "Duração de cada estágio de uma requisição (routing, agent, logging)",
+    ["stage"],
+)
+
+
+class Cronometro:
+    """
+    Mede um trecho com relógio monotônico (`perf_counter`).
+    - `ms`: duração em milissegundos (disponível ao sair do bloco)
+    - com `histograma`, observa a duração (em segundos) ao sair, com os `rotulos`
+    """
+
+    def __init__(self, histograma: Optional[Histograma] = None, **rotulos: Any):
+        self.histograma = histograma
+        self.rotulos = rotulos
+        self.ms = 0.0
+        self._t0 = 0.0
+
+    def __enter__(self) -> "Cronometro":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        segundos = time.perf_counter() - self._t0
+        self.ms = segundos * 1000
+        if self.histograma is not None:
+            self.histograma.observar(segundos, **self.rotulos)
+
+
+class MiddlewareMetricasHTTP:
+    """
+    Middleware ASGI: taxa de requisições, status, requisições em andamento e latência.
+    A latência vai até o fim do corpo (inclui streams SSE/NDJSON). O rótulo `route`
+    usa o caminho declarado da rota (ex: /sessions/{session_id}) para não explodir a cardinalidade.
+    """
+
+    def __init__(self, app: Any, registro: RegistroMetricas = REGISTRO):
+        self.app = app
+        self.requisicoes = registro.contador(
+            "agnos_http_requests_total", "Requisições HTTP por rota, método e status", ["route", "method", "status"]
+        )
+        self.em_andamento = registro.medidor("agnos_http_requests_in_flight", "Requisições HTTP em andamento")
+        self.latencia = registro.histograma(
+            "agnos_http_request_duration_seconds", "Latência das requisições HTTP (até o fim do corpo)", ["route", "method"]
+        )
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def enviar(mensagem: Dict[str, Any]) -> None:
+            nonlocal status
+            if mensagem.get("type") == "http.response.start":
+                status = mensagem.get("status", 500)
+            await send(mensagem)
+
+        self.em_andamento.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            segundos = time.perf_counter() - t0
+            self.em_andamento.dec()
+            rota = getattr(scope.get("route"), "path", None) or "unmatched"
+            metodo = scope.get("method", "")
+            self.requisicoes.inc(route=rota, method=metodo, status=str(status))
+            self.latencia.observar(segundos, route=rota, method=metodo)